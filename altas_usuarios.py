@@ -0,0 +1,63 @@
+"""Alta masiva de usuarios desde un CSV
+
+El CSV lleva encabezado con las columnas username, password, nombre y, opcionalmente,
+email y rol (admin o usuario; por defecto usuario).
+
+Uso:
+    python altas_usuarios.py usuarios.csv
+    python altas_usuarios.py usuarios.csv --procesos 8 --db laboratorio.db
+"""
+import argparse
+import csv
+import sys
+
+from conexion import base_configurada
+from main import ROLES, LaboratorioApp
+
+COLUMNAS_OBLIGATORIAS = ("username", "password", "nombre")
+
+def leer_usuarios(archivo):
+    """Devuelve (usuarios válidos, errores) leyendo el CSV; cada error es (línea, motivo)"""
+    lector = csv.DictReader(archivo)
+    faltantes = [columna for columna in COLUMNAS_OBLIGATORIAS if columna not in (lector.fieldnames or ())]
+    if faltantes:
+        raise ValueError(f"Faltan las columnas {', '.join(faltantes)}")
+    usuarios, errores = [], []
+    for fila in lector:
+        usuario = {clave: (valor or "").strip() for clave, valor in fila.items() if clave}
+        vacios = [columna for columna in COLUMNAS_OBLIGATORIAS if not usuario.get(columna)]
+        if vacios:
+            errores.append((lector.line_num, f"sin {', '.join(vacios)}"))
+        elif usuario.get("rol") and usuario["rol"] not in ROLES:
+            errores.append((lector.line_num, f"rol desconocido {usuario['rol']}"))
+        else:
+            usuario["email"] = usuario.get("email") or None
+            usuarios.append(usuario)
+    return usuarios, errores
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Da de alta usuarios desde un CSV")
+    parser.add_argument("csv", help="Archivo CSV con los usuarios")
+    parser.add_argument("--db", default=base_configurada(), help="Ruta o URI de la base de datos principal")
+    parser.add_argument("--procesos", type=int, help="Procesos para hashear contraseñas (por defecto, uno por núcleo)")
+    opciones = parser.parse_args(argumentos)
+
+    try:
+        with open(opciones.csv, newline="", encoding="utf-8-sig") as archivo:
+            usuarios, errores = leer_usuarios(archivo)
+    except (OSError, ValueError) as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 2
+
+    creados, duplicados = LaboratorioApp(opciones.db).agregar_usuarios(usuarios, opciones.procesos)
+
+    for linea, motivo in errores:
+        print(f"❌ Línea {linea}: {motivo}", file=sys.stderr)
+    for username in duplicados:
+        print(f"❌ Usuario duplicado: {username}", file=sys.stderr)
+    print(f"{len(creados)} usuarios creados, {len(duplicados)} duplicados, {len(errores)} filas con errores",
+          file=sys.stderr)
+    return 1 if errores or duplicados else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Analítica de utilización del laboratorio calculada con NumPy"""
+import csv
+from datetime import date, timedelta
+
+import numpy as np
+
+from conexion import conectar
+from horarios import DIAS_SEMANA, RANGOS_TURNO, horario_a_minutos, minutos_a_hora, limites_semestre
+
+# Ventana horaria del laboratorio: desde el primer turno hasta el último
+INICIO_JORNADA = min(inicio for inicio, _ in RANGOS_TURNO.values())
+FIN_JORNADA = max(fin for _, fin in RANGOS_TURNO.values())
+
+def cargar_reservas(db_name, fecha_desde, fecha_hasta, conexion=None):
+    """Carga las reservas una sola vez y las convierte en arreglos por columna
+
+    Con `conexion` (por ejemplo, una de la réplica de lectura) se usa esa en lugar de abrir `db_name`.
+    """
+    conn = conexion or conectar(db_name)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT dia, docente, carrera, horario, fecha_inicio, fecha_fin, fecha_reserva
+        FROM reservas_detalle
+        WHERE fecha_inicio IS NULL OR (fecha_inicio <= ? AND fecha_fin >= ?)
+    ''', (fecha_hasta.isoformat(), fecha_desde.isoformat()))
+    filas = cursor.fetchall()
+    if conexion is None:
+        conn.close()
+
+    dias, inicios, fines, desde, hasta, docentes, carreras = [], [], [], [], [], [], []
+    for dia, docente, carrera, horario, fecha_inicio, fecha_fin, fecha_reserva in filas:
+        intervalo = horario_a_minutos(horario)
+        if dia not in DIAS_SEMANA or not intervalo:
+            continue
+        if fecha_inicio:
+            primer_dia, ultimo_dia = date.fromisoformat(fecha_inicio), date.fromisoformat(fecha_fin)
+        else:
+            # Las reservas de todo el semestre cubren solo el semestre en que se hicieron
+            referencia = date.fromisoformat(fecha_reserva[:10]) if fecha_reserva else date.today()
+            primer_dia, ultimo_dia = limites_semestre(referencia)
+            if primer_dia > fecha_hasta or ultimo_dia < fecha_desde:
+                continue
+        dias.append(DIAS_SEMANA.index(dia))
+        inicios.append(intervalo[0])
+        fines.append(intervalo[1])
+        desde.append(primer_dia.toordinal())
+        hasta.append(ultimo_dia.toordinal())
+        docentes.append(docente.strip())
+        carreras.append(carrera)
+
+    return {
+        "dia": np.array(dias, dtype=np.int8),
+        "inicio": np.array(inicios, dtype=np.int16),
+        "fin": np.array(fines, dtype=np.int16),
+        "desde": np.array(desde, dtype=np.int32),
+        "hasta": np.array(hasta, dtype=np.int32),
+        "docente": np.array(docentes, dtype=object),
+        "carrera": np.array(carreras, dtype=object),
+    }
+
+def tensor_ocupacion(reservas, fecha_desde, fecha_hasta, minutos_slot=5):
+    """Construye la matriz (días x slots) con la cantidad de reservas activas en cada slot"""
+    ordinales = np.arange(fecha_desde.toordinal(), fecha_hasta.toordinal() + 1, dtype=np.int32)
+    dias_semana = (ordinales + 6) % 7  # date.fromordinal(1) es lunes => 0 = lunes
+    slots = np.arange(INICIO_JORNADA, FIN_JORNADA, minutos_slot, dtype=np.int16)
+
+    # (reservas x días): la reserva cae en ese día de la semana y dentro de su período
+    activa = (
+        (reservas["dia"][:, None] == dias_semana[None, :]) &
+        (reservas["desde"][:, None] <= ordinales[None, :]) &
+        (reservas["hasta"][:, None] >= ordinales[None, :])
+    )
+    # (reservas x slots): el slot empieza dentro del horario de la reserva
+    cubre = (reservas["inicio"][:, None] <= slots[None, :]) & (reservas["fin"][:, None] > slots[None, :])
+
+    tensor = activa.T.astype(np.float32) @ cubre.astype(np.float32)
+    return ordinales, slots, activa, tensor.astype(np.int32)
+
+def horas_por_grupo(claves, horas):
+    """Suma las horas reservadas por cada valor distinto de `claves`"""
+    if not len(claves):
+        return []
+    nombres, codigos = np.unique(claves, return_inverse=True)
+    totales = np.bincount(codigos, weights=horas)
+    orden = np.argsort(-totales)
+    return [(str(nombres[i]), round(float(totales[i]), 1)) for i in orden]
+
+def huecos_libres(ocupado, ordinales, slots, minutos_slot, limite=10):
+    """Encuentra los huecos libres entre reservas de un mismo día, de mayor a menor"""
+    # Bordes de los tramos libres: diferencias sobre la matriz rellenada con slots ocupados
+    relleno = np.pad(~ocupado, ((0, 0), (1, 1)), constant_values=False).astype(np.int8)
+    bordes = np.diff(relleno, axis=1)
+    dias_ini, slot_ini = np.nonzero(bordes == 1)
+    _, slot_fin = np.nonzero(bordes == -1)
+
+    # Solo cuentan los huecos rodeados por reservas (no el inicio ni el final de la jornada)
+    internos = (slot_ini > 0) & (slot_fin < ocupado.shape[1])
+    dias_ini, slot_ini, slot_fin = dias_ini[internos], slot_ini[internos], slot_fin[internos]
+    largos = (slot_fin - slot_ini) * minutos_slot
+
+    orden = np.argsort(-largos)[:limite]
+    huecos = [
+        (
+            date.fromordinal(int(ordinales[dias_ini[i]])).isoformat(),
+            minutos_a_hora(int(slots[slot_ini[i]])),
+            minutos_a_hora(int(slots[slot_ini[i]]) + int(largos[i])),
+            int(largos[i]),
+        )
+        for i in orden
+    ]
+    return huecos, round(float(largos.sum()) / 60, 1)
+
+def calcular_utilizacion(db_name, fecha_desde=None, fecha_hasta=None, minutos_slot=5, conexion=None):
+    """Calcula el reporte de utilización del laboratorio para un rango de fechas"""
+    if fecha_desde is None or fecha_hasta is None:
+        fecha_desde, fecha_hasta = limites_semestre(date.today())
+
+    reservas = cargar_reservas(db_name, fecha_desde, fecha_hasta, conexion)
+    ordinales, slots, activa, tensor = tensor_ocupacion(reservas, fecha_desde, fecha_hasta, minutos_slot)
+    ocupado = tensor > 0
+
+    # Solo los días hábiles (lunes a viernes) cuentan como capacidad disponible
+    habiles = ((ordinales + 6) % 7) < len(DIAS_SEMANA)
+    ocupado_habil = ocupado[habiles]
+    capacidad = max(ocupado_habil.size, 1)
+
+    por_turno = {}
+    for turno, (inicio, fin) in RANGOS_TURNO.items():
+        columnas = (slots >= inicio) & (slots < fin)
+        celdas = ocupado_habil[:, columnas]
+        por_turno[turno] = round(100 * float(celdas.sum()) / max(celdas.size, 1), 1)
+
+    # Semanas: índice de semana relativo al primer lunes del rango
+    semanas = (ordinales - ordinales[0] + (ordinales[0] + 6) % 7) // 7
+    slots_por_semana = np.bincount(semanas[habiles], weights=ocupado_habil.sum(axis=1))
+    capacidad_semana = np.bincount(semanas[habiles]) * len(slots)
+    lunes_inicial = fecha_desde - timedelta(days=fecha_desde.weekday())
+    por_semana = [
+        ((lunes_inicial + timedelta(weeks=int(i))).isoformat(), round(100 * float(s) / float(c), 1))
+        for i, (s, c) in enumerate(zip(slots_por_semana, capacidad_semana)) if c
+    ]
+
+    # Horas pico: frecuencia de ocupación agregada por hora del día
+    horas = slots // 60
+    ocupacion_hora = np.bincount(horas - horas.min(), weights=ocupado_habil.sum(axis=0))
+    orden_horas = np.argsort(-ocupacion_hora)[:3]
+    horas_pico = [
+        (f"{int(horas.min() + i):02d}:00", round(float(ocupacion_hora[i]) * minutos_slot / 60, 1))
+        for i in orden_horas if ocupacion_hora[i] > 0
+    ]
+
+    huecos, horas_huecos = huecos_libres(ocupado_habil, ordinales[habiles], slots, minutos_slot)
+
+    # Horas reservadas por reserva = días activos x duración del horario
+    horas_reserva = activa.sum(axis=1) * (reservas["fin"] - reservas["inicio"]) / 60
+
+    return {
+        "desde": fecha_desde.isoformat(),
+        "hasta": fecha_hasta.isoformat(),
+        "reservas": int(len(reservas["dia"])),
+        "utilizacion": round(100 * float(ocupado_habil.sum()) / capacidad, 1),
+        "por_turno": por_turno,
+        "por_semana": por_semana,
+        "horas_pico": horas_pico,
+        "huecos": huecos,
+        "horas_huecos": horas_huecos,
+        "por_carrera": horas_por_grupo(reservas["carrera"], horas_reserva),
+        "por_docente": horas_por_grupo(reservas["docente"], horas_reserva),
+    }
+
+def exportar_csv(reporte, ruta):
+    """Exporta el reporte de utilización a un archivo CSV"""
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["seccion", "clave", "valor"])
+        escritor.writerow(["general", "desde", reporte["desde"]])
+        escritor.writerow(["general", "hasta", reporte["hasta"]])
+        escritor.writerow(["general", "reservas", reporte["reservas"]])
+        escritor.writerow(["general", "utilizacion_pct", reporte["utilizacion"]])
+        escritor.writerow(["general", "horas_en_huecos", reporte["horas_huecos"]])
+        for turno, porcentaje in reporte["por_turno"].items():
+            escritor.writerow(["turno_pct", turno, porcentaje])
+        for semana, porcentaje in reporte["por_semana"]:
+            escritor.writerow(["semana_pct", semana, porcentaje])
+        for hora, horas in reporte["horas_pico"]:
+            escritor.writerow(["hora_pico_horas", hora, horas])
+        for fecha, inicio, fin, minutos in reporte["huecos"]:
+            escritor.writerow(["hueco_minutos", f"{fecha} {inicio}-{fin}", minutos])
+        for carrera, horas in reporte["por_carrera"]:
+            escritor.writerow(["carrera_horas", carrera, horas])
+        for docente, horas in reporte["por_docente"]:
+            escritor.writerow(["docente_horas", docente, horas])
+    return ruta
@@ -0,0 +1,284 @@
+"""API HTTP JSON sobre LaboratorioApp para integraciones sin interfaz gráfica
+
+Cada pedido se autentica con un token (cabecera "Authorization: Bearer <token>"). Las
+consultas GET devuelven un ETag derivado de la versión de los datos y responden 304 si el
+cliente ya tiene esa versión; las respuestas grandes se comprimen con gzip si el cliente lo acepta.
+
+Uso:
+    python api.py token --usuario admin --descripcion "Sistema de bedelía"
+    python api.py servir --puerto 8560
+
+Rutas (todas aceptan ?laboratorio=<id>, por defecto el 1):
+    GET  /api/laboratorios
+    GET  /api/catalogos
+    GET  /api/reservas
+    GET  /api/reservas/<id>
+    POST /api/reservas/lote   {"crear": [...], "actualizar": [...], "eliminar": [ids]}
+"""
+import argparse
+import copy
+import gzip
+import hashlib
+import json
+import secrets
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from conexion import base_configurada, conectar
+from main import LaboratorioApp
+
+# Por debajo de este tamaño gzip no ahorra lo que cuesta comprimir
+MINIMO_GZIP = 1024
+
+# Tamaño máximo del cuerpo de un pedido (un lote de algunos miles de reservas)
+MAXIMO_CUERPO = 4 * 1024 * 1024
+
+def init_tokens(cursor):
+    """Crea la tabla de tokens de la API; solo se guarda el hash de cada token"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tokens_api (
+            token_hash TEXT PRIMARY KEY,
+            usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+            descripcion TEXT,
+            creado TEXT NOT NULL
+        )
+    ''')
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def crear_token(db_name, username, descripcion=None):
+    """Genera un token para el usuario `username`; el valor en claro solo se conoce ahora"""
+    conn = conectar(db_name)
+    try:
+        init_tokens(conn.cursor())
+        usuario = conn.execute('SELECT id FROM usuarios WHERE username = ?', (username,)).fetchone()
+        if usuario is None:
+            raise LookupError(f"No existe el usuario {username}")
+        token = secrets.token_urlsafe(32)
+        conn.execute('INSERT INTO tokens_api (token_hash, usuario_id, descripcion, creado) VALUES (?, ?, ?, ?)',
+                     (hash_token(token), usuario[0], descripcion, datetime.now().isoformat(timespec="seconds")))
+        conn.commit()
+        return token
+    finally:
+        conn.close()
+
+def usuario_del_token(db_name, token):
+    """Devuelve (id, username, nombre, rol) del dueño del token, o None si no es válido"""
+    conn = conectar(db_name)
+    try:
+        return conn.execute('''
+            SELECT u.id, u.username, u.nombre, u.rol
+            FROM tokens_api t JOIN usuarios u ON u.id = t.usuario_id
+            WHERE t.token_hash = ?
+        ''', (hash_token(token),)).fetchone()
+    finally:
+        conn.close()
+
+class ErrorAPI(Exception):
+    """Error que se devuelve al cliente con el código HTTP indicado"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+class ServidorAPI(ThreadingHTTPServer):
+    """Servidor HTTP con una instancia de LaboratorioApp por laboratorio, compartida entre pedidos"""
+
+    daemon_threads = True
+
+    def __init__(self, direccion, db_name=None):
+        self.app = LaboratorioApp(db_name)
+        conn = conectar(self.app.db_usuarios)
+        init_tokens(conn.cursor())
+        conn.commit()
+        conn.close()
+        self._apps = {1: self.app}
+        self._apps_lock = threading.Lock()
+        super().__init__(direccion, ManejadorAPI)
+
+    def app_para(self, id_laboratorio, usuario):
+        """Copia liviana de la app del laboratorio con el usuario del pedido como actor de la auditoría"""
+        with self._apps_lock:
+            if id_laboratorio not in self._apps:
+                for id_item, _, archivo in self.app.obtener_laboratorios():
+                    if id_item == id_laboratorio:
+                        app = LaboratorioApp(archivo, self.app.db_usuarios)
+                        app.laboratorio_id = id_item
+                        self._apps[id_item] = app
+                        break
+                else:
+                    raise ErrorAPI(404, f"No existe el laboratorio {id_laboratorio}")
+            app = copy.copy(self._apps[id_laboratorio])
+        app.actor = (usuario[0], usuario[1])
+        return app
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    server_version = "LaboratorioAPI/1.0"
+
+    def do_GET(self):
+        self.atender(self.consultar)
+
+    def do_POST(self):
+        self.atender(self.modificar)
+
+    def atender(self, accion):
+        try:
+            ruta = urlsplit(self.path)
+            parametros = parse_qs(ruta.query)
+            usuario = self.autenticar()
+            try:
+                id_laboratorio = int(parametros.get("laboratorio", ["1"])[0])
+            except ValueError:
+                raise ErrorAPI(400, "El parámetro laboratorio debe ser un número")
+            app = self.server.app_para(id_laboratorio, usuario)
+            # Cada pedido cuenta como actividad: el mantenimiento espera a que la API quede quieta
+            app.registrar_solicitud()
+            accion(app, usuario, [parte for parte in ruta.path.split("/") if parte])
+        except ErrorAPI as e:
+            self.responder(e.estado, {"error": str(e)})
+        except Exception as e:
+            print(f"❌ Error en la API ({self.command} {self.path}): {str(e)}")
+            self.responder(500, {"error": "Error interno"})
+
+    def autenticar(self):
+        encabezado = self.headers.get("Authorization", "")
+        if not encabezado.startswith("Bearer "):
+            raise ErrorAPI(401, "Falta el token de acceso")
+        usuario = usuario_del_token(self.server.app.db_usuarios, encabezado[len("Bearer "):].strip())
+        if usuario is None:
+            raise ErrorAPI(401, "Token inválido")
+        return usuario
+
+    def consultar(self, app, usuario, partes):
+        # Los no administradores solo ven sus propias reservas, igual que en la interfaz
+        propio = None if usuario[3] == 'admin' else usuario[0]
+        if partes == ["api", "laboratorios"]:
+            etag = f'"lab-{app.obtener_version_catalogos()}-{len(app.obtener_laboratorios())}"'
+            if self.no_modificado(etag):
+                return
+            datos = [{"id": id_lab, "nombre": nombre} for id_lab, nombre, _ in app.obtener_laboratorios()]
+        elif partes == ["api", "catalogos"]:
+            etag = f'"cat-{app.laboratorio_id}-{app.obtener_version_catalogos()}"'
+            if self.no_modificado(etag):
+                return
+            datos = {tabla: app.obtener_catalogo(tabla) for tabla in ("turnos", "carreras", "docentes")}
+        elif partes == ["api", "reservas"]:
+            etag = f'"res-{app.laboratorio_id}-{app.obtener_version_datos()}-{propio or "todas"}"'
+            if self.no_modificado(etag):
+                return
+            datos = [reserva.como_dict() for reserva in app.obtener_reservas(propio)]
+        elif len(partes) == 3 and partes[:2] == ["api", "reservas"] and partes[2].isdigit():
+            etag = f'"res-{app.laboratorio_id}-{app.obtener_version_datos()}-{partes[2]}"'
+            if self.no_modificado(etag):
+                return
+            reserva = app.obtener_reserva_por_id(int(partes[2]), propio)
+            if reserva is None:
+                raise ErrorAPI(404, "Reserva no encontrada")
+            datos = reserva.como_dict()
+        else:
+            raise ErrorAPI(404, "Ruta inexistente")
+        self.responder(200, datos, {"ETag": etag})
+
+    def modificar(self, app, usuario, partes):
+        if partes != ["api", "reservas", "lote"]:
+            raise ErrorAPI(404, "Ruta inexistente")
+        lote = self.leer_json()
+        if not isinstance(lote, dict) or not any(lote.get(clave) for clave in ("crear", "actualizar", "eliminar")):
+            raise ErrorAPI(400, "El lote debe incluir crear, actualizar o eliminar")
+        # El estado HTTP sale del tipo de error, no del texto del mensaje
+        try:
+            mensaje, creadas = app.ejecutar_lote_reservas(
+                lote.get("crear") or (), lote.get("actualizar") or (), lote.get("eliminar") or (),
+                usuario_id=None if usuario[3] == 'admin' else usuario[0]
+            )
+        except PermissionError as e:
+            raise ErrorAPI(403, str(e))
+        except LookupError as e:
+            raise ErrorAPI(409, str(e))
+        except ValueError as e:
+            raise ErrorAPI(400, str(e))
+        self.responder(200, {"mensaje": mensaje, "creadas": creadas, "version": app.obtener_version_datos()},
+                       {"ETag": f'"res-{app.laboratorio_id}-{app.obtener_version_datos()}-todas"'})
+
+    def leer_json(self):
+        try:
+            longitud = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            raise ErrorAPI(400, "Content-Length inválido")
+        if longitud > MAXIMO_CUERPO:
+            raise ErrorAPI(413, "El pedido es demasiado grande")
+        cuerpo = self.rfile.read(longitud)
+        try:
+            if self.headers.get("Content-Encoding", "").lower() == "gzip":
+                cuerpo = gzip.decompress(cuerpo)
+            return json.loads(cuerpo or b"null")
+        except (OSError, ValueError):
+            raise ErrorAPI(400, "El cuerpo no es JSON válido")
+
+    def no_modificado(self, etag):
+        """Responde 304 si el cliente ya tiene la versión `etag`"""
+        etiquetas = [etiqueta.strip() for etiqueta in self.headers.get("If-None-Match", "").split(",")]
+        if etag not in etiquetas and "*" not in etiquetas:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Authorization, Accept-Encoding")
+        self.end_headers()
+        return True
+
+    def responder(self, estado, datos, encabezados=None):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode()
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if len(cuerpo) >= MINIMO_GZIP and "gzip" in self.headers.get("Accept-Encoding", ""):
+            cuerpo = gzip.compress(cuerpo, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Authorization, Accept-Encoding")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for clave, valor in (encabezados or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        # Sin una línea por pedido en la consola; los errores se informan aparte
+        pass
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="API HTTP JSON del sistema de laboratorio")
+    parser.add_argument("--db", default=base_configurada(), help="Ruta o URI de la base de datos principal")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    token = comandos.add_parser("token", help="Genera un token de acceso para un usuario")
+    token.add_argument("--usuario", required=True, help="Nombre de usuario dueño del token")
+    token.add_argument("--descripcion", help="Para qué integración es el token")
+
+    servir = comandos.add_parser("servir", help="Atiende la API")
+    servir.add_argument("--host", default="127.0.0.1", help="Dirección en la que escuchar")
+    servir.add_argument("--puerto", type=int, default=8560, help="Puerto en el que escuchar")
+
+    opciones = parser.parse_args(argumentos)
+    if opciones.comando == "token":
+        try:
+            print(crear_token(opciones.db, opciones.usuario, opciones.descripcion))
+        except LookupError as e:
+            print(f"❌ {str(e)}", file=sys.stderr)
+            return 2
+        return 0
+
+    servidor = ServidorAPI((opciones.host, opciones.puerto), opciones.db)
+    print(f"API escuchando en http://{opciones.host}:{opciones.puerto}/api", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Registro de auditoría de solo anexado con un escritor en segundo plano"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from conexion import conectar
+
+ESQUEMA_AUDITORIA = '''
+    CREATE TABLE IF NOT EXISTS auditoria (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fecha TEXT NOT NULL,
+        actor_id INTEGER,
+        actor TEXT,
+        operacion TEXT NOT NULL,
+        entidad TEXT NOT NULL,
+        entidad_id INTEGER,
+        antes TEXT,
+        despues TEXT
+    )
+'''
+
+def init_auditoria(cursor):
+    """Crea la tabla de auditoría y los triggers que la vuelven de solo anexado"""
+    cursor.execute(ESQUEMA_AUDITORIA)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_auditoria_entidad ON auditoria(entidad, entidad_id)')
+    for evento in ("UPDATE", "DELETE"):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_auditoria_{evento.lower()}
+            BEFORE {evento} ON auditoria
+            BEGIN
+                SELECT RAISE(ABORT, 'La auditoría es de solo anexado');
+            END
+        ''')
+
+class RegistroAuditoria:
+    """Encola las entradas en memoria y las guarda por lotes desde un hilo propio"""
+
+    def __init__(self, db_name, capacidad=1000, max_lote=200, espera=0.5):
+        self.db_name = db_name
+        self.max_lote = max_lote
+        self.espera = espera
+        # Cola acotada: si se llena, se descarta la entrada antes que frenar la escritura
+        self._pendientes = queue.Queue(maxsize=capacidad)
+        self._lock = threading.Lock()
+        self._descartadas = 0
+        self._guardadas = 0
+        self._hilo = threading.Thread(target=self._ciclo, name="auditoria", daemon=True)
+        self._hilo.start()
+
+    def registrar(self, actor, operacion, entidad, entidad_id, antes=None, despues=None):
+        """Encola una entrada sin bloquear; devuelve False si la cola estaba llena"""
+        actor_id, actor_nombre = actor if actor else (None, None)
+        entrada = (
+            datetime.now().isoformat(timespec="seconds"),
+            actor_id,
+            actor_nombre,
+            operacion,
+            entidad,
+            entidad_id,
+            json.dumps(antes, ensure_ascii=False) if antes is not None else None,
+            json.dumps(despues, ensure_ascii=False) if despues is not None else None,
+        )
+        try:
+            self._pendientes.put_nowait(entrada)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._descartadas += 1
+            return False
+
+    def vaciar(self):
+        """Espera a que todas las entradas encoladas estén guardadas"""
+        self._pendientes.join()
+
+    def estadisticas(self):
+        """Devuelve las entradas pendientes, guardadas y descartadas"""
+        with self._lock:
+            return {
+                "pendientes": self._pendientes.qsize(),
+                "guardadas": self._guardadas,
+                "descartadas": self._descartadas,
+            }
+
+    def _tomar_lote(self):
+        """Espera la primera entrada y junta las que lleguen durante `espera` segundos"""
+        lote = [self._pendientes.get()]
+        limite = time.monotonic() + self.espera
+        while len(lote) < self.max_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._pendientes.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _ciclo(self):
+        conn = conectar(self.db_name, check_same_thread=False)
+        while True:
+            lote = self._tomar_lote()
+            try:
+                conn.executemany('''
+                    INSERT INTO auditoria (fecha, actor_id, actor, operacion, entidad, entidad_id, antes, despues)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', lote)
+                conn.commit()
+                with self._lock:
+                    self._guardadas += len(lote)
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"❌ Error al guardar {len(lote)} entradas de auditoría: {str(e)}")
+            finally:
+                for _ in lote:
+                    self._pendientes.task_done()
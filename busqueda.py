@@ -0,0 +1,60 @@
+"""Índice de prefijos para autocompletar nombres"""
+import bisect
+import threading
+import unicodedata
+
+def plegar(texto):
+    """Normaliza un texto para comparar sin mayúsculas ni acentos"""
+    descompuesto = unicodedata.normalize("NFKD", texto.strip().casefold())
+    return " ".join("".join(c for c in descompuesto if not unicodedata.combining(c)).split())
+
+class IndicePrefijos:
+    """Arreglo ordenado de claves plegadas; cada palabra del nombre es un punto de entrada"""
+
+    def __init__(self, nombres=()):
+        self._lock = threading.Lock()
+        self._claves = []
+        self._nombres = set()
+        entradas = []
+        for nombre in nombres:
+            entradas.extend(self._entradas(nombre))
+        # Construcción en bloque: una sola ordenación en lugar de inserciones sucesivas
+        self._claves = sorted(set(entradas))
+        self._nombres = {nombre.strip() for nombre in nombres if nombre.strip()}
+
+    def _entradas(self, nombre):
+        nombre = nombre.strip()
+        palabras = plegar(nombre).split(" ")
+        # "carlos perez" se encuentra tanto por "car" como por "per"
+        return [(" ".join(palabras[i:]), nombre) for i in range(len(palabras)) if palabras[i]]
+
+    def agregar(self, nombre):
+        """Agrega un nombre al índice manteniendo el orden"""
+        with self._lock:
+            if not nombre.strip() or nombre.strip() in self._nombres:
+                return
+            self._nombres.add(nombre.strip())
+            for entrada in self._entradas(nombre):
+                posicion = bisect.bisect_left(self._claves, entrada)
+                if posicion == len(self._claves) or self._claves[posicion] != entrada:
+                    self._claves.insert(posicion, entrada)
+
+    def buscar(self, prefijo, limite=8):
+        """Devuelve hasta `limite` nombres con alguna palabra que empiece por `prefijo`"""
+        clave = plegar(prefijo)
+        if not clave:
+            return []
+        resultados = []
+        with self._lock:
+            posicion = bisect.bisect_left(self._claves, (clave, ""))
+            while posicion < len(self._claves) and len(resultados) < limite:
+                entrada, nombre = self._claves[posicion]
+                if not entrada.startswith(clave):
+                    break
+                if nombre not in resultados:
+                    resultados.append(nombre)
+                posicion += 1
+        return resultados
+
+    def __len__(self):
+        return len(self._nombres)
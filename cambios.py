@@ -0,0 +1,167 @@
+"""Registro de cambios (CDC) de reservas y usuarios, leído de forma incremental con un cursor
+
+Uso desde la línea de comandos:
+    python cambios.py exportar --desde 0 --bloque 500 > cambios.jsonl
+    python cambios.py compactar --dias 90
+"""
+import argparse
+import json
+import sys
+
+from conexion import base_configurada, conectar, uri_solo_lectura
+
+# Columnas que se publican de cada tabla, como expresiones sobre la fila `{fila}` (NEW u OLD).
+# La contraseña de los usuarios nunca sale en el registro de cambios.
+COLUMNAS_CAMBIOS = {
+    "reservas": {
+        "id": "{fila}.id",
+        "dia": "{fila}.dia",
+        "turno": "(SELECT nombre FROM turnos WHERE id = {fila}.turno_id)",
+        "docente": "(SELECT nombre FROM docentes WHERE id = {fila}.docente_id)",
+        "carrera": "(SELECT nombre FROM carreras WHERE id = {fila}.carrera_id)",
+        "curso": "{fila}.curso",
+        "horario": "{fila}.horario",
+        "periodo": "{fila}.periodo",
+        "fecha_inicio": "{fila}.fecha_inicio",
+        "fecha_fin": "{fila}.fecha_fin",
+        "fecha_reserva": "{fila}.fecha_reserva",
+        "usuario_id": "{fila}.usuario_id",
+    },
+    "usuarios": {
+        "id": "{fila}.id",
+        "username": "{fila}.username",
+        "nombre": "{fila}.nombre",
+        "email": "{fila}.email",
+        "rol": "{fila}.rol",
+    },
+}
+
+def init_cambios(cursor, tablas=tuple(COLUMNAS_CAMBIOS)):
+    """Crea la tabla de cambios y los triggers que alimentan `tablas`"""
+    cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'cambios'")
+    existia = cursor.fetchone()[0]
+    # AUTOINCREMENT: la secuencia nunca reutiliza números, aunque se compacte el principio
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cambios (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            tabla TEXT NOT NULL,
+            operacion TEXT NOT NULL,
+            fila_id INTEGER NOT NULL,
+            datos TEXT
+        )
+    ''')
+    for tabla in tablas:
+        columnas = COLUMNAS_CAMBIOS[tabla]
+        if not existia:
+            # Primera vez: el estado actual entra como altas, así un consumidor nuevo arranca desde 0
+            cursor.execute('''
+                INSERT INTO cambios (tabla, operacion, fila_id, datos)
+                SELECT '{tabla}', 'insert', f.id, json_object({columnas}) FROM {tabla} f ORDER BY f.id
+            '''.format(tabla=tabla, columnas=", ".join(
+                f"'{columna}', {expresion.format(fila='f')}" for columna, expresion in columnas.items()
+            )))
+        for operacion in ("INSERT", "UPDATE", "DELETE"):
+            fila = "OLD" if operacion == "DELETE" else "NEW"
+            datos = "NULL" if operacion == "DELETE" else "json_object({})".format(", ".join(
+                f"'{columna}', {expresion.format(fila=fila)}" for columna, expresion in columnas.items()
+            ))
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabla}_cambios_{operacion.lower()}
+                AFTER {operacion} ON {tabla}
+                BEGIN
+                    INSERT INTO cambios (tabla, operacion, fila_id, datos)
+                    VALUES ('{tabla}', '{operacion.lower()}', {fila}.id, {datos});
+                END
+            ''')
+
+def leer_cambios(conn, desde=0, limite=500):
+    """Devuelve hasta `limite` cambios con seq mayor que `desde`, en orden"""
+    filas = conn.execute('''
+        SELECT seq, fecha, tabla, operacion, fila_id, datos
+        FROM cambios
+        WHERE seq > ?
+        ORDER BY seq
+        LIMIT ?
+    ''', (desde, limite)).fetchall()
+    return [
+        {"seq": seq, "fecha": fecha, "tabla": tabla, "operacion": operacion, "id": fila_id,
+         "datos": json.loads(datos) if datos else None}
+        for seq, fecha, tabla, operacion, fila_id, datos in filas
+    ]
+
+def cursor_vigente(conn, desde):
+    """False si ya se compactaron cambios posteriores a `desde`: el consumidor debe resincronizar"""
+    primero = conn.execute('SELECT MIN(seq) FROM cambios').fetchone()[0]
+    if primero is None:
+        # Sin cambios guardados, solo es vigente un cursor que no quedó por detrás de la secuencia
+        fila = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cambios'").fetchone()
+        return desde >= (fila[0] if fila else 0)
+    return desde >= primero - 1
+
+def exportar_cambios(db_name, desde=0, salida=sys.stdout, bloque=500):
+    """Escribe en `salida` como JSONL todos los cambios posteriores a `desde`, por bloques
+
+    Devuelve el nuevo cursor, para pasarlo como `desde` en la próxima sincronización.
+    """
+    conn = conectar(uri_solo_lectura(db_name))
+    try:
+        if not cursor_vigente(conn, desde):
+            raise ValueError(f"El cursor {desde} es anterior a los cambios compactados; hace falta una resincronización completa")
+        while True:
+            cambios = leer_cambios(conn, desde, bloque)
+            for cambio in cambios:
+                salida.write(json.dumps(cambio, ensure_ascii=False) + "\n")
+            if len(cambios) < bloque:
+                return cambios[-1]["seq"] if cambios else desde
+            desde = cambios[-1]["seq"]
+    finally:
+        conn.close()
+
+def compactar_cambios(conn, dias=None, conservar=None):
+    """Elimina los cambios de más de `dias` días o que exceden los `conservar` más recientes"""
+    eliminados = 0
+    if dias is not None:
+        eliminados += conn.execute(
+            "DELETE FROM cambios WHERE fecha < datetime('now', ?)", (f"-{int(dias)} days",)
+        ).rowcount
+    if conservar is not None:
+        eliminados += conn.execute(
+            'DELETE FROM cambios WHERE seq <= (SELECT MAX(seq) FROM cambios) - ?', (int(conservar),)
+        ).rowcount
+    return eliminados
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Registro de cambios de laboratorio.db")
+    parser.add_argument("--db", default=base_configurada(), help="Ruta o URI de la base de datos")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    exportar = comandos.add_parser("exportar", help="Escribe los cambios posteriores a un cursor como JSONL")
+    exportar.add_argument("--desde", type=int, default=0, help="Último seq ya procesado por el consumidor")
+    exportar.add_argument("--bloque", type=int, default=500, help="Cambios leídos por consulta")
+
+    compactar = comandos.add_parser("compactar", help="Elimina los cambios antiguos")
+    compactar.add_argument("--dias", type=int, help="Conservar solo los cambios de los últimos N días")
+    compactar.add_argument("--conservar", type=int, help="Conservar solo los últimos N cambios")
+
+    opciones = parser.parse_args(argumentos)
+    if opciones.comando == "exportar":
+        try:
+            cursor = exportar_cambios(opciones.db, opciones.desde, sys.stdout, opciones.bloque)
+        except ValueError as e:
+            print(f"❌ {str(e)}", file=sys.stderr)
+            return 2
+        print(f"cursor={cursor}", file=sys.stderr)
+        return 0
+
+    if opciones.dias is None and opciones.conservar is None:
+        parser.error("compactar requiere --dias o --conservar")
+    conn = conectar(opciones.db)
+    with conn:
+        eliminados = compactar_cambios(conn, opciones.dias, opciones.conservar)
+    conn.close()
+    print(f"{eliminados} cambios eliminados", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+"""Prueba de carga de la interfaz: varias sesiones simultáneas sobre main(page) sin navegador
+
+Cada sesión es una página simulada sobre la que corre main(page) tal como lo hace Flet en el
+servidor; el guion de cada una inicia sesión y repite listar, agregar, editar y eliminar una
+reserva haciendo clic en los mismos botones que usaría una persona. Todo corre contra una base
+descartable (un archivo en una carpeta temporal, o en memoria con --memoria) con usuarios de
+prueba propios, y al final se informa el rendimiento, los percentiles de latencia por acción,
+los reintentos por base bloqueada y la memoria que ocupa cada sesión.
+
+Uso:
+    python carga.py --sesiones 20 --iteraciones 10
+    python carga.py --sesiones 50 --iteraciones 5 --memoria
+    LABORATORIO_COLA_ESCRITURA=1 python carga.py --sesiones 50 --pausa 0.2
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import flet as ft
+
+from conexion import base_en_memoria
+
+ACCIONES = ("login", "listar", "agregar", "editar", "eliminar")
+
+PASSWORD_CARGA = "carga123"
+
+# Atributos por los que se baja en el árbol de controles
+HIJOS = ("controls", "content", "leading", "title", "subtitle", "trailing", "actions")
+
+class FalloAccion(Exception):
+    """La acción terminó con un mensaje de error en la interfaz"""
+
+class PaginaSimulada:
+    """Lo que main(page) usa de ft.Page, sin conexión con un cliente"""
+
+    def __init__(self):
+        self.controls = []
+        self.route = "/"
+        self.title = None
+        self.theme_mode = None
+        self.padding = None
+        self.on_disconnect = None
+        self.actualizaciones = 0
+
+    def add(self, *controles):
+        self.controls.extend(controles)
+
+    def update(self, *controles):
+        self.actualizaciones += 1
+
+    def run_thread(self, funcion, *args, **kwargs):
+        threading.Thread(target=funcion, args=args, kwargs=kwargs, daemon=True).start()
+
+    def open(self, control):
+        pass
+
+    def close(self, control):
+        pass
+
+    def go(self, ruta):
+        self.route = ruta
+
+    def launch_url(self, url, **kwargs):
+        pass
+
+def recorrer(control):
+    """Controles visibles de `control` hacia abajo, en el orden en que se muestran"""
+    if control is None or getattr(control, "visible", True) is False:
+        return
+    yield control
+    for atributo in HIJOS:
+        hijo = getattr(control, atributo, None)
+        if isinstance(hijo, list):
+            for elemento in hijo:
+                if isinstance(elemento, ft.Control):
+                    yield from recorrer(elemento)
+        elif isinstance(hijo, ft.Control):
+            yield from recorrer(hijo)
+
+def visibles(pagina):
+    for control in pagina.controls:
+        yield from recorrer(control)
+
+def texto_boton(boton):
+    if boton.text:
+        return boton.text
+    return " ".join(control.value for control in recorrer(boton.content)
+                    if isinstance(control, ft.Text) and control.value)
+
+def botones(pagina, texto):
+    return [control for control in visibles(pagina)
+            if isinstance(control, (ft.TextButton, ft.ElevatedButton, ft.OutlinedButton))
+            and texto_boton(control) == texto]
+
+def clic(pagina, texto):
+    """Hace clic en el primer botón visible con ese texto"""
+    encontrados = botones(pagina, texto)
+    if not encontrados:
+        raise FalloAccion(f"No hay ningún botón '{texto}' en pantalla")
+    boton = encontrados[0]
+    boton.on_click(SimpleNamespace(control=boton, page=pagina, data=None))
+
+def campo(pagina, etiqueta):
+    for control in visibles(pagina):
+        if getattr(control, "label", None) == etiqueta and hasattr(control, "value"):
+            return control
+    raise FalloAccion(f"No hay ningún campo '{etiqueta}' en pantalla")
+
+def elegir(pagina, etiqueta, indice):
+    """Selecciona en el desplegable `etiqueta` la opción número `indice` (circular)"""
+    desplegable = campo(pagina, etiqueta)
+    if not desplegable.options:
+        raise FalloAccion(f"El desplegable '{etiqueta}' no tiene opciones")
+    opcion = desplegable.options[indice % len(desplegable.options)]
+    desplegable.value = opcion.key if opcion.key is not None else opcion.text
+
+def consumir_errores(pagina):
+    """Devuelve los mensajes de error en pantalla y los borra, como quien cierra el aviso"""
+    errores = []
+    for control in visibles(pagina):
+        if isinstance(control, ft.Text) and isinstance(control.value, str) and control.value.startswith("❌"):
+            errores.append(control.value)
+            control.value = ""
+    return errores
+
+class SalidaSesiones:
+    """Reemplazo de sys.stdout que separa lo que imprime cada sesión
+
+    Los métodos de LaboratorioApp informan los errores con print; así se sabe qué sesión
+    recibió un "database is locked" aunque la interfaz solo muestre un mensaje genérico.
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def capturar(self):
+        self.local.lineas = []
+
+    def lineas(self):
+        lineas, self.local.lineas = getattr(self.local, "lineas", []), []
+        return lineas
+
+    def write(self, texto):
+        lineas = getattr(self.local, "lineas", None)
+        if lineas is None:
+            return self.original.write(texto)
+        if texto.strip():
+            lineas.append(texto.strip())
+        return len(texto)
+
+    def flush(self):
+        self.original.flush()
+
+def es_bloqueo(mensajes):
+    return any("locked" in mensaje for mensaje in mensajes)
+
+class Sesion:
+    """Una persona usando la interfaz: su página, su usuario y el guion de acciones"""
+
+    def __init__(self, indice, username, modulo_main):
+        self.indice = indice
+        self.username = username
+        self.pagina = PaginaSimulada()
+        self.reintentando = False
+        modulo_main.main(self.pagina)
+
+    def login(self):
+        # Un reintento puede encontrar la sesión ya iniciada si falló después de entrar
+        if botones(self.pagina, "Cerrar Sesión"):
+            self.cerrar_sesion()
+        campo(self.pagina, "Usuario").value = self.username
+        campo(self.pagina, "Contraseña").value = PASSWORD_CARGA
+        clic(self.pagina, "Iniciar Sesión")
+        if not botones(self.pagina, "Cerrar Sesión"):
+            raise FalloAccion("Usuario o contraseña incorrectos")
+
+    def cerrar_sesion(self):
+        clic(self.pagina, "Cerrar Sesión")
+
+    def listar(self):
+        clic(self.pagina, "Ver Reservas")
+
+    def agregar(self, iteracion):
+        clic(self.pagina, "Nueva Reserva")
+        elegir(self.pagina, "Día de la semana", self.indice + iteracion)
+        elegir(self.pagina, "Turno", self.indice)
+        elegir(self.pagina, "Carrera", iteracion)
+        elegir(self.pagina, "Curso (Año)", self.indice)
+        campo(self.pagina, "Nombre del docente").value = f"Docente Carga {self.indice % 20}"
+        campo(self.pagina, "Materia").value = f"Materia {self.indice}-{iteracion}"
+        hora = 8 + (self.indice + iteracion) % 12
+        campo(self.pagina, "Horario específico").value = f"{hora:02d}:00 - {hora + 1:02d}:00"
+        next(control for control in visibles(self.pagina) if isinstance(control, ft.RadioGroup)).value = "semestre"
+        clic(self.pagina, "Agregar Reserva")
+
+    def editar(self, iteracion):
+        clic(self.pagina, "Ver Reservas")
+        clic(self.pagina, "Editar")
+        campo(self.pagina, "Materia").value = f"Materia {self.indice}-{iteracion} (editada)"
+        clic(self.pagina, "Guardar Cambios")
+
+    def eliminar(self):
+        clic(self.pagina, "Ver Reservas")
+        # Si el intento anterior llegó a borrar antes de chocar con el bloqueo, ya no queda nada
+        if self.reintentando and not botones(self.pagina, "Eliminar"):
+            return
+        clic(self.pagina, "Eliminar")
+
+class PruebaCarga:
+    """Prepara la base y las sesiones, corre los guiones en paralelo y junta las mediciones"""
+
+    def __init__(self, db_name, sesiones, iteraciones, pausa=0.0, reintentos=5):
+        self.db_name = db_name
+        self.cantidad_sesiones = sesiones
+        self.iteraciones = iteraciones
+        self.pausa = pausa
+        self.reintentos = reintentos
+        self.latencias = {accion: [] for accion in ACCIONES}
+        self.reintentos_bloqueo = 0
+        self.acciones_bloqueadas = 0
+        self.errores = []
+        self.memoria_sesiones = []
+        self.sesiones = []
+        self.duracion = 0.0
+        self.salida = None
+        self._lock = threading.Lock()
+
+    def preparar(self):
+        # main(page) abre la base configurada; la de la prueba se fija antes de importarlo
+        os.environ["LABORATORIO_DB"] = self.db_name
+        # Sin respaldos ni mantenimiento de fondo que compitan con las sesiones medidas
+        os.environ.setdefault("LABORATORIO_RESPALDO_HORAS", "0")
+        os.environ.setdefault("LABORATORIO_MANTENIMIENTO_HORAS", "0")
+        import main as modulo_main
+
+        usuarios = [
+            {"username": f"carga{indice:03d}", "password": PASSWORD_CARGA, "nombre": f"Usuario de carga {indice}",
+             "email": None, "rol": "usuario"}
+            for indice in range(self.cantidad_sesiones)
+        ]
+        modulo_main.LaboratorioApp(self.db_name).agregar_usuarios(usuarios)
+
+        # Memoria retenida por sesión: la página, sus controles y la app, ya con la sesión iniciada
+        tracemalloc.start()
+        try:
+            for indice, usuario in enumerate(usuarios):
+                gc.collect()
+                antes = tracemalloc.get_traced_memory()[0]
+                sesion = Sesion(indice, usuario["username"], modulo_main)
+                sesion.login()
+                gc.collect()
+                self.memoria_sesiones.append(tracemalloc.get_traced_memory()[0] - antes)
+                sesion.cerrar_sesion()
+                self.sesiones.append(sesion)
+        finally:
+            tracemalloc.stop()
+
+    def medir(self, sesion, accion, paso):
+        """Corre un paso del guion reintentando si la base estaba bloqueada; registra la latencia total"""
+        inicio = time.perf_counter()
+        for intento in range(self.reintentos + 1):
+            sesion.reintentando = intento > 0
+            consumir_errores(sesion.pagina)
+            self.salida.capturar()
+            try:
+                paso()
+                mensajes = consumir_errores(sesion.pagina)
+            except Exception as e:
+                mensajes = [str(e)]
+            mensajes += self.salida.lineas()
+            if not mensajes:
+                with self._lock:
+                    self.latencias[accion].append(time.perf_counter() - inicio)
+                return True
+            if not es_bloqueo(mensajes) or intento == self.reintentos:
+                break
+            with self._lock:
+                self.reintentos_bloqueo += 1
+                self.acciones_bloqueadas += intento == 0
+            time.sleep(random.uniform(0, 0.05 * 2 ** intento))
+        with self._lock:
+            self.errores.append((sesion.username, accion, mensajes[0]))
+        return False
+
+    def esperar(self):
+        if self.pausa:
+            time.sleep(random.uniform(0, 2 * self.pausa))
+
+    def guion(self, sesion, barrera):
+        barrera.wait()
+        if not self.medir(sesion, "login", sesion.login):
+            return
+        for iteracion in range(self.iteraciones):
+            for accion, paso in (("listar", sesion.listar),
+                                 ("agregar", lambda: sesion.agregar(iteracion)),
+                                 ("editar", lambda: sesion.editar(iteracion)),
+                                 ("eliminar", sesion.eliminar)):
+                self.esperar()
+                if not self.medir(sesion, accion, paso) and accion == "agregar":
+                    # Sin la reserva nueva no hay qué editar ni eliminar en esta vuelta
+                    break
+
+    def ejecutar(self):
+        barrera = threading.Barrier(len(self.sesiones) + 1)
+        hilos = [threading.Thread(target=self.guion, args=(sesion, barrera), name=sesion.username)
+                 for sesion in self.sesiones]
+        salida = sys.stdout
+        self.salida = sys.stdout = SalidaSesiones(salida)
+        try:
+            for hilo in hilos:
+                hilo.start()
+            barrera.wait()
+            inicio = time.perf_counter()
+            for hilo in hilos:
+                hilo.join()
+            self.duracion = time.perf_counter() - inicio
+        finally:
+            sys.stdout = salida
+
+    def resultados(self):
+        total = sum(len(latencias) for latencias in self.latencias.values())
+        memoria = sorted(self.memoria_sesiones)
+        return {
+            "base": self.db_name,
+            "sesiones": self.cantidad_sesiones,
+            "iteraciones": self.iteraciones,
+            "duracion_s": round(self.duracion, 3),
+            "acciones": total,
+            "acciones_por_s": round(total / self.duracion, 2) if self.duracion else 0.0,
+            "latencias_ms": {
+                accion: {
+                    "cantidad": len(latencias),
+                    "p50": round(percentil(latencias, 50) * 1000, 1),
+                    "p95": round(percentil(latencias, 95) * 1000, 1),
+                    "p99": round(percentil(latencias, 99) * 1000, 1),
+                    "max": round(max(latencias, default=0.0) * 1000, 1),
+                }
+                for accion, latencias in self.latencias.items()
+            },
+            "reintentos_bloqueo": self.reintentos_bloqueo,
+            "acciones_bloqueadas": self.acciones_bloqueadas,
+            "errores": len(self.errores),
+            "memoria_sesion_kb": {
+                "mediana": round(percentil(memoria, 50) / 1024, 1),
+                "max": round(max(memoria, default=0) / 1024, 1),
+            },
+        }
+
+def percentil(valores, p):
+    """Percentil por rango más cercano; 0 si no hay valores"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[max(0, -(-len(ordenados) * p // 100) - 1)]
+
+def imprimir_informe(resultados, errores):
+    print(f"Base: {resultados['base']}")
+    print(f"{resultados['sesiones']} sesiones × {resultados['iteraciones']} iteraciones en "
+          f"{resultados['duracion_s']:.2f} s: {resultados['acciones']} acciones "
+          f"({resultados['acciones_por_s']:.1f} acciones/s)")
+    print()
+    print(f"{'Acción':<10}{'Cantidad':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}")
+    for accion, latencia in resultados["latencias_ms"].items():
+        print(f"{accion:<10}{latencia['cantidad']:>10}{latencia['p50']:>10.1f}{latencia['p95']:>10.1f}"
+              f"{latencia['p99']:>10.1f}{latencia['max']:>10.1f}")
+    print()
+    print(f"Reintentos por base bloqueada: {resultados['reintentos_bloqueo']} "
+          f"({resultados['acciones_bloqueadas']} acciones afectadas)")
+    print(f"Memoria por sesión: mediana {resultados['memoria_sesion_kb']['mediana']:.0f} KB, "
+          f"máxima {resultados['memoria_sesion_kb']['max']:.0f} KB")
+    print(f"Errores: {resultados['errores']}")
+    for username, accion, mensaje in errores[:10]:
+        print(f"❌ {username} ({accion}): {mensaje}")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones simultáneas de la interfaz")
+    parser.add_argument("--sesiones", type=int, default=10, help="Sesiones simultáneas")
+    parser.add_argument("--iteraciones", type=int, default=5, help="Vueltas de listar/agregar/editar/eliminar por sesión")
+    parser.add_argument("--pausa", type=float, default=0.0,
+                        help="Pausa media entre acciones en segundos (0: sin pausa, máxima presión)")
+    parser.add_argument("--reintentos", type=int, default=5, help="Reintentos de una acción si la base estaba bloqueada")
+    parser.add_argument("--memoria", action="store_true", help="Usar una base en memoria en lugar de un archivo temporal")
+    parser.add_argument("--db", help="Base descartable a usar (ruta o URI); nunca la de producción")
+    parser.add_argument("--json", action="store_true", help="Imprimir los resultados como JSON")
+    opciones = parser.parse_args(argumentos)
+
+    carpeta = None
+    if opciones.db:
+        db_name = opciones.db
+    elif opciones.memoria:
+        db_name = base_en_memoria()
+    else:
+        carpeta = tempfile.mkdtemp(prefix="carga-laboratorio-")
+        db_name = os.path.join(carpeta, "carga.db")
+
+    prueba = PruebaCarga(db_name, opciones.sesiones, opciones.iteraciones, opciones.pausa, opciones.reintentos)
+    try:
+        print(f"Preparando {opciones.sesiones} sesiones...", file=sys.stderr)
+        prueba.preparar()
+        print("Ejecutando...", file=sys.stderr)
+        prueba.ejecutar()
+        resultados = prueba.resultados()
+        if opciones.json:
+            print(json.dumps(resultados, ensure_ascii=False, indent=2))
+        else:
+            imprimir_informe(resultados, prueba.errores)
+    finally:
+        if carpeta:
+            shutil.rmtree(carpeta, ignore_errors=True)
+    return 1 if prueba.errores else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Ubicación de la base de datos: ruta, URI file: (solo lectura, opciones) o base compartida en memoria
+
+Todas las conexiones se abren con uri=True: una ruta común se usa tal cual y un nombre que
+empieza por "file:" se interpreta como URI de SQLite, por ejemplo
+    laboratorio.db
+    file:/srv/laboratorio/laboratorio.db?mode=ro
+    file:laboratorio?mode=memory&cache=shared
+"""
+import os
+import sqlite3
+import uuid
+from urllib.parse import parse_qsl, urlencode
+
+def conectar(db_name, **opciones):
+    """sqlite3.connect aceptando tanto rutas como URIs file:"""
+    return sqlite3.connect(db_name, uri=True, **opciones)
+
+def _partes(db_name):
+    """Separa (prefijo, ruta, parámetros) de una ruta o URI"""
+    if not db_name.startswith("file:"):
+        return "", db_name, {}
+    ruta, _, consulta = db_name[len("file:"):].partition("?")
+    prefijo = "file:"
+    if ruta.startswith("//"):
+        # file:///ruta/absoluta: la autoridad (vacía o localhost) queda en el prefijo
+        autoridad, barra, ruta = ruta[2:].partition("/")
+        prefijo, ruta = f"file://{autoridad}", barra + ruta
+    return prefijo, ruta, dict(parse_qsl(consulta))
+
+def en_memoria(db_name):
+    """True si la base vive en memoria y desaparece al cerrar su última conexión"""
+    _, ruta, parametros = _partes(db_name)
+    return ruta == ":memory:" or parametros.get("mode") == "memory"
+
+def solo_lectura(db_name):
+    """True si la URI abre la base sin permitir escrituras"""
+    _, _, parametros = _partes(db_name)
+    return parametros.get("mode") == "ro" or parametros.get("immutable") == "1"
+
+def ruta_archivo(db_name):
+    """Ruta en disco de la base, sin prefijo ni parámetros de la URI"""
+    return _partes(db_name)[1]
+
+def nombre_base(db_name):
+    """Nombre de la base sin carpeta ni extensión, para nombrar respaldos y derivados"""
+    return os.path.splitext(os.path.basename(ruta_archivo(db_name)))[0]
+
+def derivar(db_name, sufijo, **parametros):
+    """Nombre de una base hermana: agrega `sufijo` antes de la extensión y conserva el resto de la URI
+
+    derivar("laboratorio.db", "-lab2") es "laboratorio-lab2.db"; para una base en memoria el
+    resultado es otra base en memoria. Los `parametros` reemplazan a los de la URI original.
+    """
+    prefijo, ruta, actuales = _partes(db_name)
+    base, extension = os.path.splitext(ruta)
+    actuales.update(parametros)
+    ruta = f"{base}{sufijo}{extension}"
+    if not prefijo and not actuales:
+        return ruta
+    return f"{prefijo or 'file:'}{ruta}" + (f"?{urlencode(actuales)}" if actuales else "")
+
+def uri_solo_lectura(db_name):
+    """URI que abre la misma base en modo solo lectura (las bases en memoria quedan igual)"""
+    if en_memoria(db_name):
+        return db_name
+    prefijo, ruta, parametros = _partes(db_name)
+    parametros["mode"] = "ro"
+    return f"{prefijo or 'file:'}{ruta}?{urlencode(parametros)}"
+
+def base_en_memoria(nombre=None):
+    """URI de una base en memoria compartida entre las conexiones del proceso
+
+    Sin `nombre` se genera uno único, así cada llamada da una base vacía e independiente.
+    """
+    return f"file:{nombre or 'laboratorio-' + uuid.uuid4().hex}?mode=memory&cache=shared"
+
+def base_configurada():
+    """Base de datos a usar: LABORATORIO_DB (ruta o URI) o laboratorio.db en la carpeta actual
+
+    LABORATORIO_DB=:memory: es una única base en memoria para todo el proceso.
+    """
+    db_name = os.environ.get("LABORATORIO_DB") or "laboratorio.db"
+    return base_en_memoria("laboratorio") if db_name == ":memory:" else db_name
@@ -0,0 +1,35 @@
+"""Fixtures de pytest: cada prueba corre sobre su propia base en memoria, sin tocar laboratorio.db"""
+import os
+
+import pytest
+
+# Sin respaldos, mantenimiento ni réplicas en segundo plano mientras corren las pruebas
+os.environ.setdefault("LABORATORIO_RESPALDO_HORAS", "0")
+os.environ.setdefault("LABORATORIO_MANTENIMIENTO_HORAS", "0")
+os.environ.setdefault("LABORATORIO_REPLICA_SEGUNDOS", "0")
+
+from conexion import conectar
+from main import LaboratorioApp
+
+@pytest.fixture
+def app():
+    """LaboratorioApp sobre una base nueva en memoria compartida; se descarta al terminar la prueba"""
+    app = LaboratorioApp.crear_en_memoria()
+    yield app
+    app.auditoria.vaciar()
+    with LaboratorioApp._colas_lock:
+        cola = LaboratorioApp._colas.pop(app.db_name, None)
+    if cola is not None and cola.activa:
+        cola.detener()
+    with LaboratorioApp._auditorias_lock:
+        LaboratorioApp._auditorias.pop(app.db_name, None)
+    # Al cerrar la última conexión la base en memoria desaparece
+    with LaboratorioApp._memorias_lock:
+        LaboratorioApp._memorias.pop(app.db_name).close()
+
+@pytest.fixture
+def conn(app):
+    """Conexión directa a la base de la prueba, para revisar lo que quedó escrito"""
+    conn = conectar(app.db_name)
+    yield conn
+    conn.close()
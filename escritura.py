@@ -0,0 +1,160 @@
+"""Cola de escritura con un único hilo escritor que agrupa los commits"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from conexion import conectar
+
+class ColaEscritura:
+    """Agrupa las escrituras pendientes en una sola transacción por ciclo"""
+
+    def __init__(self, db_name, max_lote=100, espera=0.005):
+        self.db_name = db_name
+        self.max_lote = max_lote
+        self.espera = espera
+        self._pendientes = queue.Queue()
+        self._lock = threading.Lock()
+        self._estadisticas = {
+            "lotes": 0,
+            "escrituras": 0,
+            "errores": 0,
+            "ultimo_lote": 0,
+            "lote_maximo": 0,
+            "ultima_latencia_ms": 0.0,
+            "latencia_total_ms": 0.0,
+        }
+        self._activa = True
+        self._hilo = threading.Thread(target=self._ciclo, name="cola-escritura", daemon=True)
+        self._hilo.start()
+
+    @property
+    def activa(self):
+        """False una vez detenida o si el hilo escritor terminó"""
+        return self._activa and self._hilo.is_alive()
+
+    def enviar(self, operacion, *args):
+        """Encola `operacion(cursor, *args)` y devuelve un Future con su resultado"""
+        if not self.activa:
+            raise RuntimeError("La cola de escritura está detenida")
+        futuro = Future()
+        self._pendientes.put((operacion, args, futuro))
+        return futuro
+
+    def detener(self):
+        """Procesa lo pendiente y detiene el hilo escritor"""
+        self._activa = False
+        self._pendientes.put(None)
+        self._hilo.join()
+
+    def estadisticas(self):
+        """Devuelve el tamaño de lote y la latencia de commit acumulados"""
+        with self._lock:
+            estadisticas = dict(self._estadisticas)
+        lotes = max(estadisticas["lotes"], 1)
+        estadisticas["lote_promedio"] = round(estadisticas["escrituras"] / lotes, 2)
+        estadisticas["latencia_promedio_ms"] = round(estadisticas["latencia_total_ms"] / lotes, 2)
+        return estadisticas
+
+    def _tomar_lote(self):
+        """Espera la primera escritura y junta las que lleguen durante el ciclo"""
+        primera = self._pendientes.get()
+        if primera is None:
+            return None
+        lote = [primera]
+        limite = time.monotonic() + self.espera
+        while len(lote) < self.max_lote:
+            restante = limite - time.monotonic()
+            try:
+                pedido = self._pendientes.get(timeout=max(restante, 0)) if restante > 0 else self._pendientes.get_nowait()
+            except queue.Empty:
+                break
+            if pedido is None:
+                self._pendientes.put(None)
+                break
+            lote.append(pedido)
+        return lote
+
+    def _ciclo(self):
+        # Autocommit del módulo desactivado: las transacciones se manejan a mano
+        conn = conectar(self.db_name, isolation_level=None, check_same_thread=False)
+        cursor = conn.cursor()
+        try:
+            while True:
+                lote = self._tomar_lote()
+                if lote is None:
+                    break
+                try:
+                    self._procesar(conn, cursor, lote)
+                except Exception as e:
+                    # Un lote roto no puede llevarse puesto al hilo: los que esperan quedarían colgados
+                    print(f"❌ Error en la cola de escritura: {str(e)}")
+                    self._abortar(conn, cursor, lote, e)
+        finally:
+            self._activa = False
+            conn.close()
+
+    def _abortar(self, conn, cursor, lote, error):
+        """Falla los pedidos sin resolver del lote y deja la conexión fuera de transacción"""
+        if conn.in_transaction:
+            try:
+                cursor.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+        pendientes = [futuro for _, _, futuro in lote if not futuro.done()]
+        with self._lock:
+            self._estadisticas["errores"] += len(pendientes)
+        for futuro in pendientes:
+            futuro.set_exception(error)
+
+    def _procesar(self, conn, cursor, lote):
+        resultados = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            for _, _, futuro in lote:
+                futuro.set_exception(e)
+            return
+        for operacion, args, futuro in lote:
+            # Cada pedido en su savepoint: un error no deshace a los demás del lote
+            cursor.execute("SAVEPOINT pedido")
+            try:
+                resultados.append((futuro, True, operacion(cursor, *args)))
+                cursor.execute("RELEASE pedido")
+            except Exception as e:
+                try:
+                    cursor.execute("ROLLBACK TO pedido")
+                    cursor.execute("RELEASE pedido")
+                except sqlite3.Error:
+                    # SQLite ya deshizo toda la transacción (SQLITE_FULL, IOERR...): cae el lote entero
+                    self._abortar(conn, cursor, lote, e)
+                    return
+                resultados.append((futuro, False, e))
+
+        inicio = time.perf_counter()
+        try:
+            cursor.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                try:
+                    cursor.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            resultados = [(futuro, False, e) for futuro, _, _ in resultados]
+        latencia = (time.perf_counter() - inicio) * 1000
+
+        with self._lock:
+            self._estadisticas["lotes"] += 1
+            self._estadisticas["escrituras"] += len(lote)
+            self._estadisticas["errores"] += sum(1 for _, exito, _ in resultados if not exito)
+            self._estadisticas["ultimo_lote"] = len(lote)
+            self._estadisticas["lote_maximo"] = max(self._estadisticas["lote_maximo"], len(lote))
+            self._estadisticas["ultima_latencia_ms"] = round(latencia, 3)
+            self._estadisticas["latencia_total_ms"] += latencia
+
+        for futuro, exito, valor in resultados:
+            if exito:
+                futuro.set_result(valor)
+            else:
+                futuro.set_exception(valor)
@@ -0,0 +1,36 @@
+"""Filas de consultas como objetos livianos con atributos por nombre"""
+
+class Fila:
+    """Base de las filas: cada subclase declara en __slots__ las columnas que proyecta, en orden
+
+    Sin __dict__ por instancia, cada fila ocupa poco más que la tupla que devuelve sqlite3,
+    y el código que la usa lee atributos por nombre en lugar de desempaquetar por posición.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *valores):
+        for columna, valor in zip(self.__slots__, valores, strict=True):
+            setattr(self, columna, valor)
+
+    @classmethod
+    def columnas(cls):
+        """Lista de columnas para el SELECT que alimenta a esta clase"""
+        return ", ".join(cls.__slots__)
+
+    @classmethod
+    def fabrica(cls, cursor, fila):
+        """row_factory de sqlite3 que construye la fila directamente"""
+        return cls(*fila)
+
+    def como_dict(self):
+        return {columna: getattr(self, columna) for columna in self.__slots__}
+
+    def __eq__(self, otra):
+        return type(self) is type(otra) and all(
+            getattr(self, columna) == getattr(otra, columna) for columna in self.__slots__
+        )
+
+    def __repr__(self):
+        valores = ", ".join(f"{columna}={getattr(self, columna)!r}" for columna in self.__slots__)
+        return f"{type(self).__name__}({valores})"
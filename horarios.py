@@ -0,0 +1,61 @@
+"""Utilidades de horarios compartidas por la aplicación y los reportes"""
+from datetime import date, timedelta
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes"]
+
+# Rango horario de cada turno, en minutos desde la medianoche
+RANGOS_TURNO = {
+    "Mañana": (7 * 60, 13 * 60),
+    "Tarde": (13 * 60, 18 * 60),
+    "Noche": (18 * 60, 22 * 60),
+}
+
+def horario_a_minutos(horario):
+    """Convierte un horario 'HH:MM-HH:MM' en una tupla (inicio, fin) en minutos"""
+    try:
+        inicio, fin = horario.replace(" ", "").split("-", 1)
+        h_ini, m_ini = inicio.split(":")
+        h_fin, m_fin = fin.split(":")
+        inicio_min = int(h_ini) * 60 + int(m_ini)
+        fin_min = int(h_fin) * 60 + int(m_fin)
+    except (AttributeError, ValueError):
+        return None
+    if fin_min <= inicio_min:
+        return None
+    return inicio_min, fin_min
+
+def minutos_a_hora(minutos):
+    """Convierte minutos desde la medianoche al formato HH:MM"""
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+def mascara_minutos(inicio, fin):
+    """Devuelve un mapa de bits con los minutos [inicio, fin) encendidos"""
+    return ((1 << (fin - inicio)) - 1) << inicio
+
+def tramos_de_mascara(mascara):
+    """Recorre los tramos contiguos de minutos encendidos de un mapa de bits"""
+    while mascara:
+        inicio = (mascara & -mascara).bit_length() - 1
+        resto = mascara >> inicio
+        largo = (resto ^ (resto + 1)).bit_length() - 1
+        yield inicio, inicio + largo
+        mascara &= ~mascara_minutos(inicio, inicio + largo)
+
+def limites_semestre(fecha):
+    """Devuelve (inicio, fin) del semestre académico que contiene `fecha`"""
+    # El primer semestre termina el 15 de julio: del 16 en adelante ya es el segundo
+    if (fecha.month, fecha.day) <= (7, 15):
+        return date(fecha.year, 2, 1), date(fecha.year, 7, 15)
+    return date(fecha.year, 7, 16), date(fecha.year, 12, 20)
+
+def siguiente_semestre(fecha):
+    """Devuelve (inicio, fin) del semestre posterior al que contiene `fecha`"""
+    _, fin = limites_semestre(fecha)
+    if fin.month == 12:
+        return date(fin.year + 1, 2, 1), date(fin.year + 1, 7, 15)
+    return date(fin.year, 7, 16), date(fin.year, 12, 20)
+
+def fechas_del_dia(dia, desde, hasta):
+    """Devuelve las fechas entre `desde` y `hasta` que caen en el día de la semana `dia`"""
+    primera = desde + timedelta(days=(DIAS_SEMANA.index(dia) - desde.weekday()) % 7)
+    return [primera + timedelta(weeks=i) for i in range((hasta - primera).days // 7 + 1)] if primera <= hasta else []
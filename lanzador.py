@@ -0,0 +1,73 @@
+"""Lanzador de varios procesos worker sobre la misma laboratorio.db
+
+Cada worker corre main.py en modo servidor en su propio puerto (puerto base + índice).
+Las sesiones de Flet usan un websocket persistente, así que el balanceador de adelante
+debe mantener a cada cliente en el mismo worker (por ejemplo, ip_hash en nginx).
+
+Uso:
+    python lanzador.py --workers 4 --puerto 8550
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+class Lanzador:
+    """Arranca los workers, reinicia los que terminan y los detiene juntos"""
+
+    def __init__(self, workers, puerto, espera_reinicio=2):
+        self.workers = workers
+        self.puerto = puerto
+        self.espera_reinicio = espera_reinicio
+        self.procesos = {}
+        self.activo = True
+
+    def iniciar_worker(self, indice):
+        entorno = dict(os.environ)
+        # El worker 0 corre respaldos y mantenimiento; los demás solo atienden sesiones
+        entorno["LABORATORIO_WORKER"] = str(indice)
+        entorno["LABORATORIO_PUERTO"] = str(self.puerto + indice)
+        self.procesos[indice] = subprocess.Popen([sys.executable, MAIN], env=entorno)
+        print(f"Worker {indice} (pid {self.procesos[indice].pid}) en el puerto {self.puerto + indice}")
+
+    def detener(self, *args):
+        self.activo = False
+
+    def ejecutar(self):
+        signal.signal(signal.SIGINT, self.detener)
+        signal.signal(signal.SIGTERM, self.detener)
+        for indice in range(self.workers):
+            self.iniciar_worker(indice)
+        try:
+            while self.activo:
+                time.sleep(1)
+                for indice, proceso in list(self.procesos.items()):
+                    codigo = proceso.poll()
+                    if codigo is not None and self.activo:
+                        print(f"❌ Worker {indice} terminó con código {codigo}; reiniciando")
+                        time.sleep(self.espera_reinicio)
+                        self.iniciar_worker(indice)
+        finally:
+            for proceso in self.procesos.values():
+                if proceso.poll() is None:
+                    proceso.terminate()
+            for proceso in self.procesos.values():
+                try:
+                    proceso.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proceso.kill()
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Ejecuta varios workers del sistema de laboratorio")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Cantidad de procesos")
+    parser.add_argument("--puerto", type=int, default=8550, help="Puerto del worker 0")
+    opciones = parser.parse_args(argumentos)
+    Lanzador(opciones.workers, opciones.puerto).ejecutar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,63 +1,584 @@
 import flet as ft
 import sqlite3
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from auditoria import RegistroAuditoria, init_auditoria
+from busqueda import IndicePrefijos
+from cambios import init_cambios
+from conexion import base_configurada, base_en_memoria, conectar, derivar, en_memoria, ruta_archivo, solo_lectura
+from escritura import ColaEscritura
+from filas import Fila
+from horarios import (
+    DIAS_SEMANA, RANGOS_TURNO, horario_a_minutos, minutos_a_hora, mascara_minutos, tramos_de_mascara,
+    limites_semestre, siguiente_semestre, fechas_del_dia
+)
+from mantenimiento import (
+    ProgramadorMantenimiento, ejecutar_mantenimiento, init_mantenimiento, marcar_actividad, ultima_actividad
+)
+from replica import ReplicaLectura
+from respaldo import ProgramadorRespaldos, crear_respaldo, listar_respaldos, restaurar_respaldo
+
+class Reserva(Fila):
+    """Reserva completa, con los nombres de sus catálogos (edición, API, auditoría)"""
+    __slots__ = ("id", "dia", "turno", "docente", "carrera", "curso", "horario", "periodo",
+                 "fecha_inicio", "fecha_fin", "fecha_reserva")
+
+class ReservaListado(Fila):
+    """Solo las columnas que muestra el listado de reservas"""
+    __slots__ = ("id", "dia", "turno", "docente", "curso", "horario", "periodo", "fecha_reserva")
+
+# Columnas de reservas_detalle que componen una reserva completa
+COLUMNAS_RESERVA = Reserva.columnas()
+
+# Dimensiones con contadores en resumen_reservas y cómo obtener su nombre desde una fila de reservas
+DIMENSIONES_RESUMEN = {
+    "dia": "{fila}.dia",
+    "turno": "(SELECT nombre FROM turnos WHERE id = {fila}.turno_id)",
+    "carrera": "(SELECT nombre FROM carreras WHERE id = {fila}.carrera_id)",
+    "docente": "(SELECT nombre FROM docentes WHERE id = {fila}.docente_id)",
+}
+
+# Esquema de reservas: turno, docente y carrera son claves a sus catálogos
+ESQUEMA_RESERVAS = '''
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dia TEXT NOT NULL,
+        turno_id INTEGER NOT NULL REFERENCES turnos(id),
+        docente_id INTEGER NOT NULL REFERENCES docentes(id),
+        carrera_id INTEGER NOT NULL REFERENCES carreras(id),
+        curso TEXT NOT NULL,
+        horario TEXT NOT NULL,
+        periodo TEXT NOT NULL,
+        fecha_inicio DATE,
+        fecha_fin DATE,
+        fecha_reserva TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        usuario_id INTEGER REFERENCES usuarios(id) ON DELETE SET NULL
+    )
+'''
+
+# Tablas de catálogo referenciadas por reservas
+CATALOGOS = ("turnos", "carreras", "docentes")
+
+# Nombre del laboratorio cuyas reservas están en la base principal
+LABORATORIO_PRINCIPAL = "Laboratorio de Informática"
+
+# Bases que SQLite deja adjuntar a una conexión (SQLITE_MAX_ATTACHED por defecto)
+MAXIMO_ADJUNTOS = 10
+
+# Roles de usuario admitidos
+ROLES = ("admin", "usuario")
+
+# Usuarios por página en la gestión de usuarios
+TAMANO_PAGINA_USUARIOS = 25
+
+# Columnas de usuarios en las que busca la gestión de usuarios (por prefijo)
+COLUMNAS_BUSQUEDA_USUARIOS = ("username", "nombre", "email")
+
+# Con menos contraseñas que esto, arrancar el pool de procesos cuesta más que hashear en serie
+MINIMO_HASH_PARALELO = 64
+
+def hashear_password(password):
+    """Hash de una contraseña; función de módulo para poder repartirla entre procesos"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+# Campos de texto obligatorios de una reserva recibida desde afuera (API, lotes)
+CAMPOS_RESERVA = ("dia", "turno", "docente", "carrera", "curso", "horario", "periodo")
+
+def validar_reserva(datos):
+    """Revisa una reserva recibida como diccionario y la devuelve con las fechas normalizadas
+
+    Lanza ValueError con el motivo si falta un campo, si el día, el turno o el horario no
+    son válidos o si las fechas no forman un rango YYYY-MM-DD.
+    """
+    if not isinstance(datos, dict):
+        raise ValueError("cada reserva debe ser un objeto")
+    vacios = [campo for campo in CAMPOS_RESERVA if not isinstance(datos.get(campo), str) or not datos[campo].strip()]
+    if vacios:
+        raise ValueError(f"falta el campo {vacios[0]}")
+    if datos["dia"] not in DIAS_SEMANA:
+        raise ValueError(f"día desconocido {datos['dia']}")
+    if datos["turno"] not in RANGOS_TURNO:
+        raise ValueError(f"turno desconocido {datos['turno']}")
+    if horario_a_minutos(datos["horario"]) is None:
+        raise ValueError(f"horario inválido {datos['horario']}; use HH:MM-HH:MM")
+    fecha_inicio, fecha_fin = datos.get("fecha_inicio"), datos.get("fecha_fin")
+    if bool(fecha_inicio) != bool(fecha_fin):
+        raise ValueError("fecha_inicio y fecha_fin van juntas")
+    if fecha_inicio:
+        try:
+            fecha_inicio = datetime.strptime(fecha_inicio, "%Y-%m-%d").date()
+            fecha_fin = datetime.strptime(fecha_fin, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            raise ValueError("las fechas deben tener el formato YYYY-MM-DD")
+        if fecha_fin < fecha_inicio:
+            raise ValueError("la fecha de fin es anterior a la de inicio")
+        fecha_inicio, fecha_fin = fecha_inicio.isoformat(), fecha_fin.isoformat()
+    return {**datos, "fecha_inicio": fecha_inicio or None, "fecha_fin": fecha_fin or None}
+
+# Segundos entre sondeos de cambios de la pantalla de kiosco
+INTERVALO_KIOSCO = 5
+
+CARRERAS_PREDETERMINADAS = ["Ingenieria Comercial", "Empresariales", "ADM. De Empresas", "Contabilidad", "Economia"]
 
 class LaboratorioApp:
-    def __init__(self):
-        self.db_name = "laboratorio.db"
-        self.init_db()
+    # Caché de ocupación semanal compartida por todas las sesiones del proceso
+    _cache_ocupacion = {}
+    _cache_lock = threading.Lock()
+    # Catálogos (nombre -> id) por base de datos, cargados una vez por proceso
+    _catalogos = {}
+    _catalogos_lock = threading.Lock()
+    # Índices de autocompletado de docentes por base de datos
+    _indices_docentes = {}
+    # Generación de escrituras del proceso: cambia con cada alta, edición o baja de reservas
+    _generacion = 0
+    _generacion_lock = threading.Lock()
+    # Solicitudes atendidas por el proceso, de lectura o escritura: el mantenimiento espera a que dejen de llegar
+    _solicitudes = 0
+    # Último aviso de actividad a los demás procesos, por base de datos, y el intervalo mínimo entre avisos
+    _avisos_actividad = {}
+    INTERVALO_AVISO_ACTIVIDAD = 1.0
+    # Coherencia entre procesos: por base de datos, una conexión propia para PRAGMA data_version
+    # y las últimas (data_version, versión de catálogos, momento del chequeo) observadas
+    _coherencia = {}
+    _coherencia_lock = threading.Lock()
+    # Intervalo mínimo entre chequeos, en segundos: acota el atraso de las cachés entre procesos
+    INTERVALO_COHERENCIA = 0.5
+    # Colas de escritura compartidas por todas las sesiones del proceso, por base de datos
+    _colas = {}
+    _colas_lock = threading.Lock()
+    # Registros de auditoría compartidos por todas las sesiones del proceso, por base de datos
+    _auditorias = {}
+    _auditorias_lock = threading.Lock()
+    # Conexiones que mantienen vivas las bases en memoria mientras dure el proceso
+    _memorias = {}
+    _memorias_lock = threading.Lock()
+    # Programadores de respaldos en caliente, uno por base de datos
+    _programadores = {}
+    _programadores_lock = threading.Lock()
+    # Programadores de mantenimiento (ANALYZE, incremental_vacuum, quick_check), uno por base de datos
+    _mantenimientos = {}
+    # Réplicas de solo lectura para reportes, una por base de datos, creadas al primer reporte
+    _replicas = {}
+
+    def __init__(self, db_name=None, db_usuarios=None):
+        # Ruta o URI de la base; sin indicarla se toma LABORATORIO_DB o laboratorio.db
+        db_name = db_name or base_configurada()
+        if db_name == ":memory:":
+            # Cada conexión a ":memory:" sería una base distinta: se usa una compartida con nombre
+            db_name = base_en_memoria()
+        # Usuarios y laboratorios viven en la base principal; las reservas, en la del laboratorio activo
+        self.db_usuarios = db_usuarios or db_name
+        self.laboratorio_id = 1
+        # (id, username) del usuario de la sesión; queda en la auditoría de cada cambio
+        self.actor = None
+        self.abrir_base(db_name)
+
+    def abrir_base(self, db_name):
+        """Prepara la base `db_name` y los servicios de fondo asociados a ella"""
+        self.db_name = db_name
+        if en_memoria(db_name):
+            # Una base en memoria desaparece al cerrarse su última conexión; esta queda abierta
+            with LaboratorioApp._memorias_lock:
+                if db_name not in LaboratorioApp._memorias:
+                    LaboratorioApp._memorias[db_name] = conectar(db_name, check_same_thread=False)
+        # En solo lectura el esquema ya tiene que existir
+        if not solo_lectura(db_name):
+            self.init_db()
+        # Con LABORATORIO_COLA_ESCRITURA=1 las escrituras se agrupan en un solo commit por ciclo
+        self.cola_escritura = self.obtener_cola_escritura() if os.environ.get("LABORATORIO_COLA_ESCRITURA") else None
+        self.auditoria = self.obtener_registro_auditoria()
+        # LABORATORIO_RESPALDO_HORAS fija cada cuántas horas se respalda la base (0 lo desactiva)
+        # Con varios procesos (lanzador.py) solo el worker 0 corre las tareas de fondo,
+        # y nunca sobre bases en memoria o de solo lectura
+        principal = (os.environ.get("LABORATORIO_WORKER", "0") == "0"
+                     and not en_memoria(db_name) and not solo_lectura(db_name))
+        horas_respaldo = float(os.environ.get("LABORATORIO_RESPALDO_HORAS", "6"))
+        if horas_respaldo > 0 and principal:
+            self.iniciar_respaldos(horas_respaldo * 3600)
+        # LABORATORIO_MANTENIMIENTO_HORAS: intervalo mínimo entre mantenimientos (0 lo desactiva)
+        horas_mantenimiento = float(os.environ.get("LABORATORIO_MANTENIMIENTO_HORAS", "24"))
+        if horas_mantenimiento > 0 and principal:
+            self.iniciar_mantenimiento(horas_mantenimiento * 3600)
+
+    @classmethod
+    def crear_en_memoria(cls, nombre=None):
+        """App sobre una base nueva en memoria compartida, aislada de laboratorio.db (pruebas y benchmarks)"""
+        return cls(base_en_memoria(nombre))
+
+    def obtener_cola_escritura(self, db_name=None):
+        """Devuelve la cola de escritura compartida de esta base de datos"""
+        db_name = db_name or self.db_name
+        with LaboratorioApp._colas_lock:
+            # Si el hilo escritor terminó, la próxima escritura arranca una cola nueva
+            if db_name not in LaboratorioApp._colas or not LaboratorioApp._colas[db_name].activa:
+                LaboratorioApp._colas[db_name] = ColaEscritura(db_name)
+            return LaboratorioApp._colas[db_name]
+
+    def obtener_registro_auditoria(self):
+        """Devuelve el registro de auditoría compartido de esta base de datos"""
+        with LaboratorioApp._auditorias_lock:
+            if self.db_name not in LaboratorioApp._auditorias:
+                LaboratorioApp._auditorias[self.db_name] = RegistroAuditoria(self.db_name)
+            return LaboratorioApp._auditorias[self.db_name]
+
+    def iniciar_respaldos(self, intervalo):
+        """Arranca, una sola vez por proceso, el respaldo periódico de esta base de datos"""
+        with LaboratorioApp._programadores_lock:
+            if self.db_name not in LaboratorioApp._programadores:
+                LaboratorioApp._programadores[self.db_name] = ProgramadorRespaldos(self.db_name, intervalo)
+
+    def iniciar_mantenimiento(self, intervalo):
+        """Arranca, una sola vez por proceso, el mantenimiento en los períodos sin escrituras"""
+        with LaboratorioApp._programadores_lock:
+            if self.db_name not in LaboratorioApp._mantenimientos:
+                # La marca se fija a esta base: la instancia puede cambiar luego de laboratorio
+                db_name = self.db_name
+                LaboratorioApp._mantenimientos[db_name] = ProgramadorMantenimiento(
+                    db_name, lambda: self.obtener_marca_actividad(db_name), intervalo
+                )
+
+    def obtener_replica(self):
+        """Réplica de lectura de esta base; None si LABORATORIO_REPLICA_SEGUNDOS=0"""
+        intervalo = float(os.environ.get("LABORATORIO_REPLICA_SEGUNDOS", "60"))
+        if intervalo <= 0 or en_memoria(self.db_name):
+            return None
+        with LaboratorioApp._programadores_lock:
+            if self.db_name not in LaboratorioApp._replicas:
+                # Cada worker refresca su propio archivo de réplica
+                worker = os.environ.get("LABORATORIO_WORKER")
+                ruta = ruta_archivo(derivar(self.db_name, f"-replica-{worker}")) if worker else None
+                # El atraso máximo tolerado es de dos intervalos de refresco
+                LaboratorioApp._replicas[self.db_name] = ReplicaLectura(self.db_name, ruta, intervalo=intervalo,
+                                                                        max_atraso=2 * intervalo)
+            return LaboratorioApp._replicas[self.db_name]
+
+    def consultar_en_replica(self, consulta):
+        """Ejecuta `consulta(conn)` en la réplica de lectura; devuelve (resultado, segundos de atraso)
+
+        Sin réplica se usa una conexión a la base principal y el atraso es 0.
+        """
+        self.registrar_solicitud()
+        replica = self.obtener_replica()
+        if replica is None:
+            conn = conectar(self.db_name)
+            try:
+                return consulta(conn), 0
+            finally:
+                conn.close()
+        with replica.conexion() as conn:
+            return consulta(conn), replica.atraso()
+
+    def ejecutar_escritura(self, operacion, *args, db_name=None):
+        """Ejecuta `operacion(cursor, *args)` en una transacción y devuelve su resultado"""
+        db_name = db_name or self.db_name
+        if self.cola_escritura is not None:
+            return self.obtener_cola_escritura(db_name).enviar(operacion, *args).result()
+        conn = conectar(db_name)
+        try:
+            resultado = operacion(conn.cursor(), *args)
+            conn.commit()
+            return resultado
+        finally:
+            conn.close()
         
     def init_db(self):
         """Inicializa la base de datos"""
-        conn = sqlite3.connect(self.db_name)
+        conn = conectar(self.db_name)
         cursor = conn.cursor()
         
+        # Tabla de usuarios: solo en la base principal; los demás laboratorios guardan solo reservas
+        if self.db_name == self.db_usuarios:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS usuarios (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    password TEXT NOT NULL,
+                    nombre TEXT NOT NULL,
+                    email TEXT,
+                    rol TEXT DEFAULT 'usuario',
+                    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Insertar usuario administrador por defecto si no existe
+            cursor.execute('SELECT COUNT(*) FROM usuarios WHERE username = ?', ('admin',))
+            if cursor.fetchone()[0] == 0:
+                password_hash = self.hash_password('admin123')
+                cursor.execute('''
+                    INSERT INTO usuarios (username, password, nombre, email, rol)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', ('admin', password_hash, 'Administrador', 'admin@laboratorio.com', 'admin'))
+            self.init_busqueda_usuarios(cursor)
+        
+        # Laboratorios: el 1 es la base principal; cada uno de los demás tiene su propio archivo
+        if self.db_name == self.db_usuarios:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS laboratorios (
+                    id INTEGER PRIMARY KEY,
+                    nombre TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                    archivo TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('INSERT OR IGNORE INTO laboratorios (id, nombre, archivo) VALUES (1, ?, ?)',
+                           (LABORATORIO_PRINCIPAL, self.db_name))
+        
+        # Catálogos de turnos, carreras y docentes
+        for tabla in CATALOGOS:
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {tabla} (
+                    id INTEGER PRIMARY KEY,
+                    nombre TEXT NOT NULL UNIQUE COLLATE NOCASE
+                )
+            ''')
+        cursor.executemany('INSERT OR IGNORE INTO turnos (nombre) VALUES (?)', [(turno,) for turno in RANGOS_TURNO])
+        cursor.executemany('INSERT OR IGNORE INTO carreras (nombre) VALUES (?)', [(carrera,) for carrera in CARRERAS_PREDETERMINADAS])
+        
         # Tabla de reservas
+        cursor.execute(ESQUEMA_RESERVAS.format(tabla='reservas'))
+        
+        cursor.execute('PRAGMA table_info(reservas)')
+        columnas = [columna[1] for columna in cursor.fetchall()]
+        
+        # Migración: dueño de cada reserva, asignado por coincidencia de nombre con el docente
+        if 'usuario_id' not in columnas:
+            cursor.execute('ALTER TABLE reservas ADD COLUMN usuario_id INTEGER REFERENCES usuarios(id) ON DELETE SET NULL')
+            cursor.execute('''
+                UPDATE reservas SET usuario_id = (
+                    SELECT u.id FROM usuarios u
+                    WHERE lower(trim(u.nombre)) = lower(trim(reservas.docente))
+                    ORDER BY u.id LIMIT 1
+                )
+                WHERE usuario_id IS NULL
+            ''')
+        
+        # Migración: reemplazar los textos repetidos por claves a los catálogos
+        if 'carrera' in columnas:
+            self.normalizar_reservas(cursor)
+        
+        # Vista con los nombres de catálogo, en las columnas que esperan los listados
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS reservas_detalle AS
+            SELECT r.id, r.dia, t.nombre AS turno, d.nombre AS docente, c.nombre AS carrera,
+                   r.curso, r.horario, r.periodo, r.fecha_inicio, r.fecha_fin, r.fecha_reserva,
+                   r.usuario_id, r.turno_id, r.docente_id, r.carrera_id
+            FROM reservas r
+            JOIN turnos t ON t.id = r.turno_id
+            JOIN docentes d ON d.id = r.docente_id
+            JOIN carreras c ON c.id = r.carrera_id
+        ''')
+        
+        # Índice para las búsquedas por día (también sirve al ORDER BY dia, horario)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reservas_dia_horario ON reservas(dia, horario)')
+        # Índice para listar las reservas de un usuario en el orden de la vista
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reservas_usuario ON reservas(usuario_id, dia, horario)')
+        # Índice para los filtros por docente (comparación de enteros)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reservas_docente ON reservas(docente_id)')
+        
+        # Versión de los datos: la incrementan los triggers en cada cambio de reservas
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reservas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                dia TEXT NOT NULL,
-                turno TEXT NOT NULL,
-                docente TEXT NOT NULL,
-                carrera TEXT NOT NULL,
-                curso TEXT NOT NULL,
-                horario TEXT NOT NULL,
-                periodo TEXT NOT NULL,
-                fecha_inicio DATE,
-                fecha_fin DATE,
-                fecha_reserva TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            CREATE TABLE IF NOT EXISTS version_datos (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
             )
         ''')
+        cursor.execute('INSERT OR IGNORE INTO version_datos (id, version) VALUES (1, 0)')
+        for operacion in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_reservas_version_{operacion.lower()}
+                AFTER {operacion} ON reservas
+                BEGIN
+                    UPDATE version_datos SET version = version + 1 WHERE id = 1;
+                END
+            ''')
         
-        # Tabla de usuarios
+        # Versión de los catálogos y de los nombres de usuario: avisa a los demás procesos que
+        # descarten su caché de catálogos y su índice de docentes
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                nombre TEXT NOT NULL,
-                email TEXT,
-                rol TEXT DEFAULT 'usuario',
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            CREATE TABLE IF NOT EXISTS version_catalogos (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
             )
         ''')
+        cursor.execute('INSERT OR IGNORE INTO version_catalogos (id, version) VALUES (1, 0)')
+        tablas_versionadas = (*CATALOGOS, "usuarios") if self.db_name == self.db_usuarios else CATALOGOS
+        for tabla in tablas_versionadas:
+            for operacion in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{tabla}_version_{operacion.lower()}
+                    AFTER {operacion} ON {tabla}
+                    BEGIN
+                        UPDATE version_catalogos SET version = version + 1 WHERE id = 1;
+                    END
+                ''')
         
-        # Insertar usuario administrador por defecto si no existe
-        cursor.execute('SELECT COUNT(*) FROM usuarios WHERE username = ?', ('admin',))
-        if cursor.fetchone()[0] == 0:
-            password_hash = self.hash_password('admin123')
-            cursor.execute('''
-                INSERT INTO usuarios (username, password, nombre, email, rol)
-                VALUES (?, ?, ?, ?, ?)
-            ''', ('admin', password_hash, 'Administrador', 'admin@laboratorio.com', 'admin'))
+        self.init_resumen(cursor)
+        self.init_ocurrencias(cursor)
+        init_auditoria(cursor)
+        init_mantenimiento(cursor)
+        # Los usuarios solo existen en la base principal
+        init_cambios(cursor, ("reservas", "usuarios") if self.db_name == self.db_usuarios else ("reservas",))
         
         conn.commit()
         conn.close()
 
+    def normalizar_reservas(self, cursor):
+        """Migra reservas con textos de turno, docente y carrera a claves de catálogo"""
+        # Los catálogos son UNIQUE COLLATE NOCASE: los duplicados se unifican al insertar
+        for tabla, columna in (("turnos", "turno"), ("docentes", "docente"), ("carreras", "carrera")):
+            cursor.execute(f'INSERT OR IGNORE INTO {tabla} (nombre) SELECT DISTINCT trim({columna}) FROM reservas')
+        
+        cursor.execute('DROP VIEW IF EXISTS reservas_detalle')
+        cursor.execute(ESQUEMA_RESERVAS.format(tabla='reservas_nueva'))
+        cursor.execute('''
+            INSERT INTO reservas_nueva (id, dia, turno_id, docente_id, carrera_id, curso, horario,
+                                        periodo, fecha_inicio, fecha_fin, fecha_reserva, usuario_id)
+            SELECT r.id, r.dia, t.id, d.id, c.id, r.curso, r.horario,
+                   r.periodo, r.fecha_inicio, r.fecha_fin, r.fecha_reserva, r.usuario_id
+            FROM reservas r
+            JOIN turnos t ON t.nombre = trim(r.turno)
+            JOIN docentes d ON d.nombre = trim(r.docente)
+            JOIN carreras c ON c.nombre = trim(r.carrera)
+        ''')
+        # Al eliminar la tabla vieja se eliminan también sus índices y triggers
+        cursor.execute('DROP TABLE reservas')
+        cursor.execute('ALTER TABLE reservas_nueva RENAME TO reservas')
+
+    def init_busqueda_usuarios(self, cursor):
+        """Crea los índices de búsqueda de usuarios y el contador por rol que mantienen los triggers"""
+        # NOCASE para buscar por prefijo sin distinguir mayúsculas, recorriendo solo el rango del índice
+        for columna in COLUMNAS_BUSQUEDA_USUARIOS:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_usuarios_{columna} ON usuarios({columna} COLLATE NOCASE)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_usuarios_rol ON usuarios(rol, username)')
+        
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'resumen_usuarios'")
+        existia = cursor.fetchone()[0]
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS resumen_usuarios (
+                rol TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        if not existia:
+            cursor.execute("INSERT INTO resumen_usuarios SELECT COALESCE(rol, ''), COUNT(*) FROM usuarios GROUP BY 1")
+        
+        def sumar(fila, delta):
+            return f'''
+                INSERT INTO resumen_usuarios (rol, total) VALUES (COALESCE({fila}.rol, ''), {delta})
+                ON CONFLICT (rol) DO UPDATE SET total = total + ({delta});
+            '''
+        
+        cuerpos = {
+            "insert": sumar("NEW", 1),
+            "update OF rol": sumar("OLD", -1) + sumar("NEW", 1),
+            "delete": sumar("OLD", -1),
+        }
+        for operacion, cuerpo in cuerpos.items():
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_usuarios_resumen_{operacion.split()[0]}
+                AFTER {operacion.upper()} ON usuarios
+                BEGIN
+                    {cuerpo}
+                END
+            ''')
+
+    def init_resumen(self, cursor):
+        """Crea las tablas de resumen de reservas y los triggers que las mantienen"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS resumen_reservas (
+                dimension TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, valor)
+            ) WITHOUT ROWID
+        ''')
+        
+        cursor.execute("SELECT COUNT(*) FROM resumen_reservas WHERE dimension = 'total'")
+        if cursor.fetchone()[0] == 0:
+            # Primera vez: cargar los contadores a partir de las reservas existentes
+            cursor.execute("INSERT INTO resumen_reservas SELECT 'total', '', COUNT(*) FROM reservas")
+            for columna in DIMENSIONES_RESUMEN:
+                cursor.execute(f'''
+                    INSERT INTO resumen_reservas
+                    SELECT '{columna}', {columna}, COUNT(*) FROM reservas_detalle GROUP BY {columna}
+                ''')
+        
+        def sumar(fila, delta):
+            sentencias = [f"UPDATE resumen_reservas SET total = total + ({delta}) WHERE dimension = 'total';"]
+            for columna, expresion in DIMENSIONES_RESUMEN.items():
+                sentencias.append(f'''
+                    INSERT INTO resumen_reservas (dimension, valor, total) VALUES ('{columna}', {expresion.format(fila=fila)}, {delta})
+                    ON CONFLICT (dimension, valor) DO UPDATE SET total = total + ({delta});
+                ''')
+            return "\n".join(sentencias)
+        
+        limpiar = "DELETE FROM resumen_reservas WHERE total <= 0 AND dimension <> 'total';"
+        cuerpos = {
+            "insert": sumar("NEW", 1),
+            "update": sumar("OLD", -1) + sumar("NEW", 1) + limpiar,
+            "delete": sumar("OLD", -1) + limpiar,
+        }
+        for operacion, cuerpo in cuerpos.items():
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_reservas_resumen_{operacion}
+                AFTER {operacion.upper()} ON reservas
+                BEGIN
+                    {cuerpo}
+                END
+            ''')
+
+    def init_ocurrencias(self, cursor):
+        """Crea la tabla de ocurrencias (una fila por fecha concreta de cada reserva)"""
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'ocurrencias'")
+        existia = cursor.fetchone()[0] > 0
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ocurrencias (
+                reserva_id INTEGER NOT NULL REFERENCES reservas(id) ON DELETE CASCADE,
+                fecha DATE NOT NULL,
+                inicio INTEGER NOT NULL,
+                fin INTEGER NOT NULL,
+                PRIMARY KEY (reserva_id, fecha)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ocurrencias_fecha_inicio ON ocurrencias(fecha, inicio)')
+        
+        if not existia:
+            cursor.execute('SELECT id, dia, horario, fecha_inicio, fecha_fin, fecha_reserva FROM reservas')
+            for id_reserva, dia, horario, fecha_inicio, fecha_fin, fecha_reserva in cursor.fetchall():
+                referencia = date.fromisoformat(fecha_reserva[:10]) if fecha_reserva else date.today()
+                self.generar_ocurrencias(cursor, id_reserva, dia, horario, fecha_inicio, fecha_fin, referencia)
+
+    def generar_ocurrencias(self, cursor, id_reserva, dia, horario, fecha_inicio=None, fecha_fin=None, referencia=None,
+                            semestre=None):
+        """Regenera en bloque las ocurrencias de una reserva dentro de la transacción de `cursor`
+
+        Las de todo el semestre ocupan `semestre` (inicio, fin) o, sin indicarlo, el semestre de `referencia`.
+        """
+        cursor.execute('DELETE FROM ocurrencias WHERE reserva_id = ?', (id_reserva,))
+        
+        intervalo = horario_a_minutos(horario)
+        if not intervalo or dia not in DIAS_SEMANA:
+            return
+        
+        if fecha_inicio and fecha_fin:
+            desde, hasta = date.fromisoformat(fecha_inicio), date.fromisoformat(fecha_fin)
+        else:
+            # Reservas de todo el semestre: el semestre vigente al momento de reservar
+            desde, hasta = semestre or limites_semestre(referencia or date.today())
+        
+        cursor.executemany(
+            'INSERT INTO ocurrencias (reserva_id, fecha, inicio, fin) VALUES (?, ?, ?, ?)',
+            [(id_reserva, fecha.isoformat(), *intervalo) for fecha in fechas_del_dia(dia, desde, hasta)]
+        )
+
     def hash_password(self, password):
         """Encripta la contraseña usando SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        return hashear_password(password)
 
     def verificar_password(self, password, password_hash):
         """Verifica si la contraseña coincide con el hash"""
@@ -68,27 +589,111 @@ class LaboratorioApp:
     def agregar_usuario(self, username, password, nombre, email=None, rol='usuario'):
         """Agrega un nuevo usuario a la base de datos"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
             password_hash = self.hash_password(password)
             
-            cursor.execute('''
-                INSERT INTO usuarios (username, password, nombre, email, rol)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (username, password_hash, nombre, email, rol))
+            def insertar(cursor):
+                cursor.execute('''
+                    INSERT INTO usuarios (username, password, nombre, email, rol)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (username, password_hash, nombre, email, rol))
+                
+                # Asignar al nuevo usuario las reservas sin dueño cargadas a su nombre
+                cursor.execute('''
+                    UPDATE reservas SET usuario_id = ?
+                    WHERE usuario_id IS NULL
+                      AND docente_id IN (SELECT id FROM docentes WHERE nombre = trim(?))
+                ''', (cursor.lastrowid, nombre))
+                return cursor.lastrowid
             
-            conn.commit()
-            conn.close()
+            id_usuario = self.ejecutar_escritura(insertar, db_name=self.db_usuarios)
+            # Lo mismo en los demás laboratorios, cada uno en su archivo
+            for id_laboratorio, _, archivo in self.obtener_laboratorios():
+                if id_laboratorio != 1:
+                    conn = conectar(archivo)
+                    conn.execute('''
+                        UPDATE reservas SET usuario_id = ?
+                        WHERE usuario_id IS NULL
+                          AND docente_id IN (SELECT id FROM docentes WHERE nombre = trim(?))
+                    ''', (id_usuario, nombre))
+                    conn.commit()
+                    conn.close()
+            self.indexar_docente(nombre)
             return True, "Usuario agregado exitosamente"
         except sqlite3.IntegrityError:
             return False, "El nombre de usuario ya existe"
         except Exception as e:
             return False, f"Error al agregar usuario: {str(e)}"
 
+    def agregar_usuarios(self, usuarios, procesos=None):
+        """Da de alta muchos usuarios en una sola transacción
+
+        `usuarios` es una lista de diccionarios con username, password, nombre y opcionalmente
+        email y rol. Las contraseñas se hashean en paralelo con `procesos` procesos (por defecto
+        uno por núcleo). Devuelve (creados, duplicados): los nombres de usuario dados de alta y
+        los que ya existían o estaban repetidos en la lista, que se omiten.
+        """
+        vistos = set()
+        nuevos, duplicados = [], []
+        for usuario in usuarios:
+            if usuario["username"] in vistos:
+                duplicados.append(usuario["username"])
+            else:
+                vistos.add(usuario["username"])
+                nuevos.append(usuario)
+        
+        conn = conectar(self.db_usuarios)
+        cursor = conn.cursor()
+        # Los existentes se descartan antes de hashear, que es la parte cara
+        cursor.execute('SELECT username FROM usuarios WHERE username IN (SELECT value FROM json_each(?))',
+                       (json.dumps(sorted(vistos)),))
+        existentes = {fila[0] for fila in cursor.fetchall()}
+        conn.close()
+        duplicados.extend(usuario["username"] for usuario in nuevos if usuario["username"] in existentes)
+        nuevos = [usuario for usuario in nuevos if usuario["username"] not in existentes]
+        if not nuevos:
+            return [], duplicados
+        
+        passwords = [usuario["password"] for usuario in nuevos]
+        if len(passwords) < MINIMO_HASH_PARALELO:
+            hashes = [hashear_password(password) for password in passwords]
+        else:
+            procesos = procesos or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                hashes = list(pool.map(hashear_password, passwords, chunksize=max(1, len(passwords) // (procesos * 4))))
+        
+        def insertar(cursor):
+            cursor.executemany('''
+                INSERT INTO usuarios (username, password, nombre, email, rol)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(usuario["username"], password_hash, usuario["nombre"], usuario.get("email"), usuario.get("rol") or 'usuario')
+                  for usuario, password_hash in zip(nuevos, hashes)])
+            cursor.execute('SELECT id, nombre FROM usuarios WHERE username IN (SELECT value FROM json_each(?))',
+                           (json.dumps([usuario["username"] for usuario in nuevos]),))
+            return cursor.fetchall()
+        
+        try:
+            ids_nombres = self.ejecutar_escritura(insertar, db_name=self.db_usuarios)
+        except sqlite3.IntegrityError:
+            # Otro proceso dio de alta alguno de estos nombres entre la consulta y el INSERT
+            return [], duplicados + [usuario["username"] for usuario in nuevos]
+        
+        # Como en agregar_usuario: las reservas sin dueño cargadas a su nombre pasan a ser suyas
+        for _, _, archivo in self.obtener_laboratorios():
+            conn = conectar(archivo)
+            conn.executemany('''
+                UPDATE reservas SET usuario_id = ?
+                WHERE usuario_id IS NULL
+                  AND docente_id IN (SELECT id FROM docentes WHERE nombre = trim(?))
+            ''', ids_nombres)
+            conn.commit()
+            conn.close()
+        for _, nombre in ids_nombres:
+            self.indexar_docente(nombre)
+        return [usuario["username"] for usuario in nuevos], duplicados
+
     def obtener_usuarios(self):
         """Obtiene todos los usuarios"""
-        conn = sqlite3.connect(self.db_name)
+        conn = conectar(self.db_usuarios)
         cursor = conn.cursor()
         
         cursor.execute('SELECT id, username, nombre, email, rol, fecha_creacion FROM usuarios ORDER BY username')
@@ -96,9 +701,71 @@ class LaboratorioApp:
         conn.close()
         return usuarios
 
+    def buscar_usuarios(self, texto="", rol=None, despues_de=None, limite=25):
+        """Página de usuarios ordenada por username, a partir del username `despues_de`
+
+        `texto` filtra por prefijo de username, nombre o email sin distinguir mayúsculas; cada
+        columna se recorre solo en el rango de su índice, así el costo depende de cuántos usuarios
+        coinciden y no del total.
+        """
+        condiciones, parametros = self.condiciones_usuarios(texto, rol)
+        parametros["limite"] = limite
+        if despues_de is not None:
+            condiciones.append("username > :despues_de")
+            parametros["despues_de"] = despues_de
+        filtro = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        
+        conn = conectar(self.db_usuarios)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT id, username, nombre, email, rol, fecha_creacion FROM usuarios
+            {filtro}
+            ORDER BY username
+            LIMIT :limite
+        ''', parametros)
+        usuarios = cursor.fetchall()
+        conn.close()
+        return usuarios
+
+    def condiciones_usuarios(self, texto="", rol=None):
+        """Condiciones y parámetros del filtro de usuarios por prefijo de texto y rol"""
+        condiciones, parametros = [], {}
+        texto = texto.strip()
+        if texto:
+            # Todo texto que empiece por el prefijo queda entre el prefijo y el prefijo seguido del mayor carácter
+            parametros.update(desde=texto, hasta=texto + "\U0010ffff")
+            rangos = " UNION ".join(
+                f"SELECT id FROM usuarios WHERE {columna} COLLATE NOCASE >= :desde AND {columna} COLLATE NOCASE < :hasta"
+                for columna in COLUMNAS_BUSQUEDA_USUARIOS
+            )
+            condiciones.append(f"id IN ({rangos})")
+        if rol:
+            condiciones.append("rol = :rol")
+            parametros["rol"] = rol
+        return condiciones, parametros
+
+    def contar_usuarios(self, rol=None, texto=""):
+        """Total de usuarios (o de un rol) que coinciden con `texto`
+
+        Sin texto sale del contador que mantienen los triggers; con texto se cuentan las
+        coincidencias con el mismo filtro que buscar_usuarios.
+        """
+        conn = conectar(self.db_usuarios)
+        cursor = conn.cursor()
+        if texto.strip():
+            condiciones, parametros = self.condiciones_usuarios(texto, rol)
+            cursor.execute(f'SELECT COUNT(*) FROM usuarios WHERE {" AND ".join(condiciones)}', parametros)
+        elif rol:
+            cursor.execute('SELECT total FROM resumen_usuarios WHERE rol = ?', (rol,))
+        else:
+            cursor.execute('SELECT SUM(total) FROM resumen_usuarios')
+        fila = cursor.fetchone()
+        conn.close()
+        return fila[0] or 0 if fila else 0
+
     def obtener_usuario_por_id(self, id_usuario):
         """Obtiene un usuario específico por ID"""
-        conn = sqlite3.connect(self.db_name)
+        conn = conectar(self.db_usuarios)
         cursor = conn.cursor()
         
         cursor.execute('SELECT id, username, nombre, email, rol FROM usuarios WHERE id = ?', (id_usuario,))
@@ -109,7 +776,7 @@ class LaboratorioApp:
     def actualizar_usuario(self, id_usuario, username, nombre, email=None, rol='usuario', cambiar_password=False, nueva_password=None):
         """Actualiza un usuario existente"""
         try:
-            conn = sqlite3.connect(self.db_name)
+            conn = conectar(self.db_usuarios)
             cursor = conn.cursor()
             
             if cambiar_password and nueva_password:
@@ -128,6 +795,7 @@ class LaboratorioApp:
             
             conn.commit()
             conn.close()
+            self.indexar_docente(nombre)
             return True, "Usuario actualizado exitosamente"
         except sqlite3.IntegrityError:
             return False, "El nombre de usuario ya existe"
@@ -137,7 +805,7 @@ class LaboratorioApp:
     def eliminar_usuario(self, id_usuario):
         """Elimina un usuario por ID"""
         try:
-            conn = sqlite3.connect(self.db_name)
+            conn = conectar(self.db_usuarios)
             cursor = conn.cursor()
             
             # No permitir eliminar al usuario admin
@@ -147,16 +815,25 @@ class LaboratorioApp:
                 return False, "No se puede eliminar al usuario administrador principal"
             
             cursor.execute('DELETE FROM usuarios WHERE id = ?', (id_usuario,))
+            cursor.execute('UPDATE reservas SET usuario_id = NULL WHERE usuario_id = ?', (id_usuario,))
             
             conn.commit()
             conn.close()
+            
+            # Las reservas de los demás laboratorios viven en sus propios archivos
+            for id_laboratorio, _, archivo in self.obtener_laboratorios():
+                if id_laboratorio != 1:
+                    conn = conectar(archivo)
+                    conn.execute('UPDATE reservas SET usuario_id = NULL WHERE usuario_id = ?', (id_usuario,))
+                    conn.commit()
+                    conn.close()
             return True, "Usuario eliminado exitosamente"
         except Exception as e:
             return False, f"Error al eliminar usuario: {str(e)}"
 
     def autenticar_usuario(self, username, password):
         """Autentica un usuario"""
-        conn = sqlite3.connect(self.db_name)
+        conn = conectar(self.db_usuarios)
         cursor = conn.cursor()
         
         cursor.execute('SELECT id, username, password, nombre, rol FROM usuarios WHERE username = ?', (username,))
@@ -167,95 +844,988 @@ class LaboratorioApp:
             return True, usuario
         return False, None
 
-    # ========== MÉTODOS PARA RESERVAS (EXISTENTES) ==========
+    # ========== MÉTODOS PARA CATÁLOGOS ==========
     
-    def agregar_reserva(self, dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio=None, fecha_fin=None):
-        """Agrega una nueva reserva a la base de datos"""
-        conn = sqlite3.connect(self.db_name)
+    def verificar_coherencia(self, db_name=None):
+        """Descarta las cachés de catálogos si otro proceso los modificó
+
+        PRAGMA data_version solo cambia cuando otra conexión confirma escrituras, así que
+        la tabla version_catalogos se lee únicamente cuando hubo algún cambio.
+        """
+        db_name = db_name or self.db_name
+        with LaboratorioApp._coherencia_lock:
+            estado = LaboratorioApp._coherencia.get(db_name)
+            if estado is None:
+                conn = conectar(db_name, check_same_thread=False)
+                estado = LaboratorioApp._coherencia[db_name] = [conn, None, None, 0.0]
+            conn, data_version, version, chequeo = estado
+            ahora = time.monotonic()
+            if ahora - chequeo < self.INTERVALO_COHERENCIA:
+                return
+            estado[3] = ahora
+            nueva_data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+            if nueva_data_version == data_version:
+                return
+            estado[1] = nueva_data_version
+            nueva_version = conn.execute('SELECT version FROM version_catalogos WHERE id = 1').fetchone()[0]
+            if nueva_version == version:
+                return
+            estado[2] = nueva_version
+        if version is not None:
+            self.invalidar_catalogos(db_name)
+
+    def obtener_marca_actividad(self, db_name=None):
+        """Marca que cambia con las solicitudes y escrituras de cualquier proceso
+
+        (generación, solicitudes, data_version, fecha del archivo de actividad): las dos primeras
+        son de este proceso; las otras dos reflejan las escrituras y solicitudes de los demás.
+        """
+        db_name = db_name or self.db_name
+        self.verificar_coherencia(db_name)
+        with LaboratorioApp._coherencia_lock:
+            estado = LaboratorioApp._coherencia[db_name]
+            data_version = estado[0].execute('PRAGMA data_version').fetchone()[0]
+        return self.obtener_generacion(), LaboratorioApp._solicitudes, data_version, ultima_actividad(db_name)
+
+    def cargar_catalogos(self):
+        """Obtiene los catálogos desde la caché del proceso, cargándolos una sola vez"""
+        self.verificar_coherencia()
+        with self._catalogos_lock:
+            catalogos = self._catalogos.get(self.db_name)
+        if catalogos is not None:
+            return catalogos
+        
+        conn = conectar(self.db_name)
         cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT INTO reservas (dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio, fecha_fin)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio, fecha_fin))
+        # Por tabla: nombres en orden de alta y claves sin distinguir mayúsculas
+        catalogos = {}
+        for tabla in CATALOGOS:
+            cursor.execute(f'SELECT id, nombre FROM {tabla} ORDER BY id')
+            filas = cursor.fetchall()
+            catalogos[tabla] = (
+                {nombre: id_item for id_item, nombre in filas},
+                {nombre.casefold(): id_item for id_item, nombre in filas},
+            )
+        conn.close()
         
-        conn.commit()
+        with self._catalogos_lock:
+            self._catalogos[self.db_name] = catalogos
+        return catalogos
+
+    def invalidar_catalogos(self, db_name=None):
+        """Descarta la caché de catálogos para que se vuelva a cargar"""
+        db_name = db_name or self.db_name
+        with self._catalogos_lock:
+            self._catalogos.pop(db_name, None)
+            self._indices_docentes.pop(db_name, None)
+
+    def obtener_indice_docentes(self):
+        """Obtiene el índice de autocompletado de docentes, construyéndolo una sola vez"""
+        self.verificar_coherencia()
+        with self._catalogos_lock:
+            indice = self._indices_docentes.get(self.db_name)
+        if indice is not None:
+            return indice
+        
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT nombre FROM docentes')
+        nombres = {fila[0] for fila in cursor.fetchall()}
+        conn.close()
+        
+        conn = conectar(self.db_usuarios)
+        nombres.update(fila[0] for fila in conn.execute('SELECT nombre FROM usuarios'))
         conn.close()
+        indice = IndicePrefijos(sorted(nombres))
+        
+        with self._catalogos_lock:
+            indice = self._indices_docentes.setdefault(self.db_name, indice)
+        return indice
+
+    def sugerir_docentes(self, prefijo, limite=8):
+        """Sugiere nombres de docentes y usuarios con alguna palabra que empiece por `prefijo`"""
+        return self.obtener_indice_docentes().buscar(prefijo, limite)
+
+    def indexar_docente(self, nombre):
+        """Agrega un nombre al índice de autocompletado si ya fue construido"""
+        with self._catalogos_lock:
+            indice = self._indices_docentes.get(self.db_name)
+        if indice is not None:
+            indice.agregar(nombre)
+
+    def obtener_catalogo(self, tabla):
+        """Obtiene los nombres de un catálogo en orden de alta"""
+        return list(self.cargar_catalogos()[tabla][0])
+
+    def obtener_id_catalogo(self, cursor, tabla, nombre):
+        """Obtiene la clave de un nombre de catálogo, dándolo de alta en la transacción de `cursor`
+
+        La caché nunca se modifica en el lugar: un alta la descarta y se vuelve a cargar después,
+        así no queda en ella una clave que luego se deshaga con un rollback.
+        """
+        nombre = nombre.strip()
+        # Solo la caché ya cargada: cargarla acá leería con otra conexión en plena transacción
+        with self._catalogos_lock:
+            catalogos = self._catalogos.get(self.db_name)
+        if catalogos is not None and nombre.casefold() in catalogos[tabla][1]:
+            return catalogos[tabla][1][nombre.casefold()]
+        
+        # La comparación es COLLATE NOCASE: "carlos" reutiliza la clave de "Carlos"
+        cursor.execute(f'INSERT OR IGNORE INTO {tabla} (nombre) VALUES (?)', (nombre,))
+        if cursor.rowcount > 0:
+            self.invalidar_catalogos()
+        cursor.execute(f'SELECT id FROM {tabla} WHERE nombre = ?', (nombre,))
+        return cursor.fetchone()[0]
+
+    # ========== MÉTODOS PARA RESERVAS (EXISTENTES) ==========
+    
+    def agregar_reserva(self, dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio=None, fecha_fin=None, usuario_id=None):
+        """Agrega una nueva reserva a la base de datos"""
+        def insertar(cursor):
+            claves = self.claves_reserva(cursor, turno, docente, carrera)
+            return self.insertar_reserva(cursor, dia, *claves, curso, horario, periodo, fecha_inicio, fecha_fin, usuario_id)
+        
+        id_reserva, despues = self.ejecutar_escritura(insertar)
+        self.registrar_escritura()
+        self.auditar("crear", id_reserva, None, despues)
         return True
 
-    def obtener_reserva_por_id(self, id_reserva):
-        """Obtiene una reserva específica por ID"""
-        conn = sqlite3.connect(self.db_name)
+    def claves_reserva(self, cursor, turno, docente, carrera):
+        """Resuelve (turno_id, docente_id, carrera_id), dando de alta los nombres nuevos en la transacción de `cursor`"""
+        return (self.obtener_id_catalogo(cursor, "turnos", turno),
+                self.obtener_id_catalogo(cursor, "docentes", docente),
+                self.obtener_id_catalogo(cursor, "carreras", carrera))
+
+    def insertar_reserva(self, cursor, dia, turno_id, docente_id, carrera_id, curso, horario, periodo,
+                         fecha_inicio=None, fecha_fin=None, usuario_id=None):
+        """Inserta la reserva y sus ocurrencias en la transacción de `cursor`; devuelve (id, instantánea)"""
+        cursor.execute('''
+            INSERT INTO reservas (dia, turno_id, docente_id, carrera_id, curso, horario, periodo, fecha_inicio, fecha_fin, usuario_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (dia, turno_id, docente_id, carrera_id, curso, horario, periodo, fecha_inicio, fecha_fin, usuario_id))
+        id_reserva = cursor.lastrowid
+        self.generar_ocurrencias(cursor, id_reserva, dia, horario, fecha_inicio, fecha_fin)
+        return id_reserva, self.instantanea_reserva(cursor, id_reserva)
+
+    def modificar_reserva(self, cursor, id_reserva, dia, turno_id, docente_id, carrera_id, curso, horario, periodo,
+                          fecha_inicio=None, fecha_fin=None):
+        """Actualiza la reserva y regenera sus ocurrencias en la transacción de `cursor`; devuelve (antes, después)"""
+        antes = self.instantanea_reserva(cursor, id_reserva)
+        cursor.execute('''
+            UPDATE reservas 
+            SET dia = ?, turno_id = ?, docente_id = ?, carrera_id = ?, curso = ?, horario = ?, periodo = ?, fecha_inicio = ?, fecha_fin = ?
+            WHERE id = ?
+        ''', (dia, turno_id, docente_id, carrera_id, curso, horario, periodo, fecha_inicio, fecha_fin, id_reserva))
+        
+        cursor.execute('SELECT fecha_reserva FROM reservas WHERE id = ?', (id_reserva,))
+        fila = cursor.fetchone()
+        referencia = date.fromisoformat(fila[0][:10]) if fila and fila[0] else None
+        self.generar_ocurrencias(cursor, id_reserva, dia, horario, fecha_inicio, fecha_fin, referencia)
+        return antes, self.instantanea_reserva(cursor, id_reserva)
+
+    def borrar_reserva(self, cursor, id_reserva):
+        """Elimina la reserva y sus ocurrencias en la transacción de `cursor`; devuelve la instantánea previa"""
+        antes = self.instantanea_reserva(cursor, id_reserva)
+        cursor.execute('DELETE FROM ocurrencias WHERE reserva_id = ?', (id_reserva,))
+        cursor.execute('DELETE FROM reservas WHERE id = ?', (id_reserva,))
+        return antes
+
+    def aplicar_lote_reservas(self, crear=(), actualizar=(), eliminar=(), usuario_id=None):
+        """Crea, actualiza y elimina varias reservas en una sola transacción
+
+        `crear` y `actualizar` son diccionarios con los argumentos de agregar_reserva y
+        actualizar_reserva (los de actualizar llevan además "id"). Con `usuario_id` solo se
+        pueden modificar o eliminar las reservas de ese usuario y las nuevas quedan a su nombre.
+        Si algo falla no se aplica nada. Devuelve (éxito, mensaje, ids creados).
+        """
+        try:
+            mensaje, creadas = self.ejecutar_lote_reservas(crear, actualizar, eliminar, usuario_id)
+        except (ValueError, LookupError, PermissionError) as e:
+            return False, str(e), []
+        except sqlite3.Error as e:
+            print(f"❌ Error al aplicar el lote de reservas: {str(e)}")
+            return False, f"Error al aplicar el lote: {str(e)}", []
+        return True, mensaje, creadas
+
+    def ejecutar_lote_reservas(self, crear=(), actualizar=(), eliminar=(), usuario_id=None):
+        """aplicar_lote_reservas lanzando el error con su tipo; devuelve (mensaje, ids creados)
+
+        Lanza ValueError si el lote es inválido, LookupError si alguna reserva no existe,
+        PermissionError si alguna no es de `usuario_id` y sqlite3.Error si falla la base.
+        """
+        campos = ("dia", "curso", "horario", "periodo")
+        crear = [self.validar_en_lote("crear", posicion, datos) for posicion, datos in enumerate(crear, 1)]
+        actualizar = [self.validar_en_lote("actualizar", posicion, datos)
+                      for posicion, datos in enumerate(actualizar, 1)]
+        try:
+            # Los nombres de catálogo se resuelven a claves dentro de la transacción del lote
+            altas = [((r["turno"], r["docente"], r["carrera"]),
+                      [r[campo] for campo in campos], r.get("fecha_inicio"), r.get("fecha_fin"),
+                      usuario_id if usuario_id is not None else r.get("usuario_id"))
+                     for r in crear]
+            cambios = [(int(r["id"]), (r["turno"], r["docente"], r["carrera"]),
+                        [r[campo] for campo in campos], r.get("fecha_inicio"), r.get("fecha_fin"))
+                       for r in actualizar]
+            bajas = [int(id_reserva) for id_reserva in eliminar]
+        except KeyError as e:
+            raise ValueError(f"Falta el campo {e.args[0]}")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Lote inválido: {str(e)}")
+        
+        def aplicar(cursor):
+            existentes = [id_reserva for id_reserva, *_ in cambios] + bajas
+            if existentes:
+                cursor.execute(f'''
+                    SELECT id, usuario_id FROM reservas WHERE id IN ({", ".join("?" * len(existentes))})
+                ''', existentes)
+                duenos = dict(cursor.fetchall())
+                faltantes = [id_reserva for id_reserva in existentes if id_reserva not in duenos]
+                if faltantes:
+                    raise LookupError(f"No existen las reservas {', '.join(map(str, sorted(set(faltantes))))}")
+                if usuario_id is not None and any(duenos[id_reserva] != usuario_id for id_reserva in existentes):
+                    raise PermissionError("Solo se pueden modificar las reservas propias")
+            
+            registros = []
+            for nombres, (dia, curso, horario, periodo), fecha_inicio, fecha_fin, dueno in altas:
+                id_reserva, despues = self.insertar_reserva(cursor, dia, *self.claves_reserva(cursor, *nombres), curso,
+                                                            horario, periodo, fecha_inicio, fecha_fin, dueno)
+                registros.append(("crear", id_reserva, None, despues))
+            for id_reserva, nombres, (dia, curso, horario, periodo), fecha_inicio, fecha_fin in cambios:
+                antes, despues = self.modificar_reserva(cursor, id_reserva, dia, *self.claves_reserva(cursor, *nombres),
+                                                        curso, horario, periodo, fecha_inicio, fecha_fin)
+                registros.append(("editar", id_reserva, antes, despues))
+            for id_reserva in bajas:
+                registros.append(("eliminar", id_reserva, self.borrar_reserva(cursor, id_reserva), None))
+            return registros
+        
+        registros = self.ejecutar_escritura(aplicar)
+        self.registrar_escritura()
+        for operacion, id_reserva, antes, despues in registros:
+            self.auditar(operacion, id_reserva, antes, despues)
+        return (f"{len(altas)} creadas, {len(cambios)} actualizadas, {len(bajas)} eliminadas",
+                [id_reserva for operacion, id_reserva, _, _ in registros if operacion == "crear"])
+
+    def validar_en_lote(self, grupo, posicion, datos):
+        """validar_reserva con la ubicación de la reserva dentro del lote en el mensaje"""
+        try:
+            return validar_reserva(datos)
+        except ValueError as e:
+            raise ValueError(f"Lote inválido: {grupo} #{posicion}: {str(e)}")
+
+    def obtener_reserva_por_id(self, id_reserva, usuario_id=None, proyeccion=Reserva):
+        """Obtiene una reserva específica por ID (con `usuario_id`, solo si es de ese usuario)
+
+        `proyeccion` es la clase de fila a devolver; solo se leen sus columnas.
+        """
+        conn = conectar(self.db_name)
         cursor = conn.cursor()
+        cursor.row_factory = proyeccion.fabrica
         
-        cursor.execute('SELECT * FROM reservas WHERE id = ?', (id_reserva,))
+        if usuario_id is None:
+            cursor.execute(f'SELECT {proyeccion.columnas()} FROM reservas_detalle WHERE id = ?', (id_reserva,))
+        else:
+            cursor.execute(f'SELECT {proyeccion.columnas()} FROM reservas_detalle WHERE id = ? AND usuario_id = ?',
+                           (id_reserva, usuario_id))
         reserva = cursor.fetchone()
         conn.close()
         return reserva
 
     def actualizar_reserva(self, id_reserva, dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio=None, fecha_fin=None):
         """Actualiza una reserva existente"""
-        conn = sqlite3.connect(self.db_name)
+        def actualizar(cursor):
+            claves = self.claves_reserva(cursor, turno, docente, carrera)
+            return self.modificar_reserva(cursor, id_reserva, dia, *claves, curso, horario, periodo, fecha_inicio, fecha_fin)
+        
+        antes, despues = self.ejecutar_escritura(actualizar)
+        self.registrar_escritura()
+        self.auditar("editar", id_reserva, antes, despues)
+        return True
+
+    def obtener_reservas(self, usuario_id=None, proyeccion=Reserva):
+        """Obtiene todas las reservas, o solo las del usuario indicado, como filas de `proyeccion`"""
+        self.registrar_solicitud()
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        cursor.row_factory = proyeccion.fabrica
+        
+        if usuario_id is None:
+            cursor.execute(f'''
+                SELECT {proyeccion.columnas()} FROM reservas_detalle ORDER BY dia, horario
+            ''')
+        else:
+            cursor.execute(f'''
+                SELECT {proyeccion.columnas()} FROM reservas_detalle WHERE usuario_id = ? ORDER BY dia, horario
+            ''', (usuario_id,))
+        
+        reservas = cursor.fetchall()
+        conn.close()
+        return reservas
+
+    def intervalos_libres(self, dia, turno, duracion, fecha_desde=None, fecha_hasta=None):
+        """Devuelve los intervalos libres (inicio, fin) en minutos del turno, de al menos `duracion` minutos
+
+        Sin fechas se consulta el semestre vigente, que es el que ocuparía una reserva de todo el semestre.
+        """
+        if not (fecha_desde and fecha_hasta):
+            fecha_desde, fecha_hasta = (fecha.isoformat() for fecha in limites_semestre(date.today()))
+        self.registrar_solicitud()
+        conn = conectar(self.db_name)
         cursor = conn.cursor()
         
+        # Las ocurrencias tienen las fechas concretas: las reservas de todo el semestre solo
+        # ocupan el día dentro de su semestre, y las de fechas, si se solapan con el rango
         cursor.execute('''
-            UPDATE reservas 
-            SET dia = ?, turno = ?, docente = ?, carrera = ?, curso = ?, horario = ?, periodo = ?, fecha_inicio = ?, fecha_fin = ?
-            WHERE id = ?
-        ''', (dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio, fecha_fin, id_reserva))
+            SELECT DISTINCT o.inicio, o.fin FROM ocurrencias o
+            JOIN reservas r ON r.id = o.reserva_id
+            WHERE o.fecha BETWEEN ? AND ? AND r.dia = ?
+        ''', (fecha_desde, fecha_hasta, dia))
+        ocupados = sorted(cursor.fetchall())
+        conn.close()
         
-        conn.commit()
+        inicio_turno, fin_turno = RANGOS_TURNO[turno]
+        
+        # Barrido sobre los intervalos ordenados: los huecos entre ocupaciones son los libres
+        libres = []
+        desde = inicio_turno
+        for inicio, fin in ocupados:
+            if inicio >= fin_turno:
+                break
+            if inicio - desde >= duracion:
+                libres.append((desde, inicio))
+            desde = max(desde, fin)
+        if fin_turno - desde >= duracion:
+            libres.append((desde, fin_turno))
+        return libres
+
+    def buscar_horarios_libres(self, dia, turno, duracion, fecha_desde=None, fecha_hasta=None):
+        """Devuelve los intervalos libres ('HH:MM', 'HH:MM') del turno de al menos `duracion` minutos"""
+        return [(minutos_a_hora(inicio), minutos_a_hora(fin))
+                for inicio, fin in self.intervalos_libres(dia, turno, duracion, fecha_desde, fecha_hasta)]
+
+    def sugerir_horarios(self, dia, turno, duracion, fecha_desde=None, fecha_hasta=None, limite=8):
+        """Propone horarios 'HH:MM-HH:MM' de `duracion` minutos dentro de los intervalos libres"""
+        sugerencias = []
+        for desde, hasta in self.intervalos_libres(dia, turno, duracion, fecha_desde, fecha_hasta):
+            while desde + duracion <= hasta and len(sugerencias) < limite:
+                sugerencias.append(f"{minutos_a_hora(desde)}-{minutos_a_hora(desde + duracion)}")
+                desde += duracion
+        return sugerencias
+
+    def registrar_escritura(self):
+        """Avanza la generación de escrituras del proceso"""
+        with self._generacion_lock:
+            LaboratorioApp._generacion += 1
+
+    def obtener_generacion(self):
+        """Obtiene la generación de escrituras del proceso"""
+        return LaboratorioApp._generacion
+
+    def registrar_solicitud(self, db_name=None):
+        """Cuenta una solicitud (lecturas incluidas) para que el mantenimiento no corra mientras hay uso"""
+        db_name = db_name or self.db_name
+        ahora = time.monotonic()
+        with self._generacion_lock:
+            LaboratorioApp._solicitudes += 1
+            ultimo = LaboratorioApp._avisos_actividad.get(db_name)
+            avisar = ultimo is None or ahora - ultimo >= self.INTERVALO_AVISO_ACTIVIDAD
+            if avisar:
+                LaboratorioApp._avisos_actividad[db_name] = ahora
+        if avisar:
+            # Los demás procesos (lanzador.py) no ven el contador: les llega por la fecha del archivo
+            marcar_actividad(db_name)
+
+    def obtener_version_datos(self):
+        """Obtiene la versión actual de los datos de reservas"""
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT version FROM version_datos WHERE id = 1')
+        version = cursor.fetchone()[0]
         conn.close()
-        return True
+        return version
+
+    def obtener_version_catalogos(self):
+        """Obtiene la versión actual de los catálogos y usuarios"""
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT version FROM version_catalogos WHERE id = 1')
+        version = cursor.fetchone()[0]
+        conn.close()
+        return version
+
+    def contar_reservas(self, usuario_id=None):
+        """Obtiene el total de reservas (global desde el contador de resumen, o de un usuario)"""
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        if usuario_id is None:
+            cursor.execute("SELECT total FROM resumen_reservas WHERE dimension = 'total' AND valor = ''")
+        else:
+            cursor.execute('SELECT COUNT(*) FROM reservas WHERE usuario_id = ?', (usuario_id,))
+        total = cursor.fetchone()[0]
+        conn.close()
+        return total
+
+    def obtener_resumen(self):
+        """Obtiene los contadores de reservas por día, turno, carrera y docente"""
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT dimension, valor, total FROM resumen_reservas ORDER BY dimension, total DESC')
+        resumen = {dimension: {} for dimension in ("total", *DIMENSIONES_RESUMEN)}
+        for dimension, valor, total in cursor.fetchall():
+            resumen[dimension][valor] = total
+        conn.close()
+        return resumen
 
-    def obtener_reservas(self):
-        """Obtiene todas las reservas"""
-        conn = sqlite3.connect(self.db_name)
+    def obtener_ocupacion_semanal(self, fecha):
+        """Obtiene la grilla de ocupación (día x turno) de la semana que contiene `fecha`"""
+        self.registrar_solicitud()
+        lunes = fecha - timedelta(days=fecha.weekday())
+        version = self.obtener_version_datos()
+        clave = (self.db_name, lunes)
+        
+        with self._cache_lock:
+            en_cache = self._cache_ocupacion.get(clave)
+        if en_cache and en_cache[0] == version:
+            return en_cache[1]
+        
+        conn = conectar(self.db_name)
         cursor = conn.cursor()
         
+        # Rango sobre el índice (fecha, inicio): las ocurrencias ya tienen las fechas concretas,
+        # así las reservas de todo el semestre solo aparecen en las semanas de su semestre
+        viernes = lunes + timedelta(days=len(DIAS_SEMANA) - 1)
         cursor.execute('''
-            SELECT * FROM reservas ORDER BY dia, horario
-        ''')
+            SELECT fecha, inicio, fin FROM ocurrencias WHERE fecha BETWEEN ? AND ?
+        ''', (lunes.isoformat(), viernes.isoformat()))
+        # Mapa de bits con un bit por minuto del día
+        ocupacion_por_dia = dict.fromkeys(DIAS_SEMANA, 0)
+        for fecha_ocurrencia, inicio, fin in cursor.fetchall():
+            dia = DIAS_SEMANA[date.fromisoformat(fecha_ocurrencia).weekday()]
+            ocupacion_por_dia[dia] |= mascara_minutos(inicio, fin)
+        conn.close()
+        
+        grilla = {}
+        for dia, ocupacion in ocupacion_por_dia.items():
+            grilla[dia] = {}
+            for turno, (inicio, fin) in RANGOS_TURNO.items():
+                ocupado_turno = ocupacion & mascara_minutos(inicio, fin)
+                grilla[dia][turno] = {
+                    "minutos_ocupados": ocupado_turno.bit_count(),
+                    "minutos_totales": fin - inicio,
+                    "tramos": [(minutos_a_hora(a), minutos_a_hora(b)) for a, b in tramos_de_mascara(ocupado_turno)],
+                }
+        
+        with self._cache_lock:
+            self._cache_ocupacion[clave] = (version, grilla)
+        return grilla
+
+    def obtener_ocupantes(self, fecha, hora):
+        """Obtiene las reservas que ocupan el laboratorio en una fecha y hora ('HH:MM')"""
+        horas, minutos = hora.split(":")
+        minuto = int(horas) * 60 + int(minutos)
+        
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        # Sondeo del índice (fecha, inicio): solo las ocurrencias de ese día ya iniciadas
+        cursor.execute(f'''
+            SELECT {", ".join("rd." + columna for columna in Reserva.__slots__)}
+            FROM ocurrencias o JOIN reservas_detalle rd ON rd.id = o.reserva_id
+            WHERE o.fecha = ? AND o.inicio <= ? AND o.fin > ?
+            ORDER BY o.inicio
+        ''', (fecha.isoformat(), minuto, minuto))
         
         reservas = cursor.fetchall()
         conn.close()
         return reservas
 
+    def obtener_ocurrencias_del_dia(self, fecha):
+        """Obtiene las ocurrencias (inicio, fin, reserva) de una fecha, ordenadas por hora"""
+        self.registrar_solicitud()
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT o.inicio, o.fin, rd.id, rd.turno, rd.docente, rd.carrera, rd.curso
+            FROM ocurrencias o JOIN reservas_detalle rd ON rd.id = o.reserva_id
+            WHERE o.fecha = ?
+            ORDER BY o.inicio
+        ''', (fecha.isoformat(),))
+        
+        ocurrencias = cursor.fetchall()
+        conn.close()
+        return ocurrencias
+
     def eliminar_reserva(self, id_reserva):
         """Elimina una reserva por ID"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            cursor.execute('DELETE FROM reservas WHERE id = ?', (id_reserva,))
-            
-            conn.commit()
-            conn.close()
+            antes = self.ejecutar_escritura(self.borrar_reserva, id_reserva)
+            self.registrar_escritura()
+            self.auditar("eliminar", id_reserva, antes, None)
             return True
         except Exception as e:
             print(f"❌ Error al eliminar reserva {id_reserva}: {str(e)}")
             return False
 
-def main(page: ft.Page):
-    # Configuración de la página
-    page.title = "Sistema de Control de Laboratorio"
-    page.theme_mode = ft.ThemeMode.LIGHT
-    page.padding = 0
-    
-    # Variables de estado
-    current_view = "login"
-    reserva_editando = None
+    def instantanea_reserva(self, cursor, id_reserva):
+        """Devuelve la reserva como diccionario para guardarla en la auditoría"""
+        cursor.execute(f'SELECT {COLUMNAS_RESERVA}, usuario_id FROM reservas_detalle WHERE id = ?', (id_reserva,))
+        fila = cursor.fetchone()
+        if fila is None:
+            return None
+        return dict(zip([*Reserva.__slots__, "usuario_id"], fila))
+
+    def instantaneas_seleccion(self, cursor):
+        """Instantáneas de todas las reservas de la tabla temporal `seleccion`, por id"""
+        cursor.execute(f'''
+            SELECT {COLUMNAS_RESERVA}, usuario_id FROM reservas_detalle
+            WHERE id IN (SELECT id FROM seleccion)
+        ''')
+        columnas = [*Reserva.__slots__, "usuario_id"]
+        return {fila[0]: dict(zip(columnas, fila)) for fila in cursor.fetchall()}
+
+    def cargar_seleccion(self, cursor, ids):
+        """Carga los ids en una tabla temporal para operar sobre ellos con un solo JOIN"""
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS seleccion (id INTEGER PRIMARY KEY)')
+        cursor.execute('DELETE FROM seleccion')
+        cursor.executemany('INSERT OR IGNORE INTO seleccion (id) VALUES (?)', [(id_reserva,) for id_reserva in ids])
+
+    def operar_en_bloque(self, ids, operacion_auditoria, modificar):
+        """Aplica `modificar(cursor)` a las reservas seleccionadas en una sola transacción"""
+        ids = list(ids)
+        if not ids:
+            return False, "No hay reservas seleccionadas"
+        
+        def en_bloque(cursor):
+            self.cargar_seleccion(cursor, ids)
+            antes = self.instantaneas_seleccion(cursor)
+            modificar(cursor)
+            despues = self.instantaneas_seleccion(cursor)
+            cursor.execute('DELETE FROM seleccion')
+            return antes, despues
+        
+        try:
+            antes, despues = self.ejecutar_escritura(en_bloque)
+        except Exception as e:
+            return False, f"Error en la operación: {str(e)}"
+        self.registrar_escritura()
+        for id_reserva, fila in antes.items():
+            self.auditar(operacion_auditoria, id_reserva, fila, despues.get(id_reserva))
+        return True, len(antes)
+
+    def eliminar_reservas(self, ids):
+        """Elimina varias reservas y sus ocurrencias en una sola transacción"""
+        def eliminar(cursor):
+            cursor.execute('DELETE FROM ocurrencias WHERE reserva_id IN (SELECT id FROM seleccion)')
+            cursor.execute('DELETE FROM reservas WHERE id IN (SELECT id FROM seleccion)')
+        
+        exito, resultado = self.operar_en_bloque(ids, "eliminar", eliminar)
+        return (True, f"{resultado} reservas eliminadas") if exito else (False, resultado)
+
+    def reasignar_docente(self, ids, docente):
+        """Asigna otro docente a varias reservas; pasan a ser de su usuario, o quedan sin dueño si no tiene"""
+        conn = conectar(self.db_usuarios)
+        usuario = conn.execute('SELECT id FROM usuarios WHERE trim(nombre) = trim(?) LIMIT 1', (docente,)).fetchone()
+        conn.close()
+        
+        def reasignar(cursor):
+            docente_id = self.obtener_id_catalogo(cursor, "docentes", docente)
+            cursor.execute('''
+                UPDATE reservas
+                SET docente_id = ?, usuario_id = ?
+                WHERE id IN (SELECT id FROM seleccion)
+            ''', (docente_id, usuario[0] if usuario else None))
+        
+        exito, resultado = self.operar_en_bloque(ids, "editar", reasignar)
+        return (True, f"{resultado} reservas reasignadas a {docente.strip()}") if exito else (False, resultado)
+
+    def cambiar_periodo_reservas(self, ids, periodo, fecha_inicio=None, fecha_fin=None):
+        """Cambia el período de varias reservas y regenera sus ocurrencias"""
+        def cambiar(cursor):
+            cursor.execute('''
+                UPDATE reservas SET periodo = ?, fecha_inicio = ?, fecha_fin = ?
+                WHERE id IN (SELECT id FROM seleccion)
+            ''', (periodo, fecha_inicio, fecha_fin))
+            cursor.execute('''
+                SELECT id, dia, horario, fecha_reserva FROM reservas
+                WHERE id IN (SELECT id FROM seleccion)
+            ''')
+            for id_reserva, dia, horario, fecha_reserva in cursor.fetchall():
+                referencia = date.fromisoformat(fecha_reserva[:10]) if fecha_reserva else None
+                self.generar_ocurrencias(cursor, id_reserva, dia, horario, fecha_inicio, fecha_fin, referencia)
+        
+        exito, resultado = self.operar_en_bloque(ids, "editar", cambiar)
+        return (True, f"Período actualizado en {resultado} reservas") if exito else (False, resultado)
+
+    def preparar_traspaso(self, cursor, origen, destino, solo_semestrales=False, ids=None):
+        """Carga en la tabla temporal `traspaso` las reservas a copiar y marca sus conflictos en el destino
+
+        Devuelve (candidatas, conflictos, fuera): `fuera` son las de fechas específicas que,
+        corridas al destino, quedan después de su fin y no se copian.
+        """
+        origen_inicio, origen_fin = origen
+        destino_inicio, destino_fin = destino
+        desplazamiento = destino_inicio - origen_inicio
+        
+        # Reservas de todo el semestre hechas en el origen y, salvo que se excluyan, las de fechas del origen
+        condiciones = ['(fecha_inicio IS NULL AND date(fecha_reserva) BETWEEN ? AND ?)']
+        if not solo_semestrales:
+            condiciones.append('(fecha_inicio IS NOT NULL AND fecha_inicio BETWEEN ? AND ?)')
+        parametros = [origen_inicio.isoformat(), origen_fin.isoformat()] * len(condiciones)
+        filtro = ''
+        if ids is not None:
+            self.cargar_seleccion(cursor, ids)
+            filtro = 'AND id IN (SELECT id FROM seleccion)'
+        cursor.execute(f'''
+            SELECT id, dia, horario, fecha_inicio, fecha_fin FROM reservas
+            WHERE ({' OR '.join(condiciones)}) {filtro}
+        ''', parametros)
+        
+        filas = []
+        fuera = 0
+        for id_reserva, dia, horario, fecha_inicio, fecha_fin in cursor.fetchall():
+            inicio, fin = horario_a_minutos(horario) or (0, 0)
+            if fecha_inicio and fecha_fin:
+                # Las fechas específicas se corren lo mismo que el inicio del semestre
+                nuevo_inicio = max(date.fromisoformat(fecha_inicio) + desplazamiento, destino_inicio)
+                nuevo_fin = min(date.fromisoformat(fecha_fin) + desplazamiento, destino_fin)
+                if nuevo_inicio > nuevo_fin:
+                    # Cae después del fin de un destino más corto: no queda ninguna fecha que copiar
+                    fuera += 1
+                    continue
+                filas.append((id_reserva, dia, inicio, fin, nuevo_inicio.isoformat(), nuevo_fin.isoformat(),
+                              nuevo_inicio.isoformat(), nuevo_fin.isoformat()))
+            else:
+                filas.append((id_reserva, dia, inicio, fin, destino_inicio.isoformat(), destino_fin.isoformat(), None, None))
+        
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS traspaso (
+                id INTEGER PRIMARY KEY, dia TEXT, inicio INTEGER, fin INTEGER,
+                desde TEXT, hasta TEXT, fecha_inicio TEXT, fecha_fin TEXT, conflicto INTEGER
+            )
+        ''')
+        cursor.execute('DELETE FROM traspaso')
+        cursor.executemany('''
+            INSERT INTO traspaso (id, dia, inicio, fin, desde, hasta, fecha_inicio, fecha_fin)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', filas)
+        
+        # Conflicto: alguna ocurrencia ya reservada en el destino se superpone con la copia
+        cursor.execute('''
+            UPDATE traspaso SET conflicto = (
+                SELECT o.reserva_id FROM ocurrencias o
+                JOIN reservas r ON r.id = o.reserva_id
+                WHERE o.fecha BETWEEN traspaso.desde AND traspaso.hasta
+                  AND o.inicio < traspaso.fin AND o.fin > traspaso.inicio
+                  AND r.dia = traspaso.dia
+                LIMIT 1
+            )
+        ''')
+        cursor.execute('''
+            SELECT t.id, r.curso, r.dia, r.horario, t.conflicto, c.curso, c.docente
+            FROM traspaso t
+            JOIN reservas r ON r.id = t.id
+            JOIN reservas_detalle c ON c.id = t.conflicto
+            ORDER BY r.dia, r.horario
+        ''')
+        conflictos = cursor.fetchall()
+        return len(filas) + fuera, conflictos, fuera
+
+    def traspasar_semestre(self, fecha_origen, fecha_destino, solo_semestrales=False, ids=None, simular=True):
+        """Copia las reservas del semestre de `fecha_origen` al de `fecha_destino`, omitiendo las que chocan
+
+        Con `simular=True` solo informa qué se copiaría y qué conflictos hay, sin escribir nada.
+        """
+        origen = limites_semestre(fecha_origen)
+        destino = limites_semestre(fecha_destino)
+        if origen == destino:
+            return False, "El semestre de destino debe ser distinto del de origen", []
+        
+        if simular:
+            conn = conectar(self.db_name)
+            try:
+                candidatas, conflictos, fuera = self.preparar_traspaso(conn.cursor(), origen, destino,
+                                                                       solo_semestrales, ids)
+            finally:
+                conn.rollback()
+                conn.close()
+            return True, (f"Vista previa: se copiarían {candidatas - len(conflictos) - fuera} de {candidatas} reservas "
+                          f"al semestre {destino[0].isoformat()} a {destino[1].isoformat()}"
+                          + self.aviso_fuera_de_semestre(fuera)), conflictos
+        
+        def traspasar(cursor):
+            candidatas, conflictos, fuera = self.preparar_traspaso(cursor, origen, destino, solo_semestrales, ids)
+            # Las de todo el semestre toman el inicio del destino como fecha de referencia
+            cursor.execute('''
+                INSERT INTO reservas (dia, turno_id, docente_id, carrera_id, curso, horario, periodo,
+                                      fecha_inicio, fecha_fin, fecha_reserva, usuario_id)
+                SELECT r.dia, r.turno_id, r.docente_id, r.carrera_id, r.curso, r.horario,
+                       CASE WHEN t.fecha_inicio IS NULL THEN r.periodo ELSE t.fecha_inicio || ' a ' || t.fecha_fin END,
+                       t.fecha_inicio, t.fecha_fin,
+                       CASE WHEN t.fecha_inicio IS NULL THEN t.desde || ' 00:00:00' ELSE CURRENT_TIMESTAMP END,
+                       r.usuario_id
+                FROM reservas r
+                JOIN traspaso t ON t.id = r.id
+                WHERE t.conflicto IS NULL
+                RETURNING id, dia, horario, fecha_inicio, fecha_fin
+            ''')
+            nuevas = cursor.fetchall()
+            for id_reserva, dia, horario, fecha_inicio, fecha_fin in nuevas:
+                self.generar_ocurrencias(cursor, id_reserva, dia, horario, fecha_inicio, fecha_fin, semestre=destino)
+            cursor.execute('DELETE FROM traspaso')
+            
+            self.cargar_seleccion(cursor, [fila[0] for fila in nuevas])
+            despues = self.instantaneas_seleccion(cursor)
+            cursor.execute('DELETE FROM seleccion')
+            return candidatas, conflictos, fuera, despues
+        
+        try:
+            candidatas, conflictos, fuera, despues = self.ejecutar_escritura(traspasar)
+        except Exception as e:
+            return False, f"Error al copiar las reservas: {str(e)}", []
+        self.registrar_escritura()
+        for id_reserva, fila in despues.items():
+            self.auditar("crear", id_reserva, None, fila)
+        return True, (f"{len(despues)} de {candidatas} reservas copiadas al semestre "
+                      f"{destino[0].isoformat()} a {destino[1].isoformat()}"
+                      + self.aviso_fuera_de_semestre(fuera)), conflictos
+
+    def aviso_fuera_de_semestre(self, fuera):
+        return f"; {fuera} con fechas fuera del semestre de destino se omiten" if fuera else ""
+
+    def auditar(self, operacion, id_reserva, antes, despues):
+        """Encola la entrada de auditoría sin esperar a que se guarde"""
+        self.auditoria.registrar(self.actor, operacion, "reserva", id_reserva, antes, despues)
+
+    def obtener_auditoria(self, antes_de=None, limite=20):
+        """Página de la auditoría, de la más reciente a la más antigua, a partir del id `antes_de`"""
+        # Lo encolado hasta ahora se guarda primero para que la página esté al día
+        self.auditoria.vaciar()
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        
+        # Paginación por clave: cada página sigue desde el último id mostrado, sin OFFSET
+        filtro, parametros = ('WHERE id < ?', (antes_de, limite)) if antes_de is not None else ('', (limite,))
+        cursor.execute(f'''
+            SELECT id, fecha, actor, operacion, entidad, entidad_id, antes, despues
+            FROM auditoria
+            {filtro}
+            ORDER BY id DESC
+            LIMIT ?
+        ''', parametros)
+        entradas = [
+            (id_entrada, fecha, actor, operacion, entidad, entidad_id,
+             json.loads(antes) if antes else None, json.loads(despues) if despues else None)
+            for id_entrada, fecha, actor, operacion, entidad, entidad_id, antes, despues in cursor.fetchall()
+        ]
+        conn.close()
+        return entradas
+
+    def contar_auditoria(self):
+        """Cantidad de entradas guardadas en la auditoría"""
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM auditoria')
+        total = cursor.fetchone()[0]
+        conn.close()
+        return total
+
+    def crear_respaldo(self):
+        """Crea un respaldo verificado de la base de datos en este momento"""
+        try:
+            ruta = crear_respaldo(self.db_name)
+            return True, f"Respaldo creado: {ruta}"
+        except (sqlite3.Error, OSError) as e:
+            return False, f"Error al crear respaldo: {str(e)}"
+
+    def obtener_respaldos(self):
+        """Lista los respaldos disponibles, del más reciente al más antiguo"""
+        return listar_respaldos(self.db_name)
+
+    def restaurar_respaldo(self, ruta):
+        """Restaura la base desde un respaldo y descarta las cachés del proceso"""
+        try:
+            previo = restaurar_respaldo(self.db_name, ruta)
+        except (sqlite3.Error, OSError) as e:
+            return False, f"Error al restaurar respaldo: {str(e)}"
+        
+        # La versión de datos restaurada puede repetir una ya cacheada con otro contenido
+        with self._cache_lock:
+            for clave in [clave for clave in self._cache_ocupacion if clave[0] == self.db_name]:
+                del self._cache_ocupacion[clave]
+        self.invalidar_catalogos()
+        self.registrar_escritura()
+        return True, f"Respaldo restaurado. El estado anterior quedó en {previo}"
+
+    def ejecutar_mantenimiento(self):
+        """Ejecuta ahora las tareas de mantenimiento y devuelve lo registrado"""
+        return ejecutar_mantenimiento(self.db_name)
+
+    def obtener_historial_mantenimiento(self, limite=6):
+        """Últimas tareas de mantenimiento: (fecha, tarea, duracion_ms, resultado, bytes_recuperados)"""
+        conn = conectar(self.db_name)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT fecha, tarea, duracion_ms, resultado, bytes_recuperados
+            FROM mantenimiento
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (limite,))
+        historial = cursor.fetchall()
+        conn.close()
+        return historial
+
+    # ========== MÉTODOS PARA LABORATORIOS ==========
+    
+    def obtener_laboratorios(self):
+        """Obtiene (id, nombre, archivo) de cada laboratorio"""
+        conn = conectar(self.db_usuarios)
+        cursor = conn.cursor()
+        # El laboratorio 1 es siempre la base principal, aunque se haya abierto con otra ruta o URI
+        cursor.execute('SELECT id, nombre, CASE id WHEN 1 THEN ? ELSE archivo END FROM laboratorios ORDER BY id',
+                       (self.db_usuarios,))
+        laboratorios = cursor.fetchall()
+        conn.close()
+        return laboratorios
+
+    def agregar_laboratorio(self, nombre):
+        """Agrega un laboratorio con su propio archivo de reservas"""
+        try:
+            conn = conectar(self.db_usuarios)
+            cursor = conn.cursor()
+            cursor.execute('INSERT INTO laboratorios (nombre, archivo) VALUES (?, ?)', (nombre.strip(), ''))
+            archivo = derivar(self.db_usuarios, f"-lab{cursor.lastrowid}")
+            cursor.execute('UPDATE laboratorios SET archivo = ? WHERE id = ?', (archivo, cursor.lastrowid))
+            conn.commit()
+            conn.close()
+        except sqlite3.IntegrityError:
+            return False, "Ya existe un laboratorio con ese nombre"
+        except Exception as e:
+            return False, f"Error al agregar laboratorio: {str(e)}"
+        # Crea el archivo con el esquema completo para que las vistas entre laboratorios lo encuentren
+        LaboratorioApp(archivo, self.db_usuarios)
+        return True, "Laboratorio agregado exitosamente"
+
+    def seleccionar_laboratorio(self, id_laboratorio):
+        """Cambia el laboratorio activo: las reservas pasan a leerse y escribirse en su archivo"""
+        for id_item, nombre, archivo in self.obtener_laboratorios():
+            if id_item == id_laboratorio:
+                self.laboratorio_id = id_item
+                if archivo != self.db_name:
+                    self.abrir_base(archivo)
+                return nombre
+        return None
+
+    def consultar_laboratorios(self, consulta, parametros=()):
+        """Ejecuta `consulta` sobre `reservas_laboratorios`, que une las reservas de todos los laboratorios
+
+        Cada archivo se adjunta con ATTACH y reservas_laboratorios es una vista temporal con el
+        UNION ALL de sus reservas_detalle, con la columna laboratorio_id para distinguirlos.
+        SQLite admite MAXIMO_ADJUNTOS bases adjuntas a la vez: con más laboratorios las reservas
+        se copian por tandas a una tabla temporal con el mismo nombre y columnas.
+        """
+        self.registrar_solicitud()
+        adjuntos = [(id_laboratorio, archivo) for id_laboratorio, _, archivo in self.obtener_laboratorios()
+                    if id_laboratorio != 1]
+        # En autocommit: ATTACH y DETACH no se pueden usar dentro de una transacción
+        conn = conectar(self.db_usuarios, isolation_level=None)
+        try:
+            principal = f'SELECT 1 AS laboratorio_id, {COLUMNAS_RESERVA} FROM main.reservas_detalle'
+            if len(adjuntos) <= MAXIMO_ADJUNTOS:
+                partes = [principal] + self.adjuntar_laboratorios(conn, adjuntos)
+                conn.execute(f'CREATE TEMP VIEW reservas_laboratorios AS {" UNION ALL ".join(partes)}')
+            else:
+                conn.execute(f'CREATE TEMP TABLE reservas_laboratorios AS {principal}')
+                for desde in range(0, len(adjuntos), MAXIMO_ADJUNTOS):
+                    tanda = adjuntos[desde:desde + MAXIMO_ADJUNTOS]
+                    partes = self.adjuntar_laboratorios(conn, tanda)
+                    conn.execute(f'INSERT INTO reservas_laboratorios {" UNION ALL ".join(partes)}')
+                    for id_laboratorio, _ in tanda:
+                        conn.execute(f'DETACH DATABASE lab{id_laboratorio}')
+            return conn.execute(consulta, parametros).fetchall()
+        finally:
+            conn.close()
+
+    def adjuntar_laboratorios(self, conn, laboratorios):
+        """Adjunta cada (id, archivo) como lab<id> y devuelve el SELECT de sus reservas"""
+        partes = []
+        for id_laboratorio, archivo in laboratorios:
+            conn.execute(f'ATTACH DATABASE ? AS lab{id_laboratorio}', (archivo,))
+            partes.append(f'SELECT {id_laboratorio} AS laboratorio_id, {COLUMNAS_RESERVA} '
+                          f'FROM lab{id_laboratorio}.reservas_detalle')
+        return partes
+
+    def obtener_semana_docente(self, docente):
+        """Reservas de un docente en todos los laboratorios, ordenadas por día y horario"""
+        orden_dias = " ".join(f"WHEN '{dia}' THEN {i}" for i, dia in enumerate(DIAS_SEMANA))
+        return self.consultar_laboratorios(f'''
+            SELECT l.nombre, r.dia, r.horario, r.curso, r.carrera, r.turno
+            FROM reservas_laboratorios r
+            JOIN laboratorios l ON l.id = r.laboratorio_id
+            WHERE r.docente = trim(?) COLLATE NOCASE
+            ORDER BY CASE r.dia {orden_dias} END, r.horario, l.nombre
+        ''', (docente,))
+
+    def obtener_resumen_laboratorios(self):
+        """Por laboratorio: (id, nombre, reservas, docentes distintos), en una sola consulta"""
+        return self.consultar_laboratorios('''
+            SELECT l.id, l.nombre, COUNT(r.id), COUNT(DISTINCT r.docente)
+            FROM laboratorios l
+            LEFT JOIN reservas_laboratorios r ON r.laboratorio_id = l.id
+            GROUP BY l.id
+            ORDER BY l.id
+        ''')
+
+class MonitorCambios:
+    """Detecta cambios en la base de datos sin consultar las tablas"""
+
+    def __init__(self, app):
+        self.app = app
+        # Conexión propia: PRAGMA data_version cambia cuando otra conexión confirma escrituras
+        self.conn = conectar(app.db_name, check_same_thread=False)
+        self.ultima_marca = None
+
+    def marca(self):
+        """Devuelve (data_version, generación del proceso)"""
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        return data_version, self.app.obtener_generacion()
+
+    def hay_cambios(self):
+        """Indica si hubo escrituras desde la última consulta"""
+        marca = self.marca()
+        hubo_cambios = marca != self.ultima_marca
+        self.ultima_marca = marca
+        return hubo_cambios
+
+    def cerrar(self):
+        self.conn.close()
+
+def main(page: ft.Page):
+    # Configuración de la página
+    page.title = "Sistema de Control de Laboratorio"
+    page.theme_mode = ft.ThemeMode.LIGHT
+    page.padding = 0
+    
+    # Variables de estado
+    current_view = "login"
+    reserva_editando = None
     usuario_editando = None
     usuario_autenticado = None
+    semana_calendario = date.today()
     
     # Instancia de la aplicación
     app = LaboratorioApp()
     
     # Dropdowns predefinidos
-    dias = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes"]
-    turnos = ["Mañana", "Tarde", "Noche"]
-    carreras = ["Ingenieria Comercial", "Empresariales", "ADM. De Empresas", "Contabilidad", "Economia"]
-    roles = ["admin", "usuario"]
+    dias = DIAS_SEMANA
+    turnos = app.obtener_catalogo("turnos")
+    carreras = app.obtener_catalogo("carreras")
+    roles = list(ROLES)
     
     # ========== COMPONENTES DEL LOGIN ==========
     
@@ -403,6 +1973,27 @@ def main(page: ft.Page):
         fill_color=ft.Colors.WHITE
     )
     
+    dropdown_duracion = ft.Dropdown(
+        label="Duración",
+        options=[ft.dropdown.Option(key=str(minutos), text=f"{minutos} min") for minutos in [45, 60, 90, 120, 180]],
+        value="90",
+        width=150,
+        border_color=ft.Colors.BLUE_400,
+        filled=True,
+        fill_color=ft.Colors.WHITE
+    )
+    
+    dropdown_sugerencias = ft.Dropdown(
+        label="Horarios libres",
+        hint_text="Seleccione un horario sugerido",
+        options=[],
+        width=250,
+        visible=False,
+        border_color=ft.Colors.GREEN_400,
+        filled=True,
+        fill_color=ft.Colors.WHITE
+    )
+    
     radio_periodo = ft.RadioGroup(
         content=ft.Column([
             ft.Radio(value="semestre", label="Todo el semestre"),
@@ -521,6 +2112,40 @@ def main(page: ft.Page):
         fill_color=ft.Colors.WHITE
     )
     
+    # ========== AUTOCOMPLETADO DE DOCENTES ==========
+    
+    def crear_autocompletar_docente(campo):
+        """Conecta un campo de docente con la lista de sugerencias del índice de prefijos"""
+        sugerencias = ft.Column(spacing=0, visible=False)
+        
+        def elegir(nombre):
+            campo.value = nombre
+            sugerencias.visible = False
+            page.update()
+        
+        def al_escribir(e):
+            nombres = app.sugerir_docentes(campo.value or "")
+            # No sugerir cuando el único resultado es exactamente lo escrito
+            if nombres == [(campo.value or "").strip()]:
+                nombres = []
+            sugerencias.controls = [
+                ft.TextButton(
+                    nombre,
+                    icon=ft.Icons.PERSON_SEARCH,
+                    style=ft.ButtonStyle(color=ft.Colors.BLUE_700),
+                    on_click=lambda e, nombre=nombre: elegir(nombre)
+                )
+                for nombre in nombres
+            ]
+            sugerencias.visible = bool(nombres)
+            page.update()
+        
+        campo.on_change = al_escribir
+        return sugerencias
+    
+    sugerencias_docente = crear_autocompletar_docente(textfield_docente)
+    edit_sugerencias_docente = crear_autocompletar_docente(edit_textfield_docente)
+    
     # ========== BARRA LATERAL DE MÓDULOS ==========
     
     def crear_barra_lateral():
@@ -557,11 +2182,17 @@ def main(page: ft.Page):
             {"icon": ft.Icons.HOME, "label": "Inicio", "view": mostrar_bienvenida},
             {"icon": ft.Icons.ADD_BOX, "label": "Nueva Reserva", "view": mostrar_nueva_reserva},
             {"icon": ft.Icons.LIST_ALT, "label": "Ver Reservas", "view": mostrar_reservas},
+            {"icon": ft.Icons.CALENDAR_MONTH, "label": "Calendario Semanal", "view": mostrar_calendario},
         ]
         
-        # Agregar módulo de gestión de usuarios solo para administradores
+        # Agregar módulos de administración solo para administradores
         if usuario_autenticado and usuario_autenticado[4] == 'admin':
             modulos.append({"icon": ft.Icons.PEOPLE, "label": "Gestión de Usuarios", "view": mostrar_gestion_usuarios})
+            modulos.append({"icon": ft.Icons.INSIGHTS, "label": "Reporte de Uso", "view": mostrar_reporte_uso})
+            modulos.append({"icon": ft.Icons.NEXT_PLAN, "label": "Cambio de Semestre", "view": mostrar_traspaso})
+            modulos.append({"icon": ft.Icons.HISTORY, "label": "Auditoría", "view": mostrar_auditoria})
+            modulos.append({"icon": ft.Icons.BACKUP, "label": "Respaldos", "view": mostrar_respaldos})
+            modulos.append({"icon": ft.Icons.DOMAIN, "label": "Laboratorios", "view": mostrar_laboratorios})
         
         modulos.append({"icon": ft.Icons.INFO, "label": "Información", "view": mostrar_informacion})
         
@@ -597,9 +2228,24 @@ def main(page: ft.Page):
             on_click=lambda e: cerrar_sesion()
         )
         
+        # Selector del laboratorio activo: las reservas se leen y escriben en su archivo
+        laboratorios = app.obtener_laboratorios()
+        selector_laboratorio = ft.Container(
+            content=ft.Dropdown(
+                label="Laboratorio",
+                value=str(app.laboratorio_id),
+                options=[ft.dropdown.Option(str(id_lab), nombre) for id_lab, nombre, _ in laboratorios],
+                on_change=lambda e: cambiar_laboratorio(int(e.control.value)),
+                dense=True,
+            ),
+            padding=ft.padding.symmetric(horizontal=15, vertical=10),
+            visible=len(laboratorios) > 1,
+        )
+        
         return ft.Container(
             content=ft.Column([
                 user_info,
+                selector_laboratorio,
                 ft.Container(
                     content=ft.Column(botones_modulos, spacing=0),
                     padding=ft.padding.symmetric(vertical=10),
@@ -658,6 +2304,7 @@ def main(page: ft.Page):
         
         if autenticado:
             usuario_autenticado = usuario
+            app.actor = (usuario[0], usuario[1])
             login_mensaje.value = ""
             # Actualizar la interfaz para mostrar los módulos
             actualizar_interfaz_principal()
@@ -667,9 +2314,15 @@ def main(page: ft.Page):
             login_mensaje.color = ft.Colors.RED
             page.update()
     
+    def cambiar_laboratorio(id_laboratorio):
+        app.seleccionar_laboratorio(id_laboratorio)
+        actualizar_interfaz_principal()
+        mostrar_bienvenida()
+    
     def cerrar_sesion():
         nonlocal usuario_autenticado, current_view
         usuario_autenticado = None
+        app.actor = None
         current_view = "login"
         # Volver a la interfaz de login
         actualizar_interfaz_principal()
@@ -949,6 +2602,43 @@ def main(page: ft.Page):
 
         # ========== SE MUESTRA LA BIENVENIDA AL SISTEMA CON OPCIONES RAPIDAS ==========
     
+    def crear_tablero():
+        """Crea el tablero de contadores a partir de la tabla de resumen"""
+        resumen = app.obtener_resumen()
+        
+        def crear_indicador(titulo, valor, detalle, color):
+            return ft.Container(
+                content=ft.Column([
+                    ft.Text(titulo, size=13, color=ft.Colors.GREY_700),
+                    ft.Text(str(valor), size=26, weight=ft.FontWeight.BOLD, color=color),
+                    ft.Text(detalle, size=12, color=ft.Colors.GREY_600),
+                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=2),
+                bgcolor=ft.Colors.GREY_50,
+                border=ft.border.all(1, ft.Colors.GREY_300),
+                border_radius=8,
+                padding=15,
+                width=180
+            )
+        
+        def principal(dimension):
+            valores = resumen[dimension]
+            if not valores:
+                return "-", "Sin reservas"
+            valor = max(valores, key=valores.get)
+            return valores[valor], valor
+        
+        total = resumen["total"].get("", 0)
+        turno_total, turno = principal("turno")
+        carrera_total, carrera = principal("carrera")
+        docente_total, docente = principal("docente")
+        
+        return ft.Row([
+            crear_indicador("Reservas totales", total, f"{len(resumen['docente'])} docentes", ft.Colors.BLUE_700),
+            crear_indicador("Turno más usado", turno_total, turno, ft.Colors.GREEN_700),
+            crear_indicador("Carrera principal", carrera_total, carrera, ft.Colors.ORANGE_700),
+            crear_indicador("Docente con más reservas", docente_total, docente, ft.Colors.PURPLE_700),
+        ], alignment=ft.MainAxisAlignment.CENTER, wrap=True, spacing=15)
+    
     def mostrar_bienvenida():
         """Muestra la página de bienvenida al sistema"""
         if not usuario_autenticado:
@@ -990,6 +2680,8 @@ def main(page: ft.Page):
                                     text_align=ft.TextAlign.CENTER,
                                     color=ft.Colors.GREY_600
                                 ),
+                                ft.Container(height=30),
+                                crear_tablero(),
                                 ft.Container(height=40),
                                 ft.Column([
                                     ft.Text("¿Qué deseas hacer?", 
@@ -1064,25 +2756,68 @@ def main(page: ft.Page):
         )
         page.update()
     
-    def mostrar_gestion_usuarios():
-        if not usuario_autenticado or usuario_autenticado[4] != 'admin':
-            mostrar_nueva_reserva()
-            return
-        
-        nonlocal current_view
-        current_view = "gestion_usuarios"
+    # Filtros de la gestión de usuarios; se conservan al volver a la vista
+    filtro_usuarios = {"texto": "", "rol": None}
+    
+    def crear_tarjeta_usuario(usuario):
+        id_user, username, nombre, email, rol, fecha_creacion = usuario
         
-        usuarios = app.obtener_usuarios()
+        boton_editar = ft.TextButton(
+            "Editar",
+            icon=ft.Icons.EDIT,
+            style=ft.ButtonStyle(color=ft.Colors.BLUE),
+            on_click=lambda e, id=id_user: mostrar_edicion_usuario(id)
+        )
         
-        usuarios_container = ft.Column(scroll=ft.ScrollMode.ADAPTIVE, spacing=10)
+        boton_eliminar = ft.TextButton(
+            "Eliminar",
+            icon=ft.Icons.DELETE,
+            style=ft.ButtonStyle(color=ft.Colors.RED),
+            on_click=lambda e, id=id_user: eliminar_usuario_handler(id)
+        )
         
-        if not usuarios:
-            usuarios_container.controls.append(
+        return ft.Card(
+            content=ft.Container(
+                content=ft.Column([
+                    ft.ListTile(
+                        leading=ft.Icon(ft.Icons.PERSON, color=ft.Colors.BLUE_700),
+                        title=ft.Text(nombre, weight=ft.FontWeight.BOLD),
+                        subtitle=ft.Text(f"Usuario: {username} | Rol: {rol}"),
+                    ),
+                    ft.Container(
+                        content=ft.Column([
+                            ft.Row([
+                                ft.Text("📧 Email:", weight=ft.FontWeight.BOLD),
+                                ft.Text(email if email else "No especificado"),
+                            ]),
+                            ft.Row([
+                                ft.Text("📅 Creado:", weight=ft.FontWeight.BOLD),
+                                ft.Text(fecha_creacion.split()[0]),
+                            ]),
+                        ], spacing=5),
+                        padding=ft.padding.only(left=16, right=16, bottom=10)
+                    ),
+                    ft.Row([boton_editar, boton_eliminar], alignment=ft.MainAxisAlignment.END)
+                ]),
+                padding=10
+            ),
+            elevation=2
+        )
+    
+    def cargar_pagina_usuarios(lista, boton_mas, despues_de=None):
+        """Agrega a la lista la página siguiente; el botón "Cargar más" se oculta en la última"""
+        usuarios = app.buscar_usuarios(filtro_usuarios["texto"], filtro_usuarios["rol"], despues_de,
+                                       TAMANO_PAGINA_USUARIOS + 1)
+        hay_mas = len(usuarios) > TAMANO_PAGINA_USUARIOS
+        usuarios = usuarios[:TAMANO_PAGINA_USUARIOS]
+        if not usuarios and despues_de is None:
+            lista.controls.append(
                 ft.Card(
                     content=ft.Container(
                         content=ft.Column([
                             ft.Icon(ft.Icons.PEOPLE_OUTLINE, size=50, color=ft.Colors.GREY_400),
-                            ft.Text("No hay usuarios registrados", 
+                            ft.Text("No hay usuarios que coincidan" if filtro_usuarios["texto"] or filtro_usuarios["rol"]
+                                    else "No hay usuarios registrados", 
                                    size=18, 
                                    weight=ft.FontWeight.BOLD),
                         ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
@@ -1090,53 +2825,47 @@ def main(page: ft.Page):
                     )
                 )
             )
-        else:
-            for usuario in usuarios:
-                id_user, username, nombre, email, rol, fecha_creacion = usuario
-                
-                boton_editar = ft.TextButton(
-                    "Editar",
-                    icon=ft.Icons.EDIT,
-                    style=ft.ButtonStyle(color=ft.Colors.BLUE),
-                    on_click=lambda e, id=id_user: mostrar_edicion_usuario(id)
-                )
-                
-                boton_eliminar = ft.TextButton(
-                    "Eliminar",
-                    icon=ft.Icons.DELETE,
-                    style=ft.ButtonStyle(color=ft.Colors.RED),
-                    on_click=lambda e, id=id_user: eliminar_usuario_handler(id)
-                )
-                
-                usuarios_container.controls.append(
-                    ft.Card(
-                        content=ft.Container(
-                            content=ft.Column([
-                                ft.ListTile(
-                                    leading=ft.Icon(ft.Icons.PERSON, color=ft.Colors.BLUE_700),
-                                    title=ft.Text(nombre, weight=ft.FontWeight.BOLD),
-                                    subtitle=ft.Text(f"Usuario: {username} | Rol: {rol}"),
-                                ),
-                                ft.Container(
-                                    content=ft.Column([
-                                        ft.Row([
-                                            ft.Text("📧 Email:", weight=ft.FontWeight.BOLD),
-                                            ft.Text(email if email else "No especificado"),
-                                        ]),
-                                        ft.Row([
-                                            ft.Text("📅 Creado:", weight=ft.FontWeight.BOLD),
-                                            ft.Text(fecha_creacion.split()[0]),
-                                        ]),
-                                    ], spacing=5),
-                                    padding=ft.padding.only(left=16, right=16, bottom=10)
-                                ),
-                                ft.Row([boton_editar, boton_eliminar], alignment=ft.MainAxisAlignment.END)
-                            ]),
-                            padding=10
-                        ),
-                        elevation=2
-                    )
-                )
+        lista.controls.extend(crear_tarjeta_usuario(usuario) for usuario in usuarios)
+        boton_mas.visible = hay_mas
+        boton_mas.on_click = lambda e: (cargar_pagina_usuarios(lista, boton_mas, usuarios[-1][1]), page.update())
+    
+    def filtrar_usuarios(texto=None, rol=None):
+        if texto is not None:
+            filtro_usuarios["texto"] = texto
+        if rol is not None:
+            filtro_usuarios["rol"] = rol or None
+        mostrar_gestion_usuarios()
+    
+    def mostrar_gestion_usuarios():
+        if not usuario_autenticado or usuario_autenticado[4] != 'admin':
+            mostrar_nueva_reserva()
+            return
+        
+        nonlocal current_view
+        current_view = "gestion_usuarios"
+        
+        total = app.contar_usuarios(filtro_usuarios["rol"], filtro_usuarios["texto"])
+        
+        # Se muestra una página y las siguientes se cargan a pedido, siguiendo desde el último username
+        usuarios_container = ft.Column(spacing=10)
+        boton_mas = ft.TextButton("Cargar más", icon=ft.Icons.EXPAND_MORE)
+        cargar_pagina_usuarios(usuarios_container, boton_mas)
+        
+        campo_busqueda = ft.TextField(
+            label="Buscar usuario",
+            hint_text="Usuario, nombre o email",
+            prefix_icon=ft.Icons.SEARCH,
+            value=filtro_usuarios["texto"],
+            on_submit=lambda e: filtrar_usuarios(texto=e.control.value),
+            expand=True,
+        )
+        filtro_rol = ft.Dropdown(
+            label="Rol",
+            value=filtro_usuarios["rol"] or "",
+            options=[ft.dropdown.Option("", "Todos")] + [ft.dropdown.Option(rol) for rol in ROLES],
+            on_change=lambda e: filtrar_usuarios(rol=e.control.value),
+            width=160,
+        )
         
         content_area.controls.clear()
         content_area.controls.append(
@@ -1151,7 +2880,10 @@ def main(page: ft.Page):
                                                 size=22, 
                                                 weight=ft.FontWeight.BOLD,
                                                 color=ft.Colors.BLUE_900),
-                                    subtitle=ft.Text(f"Total: {len(usuarios)} usuarios"),
+                                    subtitle=ft.Text(f"Total: {total} usuarios"
+                                                    + (f" con rol {filtro_usuarios['rol']}" if filtro_usuarios["rol"] else "")
+                                                    + (f" que empiezan por \"{filtro_usuarios['texto'].strip()}\""
+                                                       if filtro_usuarios["texto"].strip() else "")),
                                     trailing=ft.ElevatedButton(
                                         "Agregar Usuario",
                                         icon=ft.Icons.ADD,
@@ -1165,8 +2897,15 @@ def main(page: ft.Page):
                                         )
                                     )
                                 ),
+                                ft.Row([
+                                    campo_busqueda,
+                                    filtro_rol,
+                                    ft.IconButton(ft.Icons.SEARCH, tooltip="Buscar",
+                                                  on_click=lambda e: filtrar_usuarios(texto=campo_busqueda.value)),
+                                ]),
                                 ft.Divider(),
-                                usuarios_container
+                                usuarios_container,
+                                boton_mas,
                             ]),
                             padding=20
                         ),
@@ -1207,6 +2946,7 @@ def main(page: ft.Page):
         dropdown_dia.value = None
         dropdown_turno.value = None
         textfield_docente.value = ""
+        sugerencias_docente.visible = False
         dropdown_carrera.value = None
         dropdown_curso_ano.value = None
         textfield_materia.value = ""
@@ -1216,10 +2956,62 @@ def main(page: ft.Page):
         datepicker_fin.value = ""
         datepicker_inicio.visible = False
         datepicker_fin.visible = False
+        dropdown_sugerencias.options = []
+        dropdown_sugerencias.value = None
+        dropdown_sugerencias.visible = False
         mensaje_texto.value = ""
         mensaje_texto.visible = False
         page.update()
     
+    def sugerir_horario_handler(e):
+        if not dropdown_dia.value or not dropdown_turno.value:
+            mensaje_texto.value = "❌ Seleccione día y turno para sugerir un horario"
+            mensaje_texto.color = ft.Colors.RED
+            mensaje_texto.visible = True
+            page.update()
+            return
+        
+        fecha_desde = None
+        fecha_hasta = None
+        if radio_periodo.value == "fechas":
+            try:
+                fecha_desde = datetime.strptime(datepicker_inicio.value, "%Y-%m-%d").date().isoformat()
+                fecha_hasta = datetime.strptime(datepicker_fin.value, "%Y-%m-%d").date().isoformat()
+            except ValueError:
+                mensaje_texto.value = "❌ Complete las fechas (YYYY-MM-DD) para sugerir un horario"
+                mensaje_texto.color = ft.Colors.RED
+                mensaje_texto.visible = True
+                page.update()
+                return
+        
+        sugerencias = app.sugerir_horarios(
+            dropdown_dia.value,
+            dropdown_turno.value,
+            int(dropdown_duracion.value),
+            fecha_desde,
+            fecha_hasta
+        )
+        
+        if not sugerencias:
+            dropdown_sugerencias.visible = False
+            mensaje_texto.value = "❌ No hay horarios libres de esa duración en el turno seleccionado"
+            mensaje_texto.color = ft.Colors.RED
+        else:
+            dropdown_sugerencias.options = [ft.dropdown.Option(horario) for horario in sugerencias]
+            dropdown_sugerencias.value = None
+            dropdown_sugerencias.visible = True
+            mensaje_texto.value = f"✅ {len(sugerencias)} horarios libres encontrados"
+            mensaje_texto.color = ft.Colors.GREEN
+        mensaje_texto.visible = True
+        page.update()
+    
+    def seleccionar_sugerencia(e):
+        if dropdown_sugerencias.value:
+            textfield_horario.value = dropdown_sugerencias.value
+            page.update()
+    
+    dropdown_sugerencias.on_change = seleccionar_sugerencia
+    
     def agregar_reserva_handler(e):
         # Validaciones básicas de campos obligatorios
         if not all([
@@ -1286,7 +3078,8 @@ def main(page: ft.Page):
                 horario=textfield_horario.value.strip(),
                 periodo=periodo_texto,
                 fecha_inicio=fecha_inicio,
-                fecha_fin=fecha_fin
+                fecha_fin=fecha_fin,
+                usuario_id=usuario_autenticado[0]
             )
 
             mensaje_texto.value = "✅ Reserva agregada exitosamente!"
@@ -1345,20 +3138,27 @@ def main(page: ft.Page):
                 mensaje_texto.visible = True
                 page.update()
                 return
-                return
             
             try:
-                datetime.strptime(edit_datepicker_inicio.value, "%Y-%m-%d")
-                datetime.strptime(edit_datepicker_fin.value, "%Y-%m-%d")
+                fecha_inicio_dt = datetime.strptime(edit_datepicker_inicio.value.strip(), "%Y-%m-%d").date()
+                fecha_fin_dt = datetime.strptime(edit_datepicker_fin.value.strip(), "%Y-%m-%d").date()
             except ValueError:
                 mensaje_texto.value = "❌ Formato de fecha incorrecto. Use YYYY-MM-DD"
                 mensaje_texto.color = ft.Colors.RED
                 mensaje_texto.visible = True
                 page.update()
                 return
+            
+            if fecha_fin_dt < fecha_inicio_dt:
+                mensaje_texto.value = "❌ La fecha de fin no puede ser anterior a la fecha de inicio"
+                mensaje_texto.color = ft.Colors.RED
+                mensaje_texto.visible = True
+                page.update()
+                return
         
-        fecha_inicio = edit_datepicker_inicio.value if edit_radio_periodo.value == "fechas" else None
-        fecha_fin = edit_datepicker_fin.value if edit_radio_periodo.value == "fechas" else None
+        # Normalizadas a YYYY-MM-DD: "2025-9-1" pasa strptime pero no date.fromisoformat
+        fecha_inicio = fecha_inicio_dt.isoformat() if edit_radio_periodo.value == "fechas" else None
+        fecha_fin = fecha_fin_dt.isoformat() if edit_radio_periodo.value == "fechas" else None
         periodo_texto = "Todo el semestre" if edit_radio_periodo.value == "semestre" else f"{fecha_inicio} a {fecha_fin}"
         # Combinar curso año y materia para actualizar
         curso_combined = f"{edit_dropdown_curso_ano.value} - {edit_textfield_materia.value.strip()}"
@@ -1420,7 +3220,10 @@ def main(page: ft.Page):
                     padding=ft.padding.only(bottom=15)
                 ),
                 
-                ft.Container(content=textfield_docente, padding=ft.padding.only(bottom=15)),
+                ft.Container(
+                    content=ft.Column([textfield_docente, sugerencias_docente], spacing=0),
+                    padding=ft.padding.only(bottom=15)
+                ),
                 ft.Container(content=dropdown_carrera, padding=ft.padding.only(bottom=15)),
                 ft.Container(
                     content=ft.Row([
@@ -1430,7 +3233,20 @@ def main(page: ft.Page):
                     ]),
                     padding=ft.padding.only(bottom=15)
                 ),
-                ft.Container(content=textfield_horario, padding=ft.padding.only(bottom=20)),
+                ft.Container(content=textfield_horario, padding=ft.padding.only(bottom=15)),
+                ft.Container(
+                    content=ft.Row([
+                        ft.Container(content=dropdown_duracion, width=150),
+                        ft.OutlinedButton(
+                            "Sugerir horario",
+                            icon=ft.Icons.SCHEDULE,
+                            style=ft.ButtonStyle(padding=15),
+                            on_click=sugerir_horario_handler
+                        ),
+                        ft.Container(content=dropdown_sugerencias, width=250),
+                    ], spacing=20),
+                    padding=ft.padding.only(bottom=20)
+                ),
                 
                 ft.Container(
                     content=ft.Column([
@@ -1510,32 +3326,31 @@ def main(page: ft.Page):
             mostrar_reservas()
             return
         
-        id_reserva, dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio, fecha_fin, fecha_reserva = reserva
-        
-        edit_dropdown_dia.value = dia
-        edit_dropdown_turno.value = turno
-        edit_textfield_docente.value = docente
-        edit_dropdown_carrera.value = carrera
+        edit_dropdown_dia.value = reserva.dia
+        edit_dropdown_turno.value = reserva.turno
+        edit_textfield_docente.value = reserva.docente
+        edit_sugerencias_docente.visible = False
+        edit_dropdown_carrera.value = reserva.carrera
         # Separar el campo 'curso' guardado en DB en año y materia (formato esperado: "AÑO - MATERIA")
-        if curso and " - " in curso:
-            year, materia = curso.split(" - ", 1)
+        if reserva.curso and " - " in reserva.curso:
+            year, materia = reserva.curso.split(" - ", 1)
             edit_dropdown_curso_ano.value = year
             edit_textfield_materia.value = materia
         else:
             edit_dropdown_curso_ano.value = None
-            edit_textfield_materia.value = curso or ""
+            edit_textfield_materia.value = reserva.curso or ""
 
-        edit_textfield_horario.value = horario
+        edit_textfield_horario.value = reserva.horario
         
-        if "semestre" in periodo:
+        if "semestre" in reserva.periodo:
             edit_radio_periodo.value = "semestre"
             edit_datepicker_inicio.visible = False
             edit_datepicker_fin.visible = False
         else:
             edit_radio_periodo.value = "fechas"
-            if fecha_inicio and fecha_fin:
-                edit_datepicker_inicio.value = fecha_inicio
-                edit_datepicker_fin.value = fecha_fin
+            if reserva.fecha_inicio and reserva.fecha_fin:
+                edit_datepicker_inicio.value = reserva.fecha_inicio
+                edit_datepicker_fin.value = reserva.fecha_fin
             edit_datepicker_inicio.visible = True
             edit_datepicker_fin.visible = True
         
@@ -1558,10 +3373,10 @@ def main(page: ft.Page):
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Reserva actual:", weight=ft.FontWeight.BOLD, size=16),
-                            ft.Text(f"ID: {id_reserva}"),
-                            ft.Text(f"Curso: {curso}"),
-                            ft.Text(f"Día: {dia} - Turno: {turno}"),
-                            ft.Text(f"Docente: {docente}"),
+                            ft.Text(f"ID: {reserva.id}"),
+                            ft.Text(f"Curso: {reserva.curso}"),
+                            ft.Text(f"Día: {reserva.dia} - Turno: {reserva.turno}"),
+                            ft.Text(f"Docente: {reserva.docente}"),
                         ], spacing=5),
                         padding=15
                     ),
@@ -1582,7 +3397,10 @@ def main(page: ft.Page):
                     padding=ft.padding.only(bottom=15)
                 ),
                 
-                ft.Container(content=edit_textfield_docente, padding=ft.padding.only(bottom=15)),
+                ft.Container(
+                    content=ft.Column([edit_textfield_docente, edit_sugerencias_docente], spacing=0),
+                    padding=ft.padding.only(bottom=15)
+                ),
                 ft.Container(content=edit_dropdown_carrera, padding=ft.padding.only(bottom=15)),
                 ft.Container(
                     content=ft.Row([
@@ -1658,17 +3476,133 @@ def main(page: ft.Page):
         )
         page.update()
     
-    def mostrar_reservas():
-        if not usuario_autenticado:
-            mostrar_login()
+    # ========== OPERACIONES EN BLOQUE SOBRE RESERVAS ==========
+    
+    seleccion_reservas = set()
+    
+    texto_seleccion = ft.Text("0 seleccionadas", weight=ft.FontWeight.BOLD)
+    
+    bloque_docente = ft.TextField(
+        label="Nuevo docente",
+        width=220,
+        border_color=ft.Colors.BLUE_400,
+        filled=True,
+        fill_color=ft.Colors.WHITE
+    )
+    
+    bloque_periodo = ft.Dropdown(
+        label="Nuevo período",
+        options=[
+            ft.dropdown.Option("semestre", "Todo el semestre"),
+            ft.dropdown.Option("fechas", "Fechas específicas"),
+        ],
+        width=200,
+        border_color=ft.Colors.BLUE_400,
+        filled=True,
+        fill_color=ft.Colors.WHITE
+    )
+    
+    bloque_fecha_inicio = ft.TextField(label="Fecha inicio", hint_text="YYYY-MM-DD", width=150,
+                                       border_color=ft.Colors.BLUE_400, filled=True, fill_color=ft.Colors.WHITE)
+    bloque_fecha_fin = ft.TextField(label="Fecha fin", hint_text="YYYY-MM-DD", width=150,
+                                    border_color=ft.Colors.BLUE_400, filled=True, fill_color=ft.Colors.WHITE)
+    
+    mensaje_bloque = ft.Text("", visible=False)
+    
+    def seleccionar_reserva(id_reserva, marcada):
+        if marcada:
+            seleccion_reservas.add(id_reserva)
+        else:
+            seleccion_reservas.discard(id_reserva)
+        texto_seleccion.value = f"{len(seleccion_reservas)} seleccionadas"
+        page.update()
+    
+    def seleccionar_todas(ids, marcada):
+        seleccion_reservas.clear()
+        if marcada:
+            seleccion_reservas.update(ids)
+        mostrar_reservas()
+    
+    def terminar_operacion_bloque(exito, mensaje):
+        # Un solo redibujado de la lista al final, sin importar cuántas reservas se tocaron
+        if exito:
+            seleccion_reservas.clear()
+        mensaje_bloque.value = ("✅ " if exito else "❌ ") + mensaje
+        mensaje_bloque.color = ft.Colors.GREEN if exito else ft.Colors.RED
+        mensaje_bloque.visible = True
+        mostrar_reservas()
+    
+    def eliminar_seleccionadas(e):
+        terminar_operacion_bloque(*app.eliminar_reservas(seleccion_reservas))
+    
+    def reasignar_seleccionadas(e):
+        if not bloque_docente.value.strip():
+            terminar_operacion_bloque(False, "Ingrese el nombre del nuevo docente")
+            return
+        terminar_operacion_bloque(*app.reasignar_docente(seleccion_reservas, bloque_docente.value.strip()))
+    
+    def cambiar_periodo_seleccionadas(e):
+        if not bloque_periodo.value:
+            terminar_operacion_bloque(False, "Seleccione el nuevo período")
+            return
+        fecha_inicio = fecha_fin = None
+        if bloque_periodo.value == "fechas":
+            try:
+                fecha_inicio = datetime.strptime(bloque_fecha_inicio.value.strip(), "%Y-%m-%d").date().isoformat()
+                fecha_fin = datetime.strptime(bloque_fecha_fin.value.strip(), "%Y-%m-%d").date().isoformat()
+            except ValueError:
+                terminar_operacion_bloque(False, "Formato de fecha inválido. Use YYYY-MM-DD")
+                return
+            if fecha_inicio > fecha_fin:
+                terminar_operacion_bloque(False, "La fecha de inicio debe ser anterior a la fecha de fin")
+                return
+        periodo_texto = "Todo el semestre" if bloque_periodo.value == "semestre" else f"{fecha_inicio} a {fecha_fin}"
+        terminar_operacion_bloque(*app.cambiar_periodo_reservas(seleccion_reservas, periodo_texto, fecha_inicio, fecha_fin))
+    
+    def crear_barra_bloque(ids):
+        seleccion_reservas.intersection_update(ids)
+        texto_seleccion.value = f"{len(seleccion_reservas)} seleccionadas"
+        return ft.Column([
+            ft.Row([
+                ft.Checkbox(
+                    label="Seleccionar todas",
+                    value=bool(ids) and len(seleccion_reservas) == len(ids),
+                    on_change=lambda e: seleccionar_todas(ids, e.control.value)
+                ),
+                texto_seleccion,
+                ft.TextButton("Eliminar seleccionadas", icon=ft.Icons.DELETE_SWEEP,
+                             style=ft.ButtonStyle(color=ft.Colors.RED),
+                             on_click=eliminar_seleccionadas),
+            ], wrap=True),
+            ft.Row([
+                bloque_docente,
+                ft.TextButton("Reasignar docente", icon=ft.Icons.PERSON, on_click=reasignar_seleccionadas),
+                bloque_periodo,
+                bloque_fecha_inicio,
+                bloque_fecha_fin,
+                ft.TextButton("Cambiar período", icon=ft.Icons.DATE_RANGE, on_click=cambiar_periodo_seleccionadas),
+            ], wrap=True),
+            mensaje_bloque,
+        ], spacing=10)
+    
+    def mostrar_reservas():
+        if not usuario_autenticado:
+            mostrar_login()
             return
         
         nonlocal current_view
+        if current_view != "ver_reservas":
+            seleccion_reservas.clear()
+            mensaje_bloque.visible = False
         current_view = "ver_reservas"
         
         reservas_container = ft.Column(scroll=ft.ScrollMode.ADAPTIVE, spacing=10)
         
-        reservas = app.obtener_reservas()
+        # Los administradores ven todas las reservas; el resto solo las propias
+        es_admin = usuario_autenticado[4] == 'admin'
+        usuario_id = None if es_admin else usuario_autenticado[0]
+        reservas = app.obtener_reservas(usuario_id, ReservaListado)
+        barra_bloque = crear_barra_bloque([reserva.id for reserva in reservas])
         
         if not reservas:
             reservas_container.controls.append(
@@ -1688,20 +3622,18 @@ def main(page: ft.Page):
             )
         else:
             for reserva in reservas:
-                id_reserva, dia, turno, docente, carrera, curso, horario, periodo, fecha_inicio, fecha_fin, fecha_reserva = reserva
-                
                 boton_editar = ft.TextButton(
                     "Editar",
                     icon=ft.Icons.EDIT,
                     style=ft.ButtonStyle(color=ft.Colors.BLUE),
-                    on_click=lambda e, id=id_reserva: mostrar_edicion(id)
+                    on_click=lambda e, id=reserva.id: mostrar_edicion(id)
                 )
                 
                 boton_eliminar = ft.TextButton(
                     "Eliminar",
                     icon=ft.Icons.DELETE,
                     style=ft.ButtonStyle(color=ft.Colors.RED),
-                    on_click=lambda e, id=id_reserva: eliminar_reserva_handler(id)
+                    on_click=lambda e, id=reserva.id: eliminar_reserva_handler(id)
                 )
                 
                 reservas_container.controls.append(
@@ -1710,18 +3642,24 @@ def main(page: ft.Page):
                             content=ft.Column([
                                 ft.ListTile(
                                     leading=ft.Icon(ft.Icons.COMPUTER, color=ft.Colors.BLUE_700),
-                                    title=ft.Text(f"{curso}", weight=ft.FontWeight.BOLD, size=16),
-                                    subtitle=ft.Text(f"{dia} - {turno} | Docente: {docente}"),
+                                    title=ft.Text(f"{reserva.curso}", weight=ft.FontWeight.BOLD, size=16),
+                                    subtitle=ft.Text(f"{reserva.dia} - {reserva.turno} | Docente: {reserva.docente}"),
                                 ),
                                 ft.Container(
                                     content=ft.Column([
-                                        ft.Row([ft.Text("📅 Horario:", weight=ft.FontWeight.BOLD), ft.Text(horario)]),
-                                        ft.Row([ft.Text("📚 Período:", weight=ft.FontWeight.BOLD), ft.Text(periodo)]),
-                                        ft.Row([ft.Text("🕐 Reservado:", weight=ft.FontWeight.BOLD), ft.Text(fecha_reserva.split()[0])]),
+                                        ft.Row([ft.Text("📅 Horario:", weight=ft.FontWeight.BOLD), ft.Text(reserva.horario)]),
+                                        ft.Row([ft.Text("📚 Período:", weight=ft.FontWeight.BOLD), ft.Text(reserva.periodo)]),
+                                        ft.Row([ft.Text("🕐 Reservado:", weight=ft.FontWeight.BOLD), ft.Text(reserva.fecha_reserva.split()[0])]),
                                     ], spacing=5),
                                     padding=ft.padding.only(left=16, right=16, bottom=10)
                                 ),
-                                ft.Row([boton_editar, boton_eliminar], alignment=ft.MainAxisAlignment.END)
+                                ft.Row([
+                                    ft.Checkbox(
+                                        value=reserva.id in seleccion_reservas,
+                                        on_change=lambda e, id=reserva.id: seleccionar_reserva(id, e.control.value)
+                                    ),
+                                    ft.Row([boton_editar, boton_eliminar]),
+                                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
                             ]),
                             padding=10
                         ),
@@ -1738,12 +3676,13 @@ def main(page: ft.Page):
                             content=ft.Column([
                                 ft.ListTile(
                                     leading=ft.Icon(ft.Icons.LIST_ALT, color=ft.Colors.BLUE_700),
-                                    title=ft.Text("Reservas Existentes", 
+                                    title=ft.Text("Reservas Existentes" if es_admin else "Mis Reservas", 
                                                 size=22, 
                                                 weight=ft.FontWeight.BOLD,
                                                 color=ft.Colors.BLUE_900),
-                                    subtitle=ft.Text(f"Total: {len(reservas)} reservas"),
+                                    subtitle=ft.Text(f"Total: {app.contar_reservas(usuario_id)} reservas"),
                                 ),
+                                barra_bloque,
                                 ft.Divider(),
                                 reservas_container
                             ]),
@@ -1758,6 +3697,551 @@ def main(page: ft.Page):
         )
         page.update()
     
+    def cambiar_semana(dias_desplazamiento):
+        nonlocal semana_calendario
+        semana_calendario = semana_calendario + timedelta(days=dias_desplazamiento)
+        mostrar_calendario()
+    
+    def mostrar_calendario():
+        if not usuario_autenticado:
+            mostrar_login()
+            return
+        
+        nonlocal current_view
+        current_view = "calendario"
+        
+        grilla = app.obtener_ocupacion_semanal(semana_calendario)
+        lunes = semana_calendario - timedelta(days=semana_calendario.weekday())
+        
+        def crear_celda(celda):
+            porcentaje = celda["minutos_ocupados"] / celda["minutos_totales"]
+            if porcentaje == 0:
+                color = ft.Colors.GREEN_50
+            elif porcentaje < 0.5:
+                color = ft.Colors.AMBER_100
+            else:
+                color = ft.Colors.RED_100
+            
+            return ft.Container(
+                content=ft.Column([
+                    ft.Text(f"{porcentaje:.0%} ocupado", size=12, weight=ft.FontWeight.BOLD),
+                    *[ft.Text(f"{inicio}-{fin}", size=11, color=ft.Colors.GREY_700) for inicio, fin in celda["tramos"]],
+                ], spacing=2),
+                bgcolor=color,
+                padding=8,
+                border_radius=6,
+                width=130,
+                height=90
+            )
+        
+        filas = [
+            ft.Row(
+                [ft.Container(width=80)] + [
+                    ft.Container(
+                        content=ft.Text(f"{dia} {(lunes + timedelta(days=i)).strftime('%d/%m')}",
+                                       weight=ft.FontWeight.BOLD, size=13),
+                        width=130
+                    )
+                    for i, dia in enumerate(dias)
+                ],
+                spacing=5
+            )
+        ]
+        for turno in RANGOS_TURNO:
+            filas.append(
+                ft.Row(
+                    [ft.Container(content=ft.Text(turno, weight=ft.FontWeight.BOLD), width=80)] +
+                    [crear_celda(grilla[dia][turno]) for dia in dias],
+                    spacing=5
+                )
+            )
+        
+        content_area.controls.clear()
+        content_area.controls.append(
+            ft.Container(
+                content=ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.ListTile(
+                                leading=ft.Icon(ft.Icons.CALENDAR_MONTH, color=ft.Colors.BLUE_700),
+                                title=ft.Text("Calendario Semanal", 
+                                            size=22, 
+                                            weight=ft.FontWeight.BOLD,
+                                            color=ft.Colors.BLUE_900),
+                                subtitle=ft.Text(f"Semana del {lunes.strftime('%d/%m/%Y')} al {(lunes + timedelta(days=4)).strftime('%d/%m/%Y')}"),
+                            ),
+                            ft.Row([
+                                ft.OutlinedButton(
+                                    "Semana anterior",
+                                    icon=ft.Icons.CHEVRON_LEFT,
+                                    on_click=lambda e: cambiar_semana(-7)
+                                ),
+                                ft.OutlinedButton(
+                                    "Semana siguiente",
+                                    icon=ft.Icons.CHEVRON_RIGHT,
+                                    on_click=lambda e: cambiar_semana(7)
+                                ),
+                            ], spacing=10),
+                            ft.Divider(),
+                            ft.Column(filas, spacing=5)
+                        ]),
+                        padding=20
+                    ),
+                    elevation=3
+                ),
+                padding=20,
+                expand=True
+            )
+        )
+        page.update()
+    
+    def exportar_reporte_uso(reporte, mensaje):
+        import analitica
+        
+        ruta = f"reporte_uso_{reporte['desde']}_{reporte['hasta']}.csv"
+        try:
+            analitica.exportar_csv(reporte, ruta)
+            mensaje.value = f"✅ Reporte exportado a {ruta}"
+            mensaje.color = ft.Colors.GREEN
+        except OSError as ex:
+            mensaje.value = f"❌ Error al exportar: {str(ex)}"
+            mensaje.color = ft.Colors.RED
+        page.update()
+    
+    def mostrar_reporte_uso():
+        if not usuario_autenticado or usuario_autenticado[4] != 'admin':
+            mostrar_nueva_reserva()
+            return
+        
+        nonlocal current_view
+        current_view = "reporte_uso"
+        
+        try:
+            import analitica
+        except ImportError:
+            content_area.controls.clear()
+            content_area.controls.append(
+                ft.Container(
+                    content=ft.Text("❌ El reporte de uso requiere NumPy (pip install numpy)", color=ft.Colors.RED),
+                    padding=20
+                )
+            )
+            page.update()
+            return
+        
+        # El reporte se calcula sobre la réplica de lectura para no competir con las reservas
+        reporte, atraso = app.consultar_en_replica(
+            lambda conn: analitica.calcular_utilizacion(app.db_name, conexion=conn)
+        )
+        mensaje_reporte = ft.Text("", color=ft.Colors.GREEN)
+        
+        def crear_seccion(titulo, filas):
+            return ft.Column([
+                ft.Text(titulo, weight=ft.FontWeight.BOLD, size=16, color=ft.Colors.BLUE_800),
+                *([ft.Row([ft.Text(clave, width=220), ft.Text(valor, weight=ft.FontWeight.BOLD)]) for clave, valor in filas]
+                  or [ft.Text("Sin datos", color=ft.Colors.GREY_600)]),
+            ], spacing=5)
+        
+        content_area.controls.clear()
+        content_area.controls.append(
+            ft.Container(
+                content=ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.ListTile(
+                                leading=ft.Icon(ft.Icons.INSIGHTS, color=ft.Colors.BLUE_700),
+                                title=ft.Text("Reporte de Uso del Laboratorio", 
+                                            size=22, 
+                                            weight=ft.FontWeight.BOLD,
+                                            color=ft.Colors.BLUE_900),
+                                subtitle=ft.Text(f"Semestre {reporte['desde']} a {reporte['hasta']} | {reporte['reservas']} reservas"
+                                                 f" | Datos actualizados hace {atraso:.0f} s"),
+                                trailing=ft.ElevatedButton(
+                                    "Exportar CSV",
+                                    icon=ft.Icons.DOWNLOAD,
+                                    on_click=lambda e: exportar_reporte_uso(reporte, mensaje_reporte)
+                                )
+                            ),
+                            mensaje_reporte,
+                            ft.Divider(),
+                            crear_seccion("Utilización general", [
+                                ("Ocupación total", f"{reporte['utilizacion']}%"),
+                                ("Horas en huecos entre reservas", f"{reporte['horas_huecos']} h"),
+                            ]),
+                            crear_seccion("Ocupación por turno", [(turno, f"{pct}%") for turno, pct in reporte["por_turno"].items()]),
+                            crear_seccion("Horas pico", [(hora, f"{horas} h") for hora, horas in reporte["horas_pico"]]),
+                            crear_seccion("Ocupación por semana", [(semana, f"{pct}%") for semana, pct in reporte["por_semana"]]),
+                            crear_seccion("Huecos más largos", [(f"{fecha} {inicio}-{fin}", f"{minutos} min") for fecha, inicio, fin, minutos in reporte["huecos"]]),
+                            crear_seccion("Horas por carrera", [(carrera, f"{horas} h") for carrera, horas in reporte["por_carrera"]]),
+                            crear_seccion("Horas por docente", [(docente, f"{horas} h") for docente, horas in reporte["por_docente"]]),
+                        ], spacing=15),
+                        padding=20
+                    ),
+                    elevation=3
+                ),
+                padding=20,
+                expand=True
+            )
+        )
+        page.update()
+    
+    traspaso_origen = ft.TextField(label="Fecha del semestre de origen", hint_text="YYYY-MM-DD", width=250,
+                                   border_color=ft.Colors.BLUE_400, filled=True, fill_color=ft.Colors.WHITE)
+    traspaso_destino = ft.TextField(label="Fecha del semestre de destino", hint_text="YYYY-MM-DD", width=250,
+                                    border_color=ft.Colors.BLUE_400, filled=True, fill_color=ft.Colors.WHITE)
+    traspaso_solo_semestrales = ft.Checkbox(label="Solo reservas de todo el semestre", value=True)
+    traspaso_resultado = ft.Column(spacing=5)
+    
+    def ejecutar_traspaso(simular):
+        try:
+            fecha_origen = datetime.strptime(traspaso_origen.value.strip(), "%Y-%m-%d").date()
+            fecha_destino = datetime.strptime(traspaso_destino.value.strip(), "%Y-%m-%d").date()
+        except ValueError:
+            traspaso_resultado.controls = [ft.Text("❌ Formato de fecha inválido. Use YYYY-MM-DD", color=ft.Colors.RED)]
+            page.update()
+            return
+        
+        exito, mensaje, conflictos = app.traspasar_semestre(
+            fecha_origen, fecha_destino, traspaso_solo_semestrales.value, simular=simular
+        )
+        traspaso_resultado.controls = [
+            ft.Text(("✅ " if exito else "❌ ") + mensaje, color=ft.Colors.GREEN if exito else ft.Colors.RED,
+                   weight=ft.FontWeight.BOLD)
+        ]
+        if conflictos:
+            traspaso_resultado.controls.append(
+                ft.Text(f"{len(conflictos)} reservas se omiten por superponerse con reservas del destino:",
+                       color=ft.Colors.ORANGE_800)
+            )
+            traspaso_resultado.controls.extend(
+                ft.Text(f"• {curso} ({dia} {horario}) choca con {curso_conflicto} - {docente_conflicto}", size=13)
+                for _, curso, dia, horario, _, curso_conflicto, docente_conflicto in conflictos[:30]
+            )
+        page.update()
+    
+    def mostrar_traspaso():
+        if not usuario_autenticado or usuario_autenticado[4] != 'admin':
+            mostrar_nueva_reserva()
+            return
+        
+        nonlocal current_view
+        current_view = "traspaso"
+        
+        if not traspaso_origen.value:
+            traspaso_origen.value = date.today().isoformat()
+            traspaso_destino.value = siguiente_semestre(date.today())[0].isoformat()
+        traspaso_resultado.controls = []
+        
+        content_area.controls.clear()
+        content_area.controls.append(
+            ft.Container(
+                content=ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.ListTile(
+                                leading=ft.Icon(ft.Icons.NEXT_PLAN, color=ft.Colors.BLUE_700),
+                                title=ft.Text("Cambio de Semestre", 
+                                            size=22, 
+                                            weight=ft.FontWeight.BOLD,
+                                            color=ft.Colors.BLUE_900),
+                                subtitle=ft.Text("Copia las reservas de un semestre al siguiente en una sola operación"),
+                            ),
+                            ft.Divider(),
+                            ft.Row([traspaso_origen, traspaso_destino], wrap=True),
+                            traspaso_solo_semestrales,
+                            ft.Row([
+                                ft.OutlinedButton("Vista previa", icon=ft.Icons.PREVIEW,
+                                                  on_click=lambda e: ejecutar_traspaso(True)),
+                                ft.ElevatedButton("Copiar reservas", icon=ft.Icons.CONTENT_COPY,
+                                                  on_click=lambda e: ejecutar_traspaso(False)),
+                            ]),
+                            traspaso_resultado,
+                        ], spacing=15),
+                        padding=20
+                    ),
+                    elevation=3
+                ),
+                padding=20,
+                expand=True
+            )
+        )
+        page.update()
+    
+    # Id desde el que empieza cada página visitada de la auditoría (None = la más reciente)
+    paginas_auditoria = [None]
+    
+    def describir_cambios(antes, despues):
+        """Resume una entrada de auditoría: campos modificados o la reserva afectada"""
+        if antes and despues:
+            return [
+                f"{campo}: {antes.get(campo)} → {valor}"
+                for campo, valor in despues.items() if antes.get(campo) != valor and campo != "fecha_reserva"
+            ] or ["Sin cambios en los datos"]
+        reserva = despues or antes or {}
+        return [f"{reserva.get('curso')} | {reserva.get('dia')} {reserva.get('horario')} | {reserva.get('docente')}"]
+    
+    def cambiar_pagina_auditoria(desplazamiento, ultimo_id=None):
+        if desplazamiento > 0:
+            paginas_auditoria.append(ultimo_id)
+        elif len(paginas_auditoria) > 1:
+            paginas_auditoria.pop()
+        mostrar_auditoria(reiniciar=False)
+    
+    def mostrar_auditoria(reiniciar=True):
+        if not usuario_autenticado or usuario_autenticado[4] != 'admin':
+            mostrar_nueva_reserva()
+            return
+        
+        nonlocal current_view
+        current_view = "auditoria"
+        
+        if reiniciar:
+            paginas_auditoria[:] = [None]
+        
+        por_pagina = 20
+        entradas = app.obtener_auditoria(paginas_auditoria[-1], por_pagina)
+        total = app.contar_auditoria()
+        colores = {"crear": ft.Colors.GREEN_700, "editar": ft.Colors.BLUE_700, "eliminar": ft.Colors.RED_700}
+        
+        entradas_container = ft.Column(spacing=10)
+        if not entradas:
+            entradas_container.controls.append(ft.Text("No hay cambios registrados", color=ft.Colors.GREY_600))
+        for id_entrada, fecha, actor, operacion, entidad, entidad_id, antes, despues in entradas:
+            entradas_container.controls.append(
+                ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.Row([
+                                ft.Text(operacion.capitalize(), weight=ft.FontWeight.BOLD,
+                                       color=colores.get(operacion, ft.Colors.GREY_700)),
+                                ft.Text(f"{entidad} #{entidad_id}", weight=ft.FontWeight.BOLD),
+                                ft.Text(f"{fecha.replace('T', ' ')} | {actor or 'sistema'}", color=ft.Colors.GREY_700),
+                            ], spacing=15),
+                            *[ft.Text(cambio, size=13) for cambio in describir_cambios(antes, despues)],
+                        ], spacing=5),
+                        padding=10
+                    ),
+                    elevation=1
+                )
+            )
+        
+        numero_pagina = len(paginas_auditoria)
+        hay_siguiente = len(entradas) == por_pagina and numero_pagina * por_pagina < total
+        
+        content_area.controls.clear()
+        content_area.controls.append(
+            ft.Container(
+                content=ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.ListTile(
+                                leading=ft.Icon(ft.Icons.HISTORY, color=ft.Colors.BLUE_700),
+                                title=ft.Text("Auditoría de Reservas", 
+                                            size=22, 
+                                            weight=ft.FontWeight.BOLD,
+                                            color=ft.Colors.BLUE_900),
+                                subtitle=ft.Text(f"Total: {total} cambios | Página {numero_pagina}"),
+                            ),
+                            ft.Row([
+                                ft.TextButton("Anterior", icon=ft.Icons.CHEVRON_LEFT,
+                                             disabled=numero_pagina == 1,
+                                             on_click=lambda e: cambiar_pagina_auditoria(-1)),
+                                ft.TextButton("Siguiente", icon=ft.Icons.CHEVRON_RIGHT,
+                                             disabled=not hay_siguiente,
+                                             on_click=lambda e: cambiar_pagina_auditoria(1, entradas[-1][0])),
+                            ], alignment=ft.MainAxisAlignment.END),
+                            ft.Divider(),
+                            entradas_container,
+                        ], spacing=10),
+                        padding=20
+                    ),
+                    elevation=3
+                ),
+                padding=20,
+                expand=True
+            )
+        )
+        page.update()
+    
+    def accion_respaldo(accion, *args):
+        exito, mensaje = accion(*args)
+        mostrar_respaldos(("✅ " if exito else "❌ ") + mensaje, ft.Colors.GREEN if exito else ft.Colors.RED)
+    
+    def mostrar_respaldos(mensaje="", color=ft.Colors.GREEN):
+        if not usuario_autenticado or usuario_autenticado[4] != 'admin':
+            mostrar_nueva_reserva()
+            return
+        
+        nonlocal current_view
+        current_view = "respaldos"
+        
+        respaldos = app.obtener_respaldos()
+        respaldos_container = ft.Column(spacing=10)
+        if not respaldos:
+            respaldos_container.controls.append(ft.Text("Todavía no hay respaldos", color=ft.Colors.GREY_600))
+        for ruta, fecha, tamano in respaldos:
+            respaldos_container.controls.append(
+                ft.Card(
+                    content=ft.Container(
+                        content=ft.Row([
+                            ft.Icon(ft.Icons.STORAGE, color=ft.Colors.BLUE_700),
+                            ft.Column([
+                                ft.Text(fecha.strftime('%d/%m/%Y %H:%M:%S'), weight=ft.FontWeight.BOLD),
+                                ft.Text(f"{ruta} | {tamano / 1024:.0f} KB", size=12, color=ft.Colors.GREY_700),
+                            ], spacing=2, expand=True),
+                            ft.TextButton(
+                                "Restaurar",
+                                icon=ft.Icons.RESTORE,
+                                style=ft.ButtonStyle(color=ft.Colors.RED),
+                                on_click=lambda e, ruta=ruta: accion_respaldo(app.restaurar_respaldo, ruta)
+                            ),
+                        ]),
+                        padding=10
+                    ),
+                    elevation=1
+                )
+            )
+        
+        content_area.controls.clear()
+        content_area.controls.append(
+            ft.Container(
+                content=ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.ListTile(
+                                leading=ft.Icon(ft.Icons.BACKUP, color=ft.Colors.BLUE_700),
+                                title=ft.Text("Respaldos de la Base de Datos", 
+                                            size=22, 
+                                            weight=ft.FontWeight.BOLD,
+                                            color=ft.Colors.BLUE_900),
+                                subtitle=ft.Text(f"{len(respaldos)} respaldos verificados | Restaurar guarda antes el estado actual"),
+                                trailing=ft.ElevatedButton(
+                                    "Respaldar ahora",
+                                    icon=ft.Icons.SAVE,
+                                    on_click=lambda e: accion_respaldo(app.crear_respaldo)
+                                )
+                            ),
+                            ft.Text(mensaje, color=color, visible=bool(mensaje)),
+                            ft.Divider(),
+                            respaldos_container,
+                        ], spacing=10),
+                        padding=20
+                    ),
+                    elevation=3
+                ),
+                padding=20,
+                expand=True
+            )
+        )
+        page.update()
+    
+    def agregar_laboratorio_handler(campo):
+        if not campo.value or not campo.value.strip():
+            mostrar_laboratorios("❌ Ingrese el nombre del laboratorio", ft.Colors.RED)
+            return
+        exito, mensaje = app.agregar_laboratorio(campo.value)
+        mostrar_laboratorios(("✅ " if exito else "❌ ") + mensaje, ft.Colors.GREEN if exito else ft.Colors.RED)
+        if exito:
+            # El selector de la barra lateral aparece con el segundo laboratorio
+            actualizar_interfaz_principal()
+    
+    def buscar_semana_docente(campo, resultados):
+        resultados.controls.clear()
+        docente = (campo.value or "").strip()
+        if docente:
+            semana = app.obtener_semana_docente(docente)
+            if not semana:
+                resultados.controls.append(ft.Text(f"{docente} no tiene reservas en ningún laboratorio",
+                                                   color=ft.Colors.GREY_600))
+            for laboratorio, dia, horario, curso, carrera, turno in semana:
+                resultados.controls.append(
+                    ft.Text(f"• {dia} {horario} | {laboratorio} | {curso} ({carrera}, {turno})")
+                )
+        page.update()
+    
+    def mostrar_laboratorios(mensaje="", color=ft.Colors.GREEN):
+        if not usuario_autenticado or usuario_autenticado[4] != 'admin':
+            mostrar_nueva_reserva()
+            return
+        
+        nonlocal current_view
+        current_view = "laboratorios"
+        
+        laboratorios_container = ft.Column(spacing=10)
+        for id_lab, nombre, reservas, docentes in app.obtener_resumen_laboratorios():
+            laboratorios_container.controls.append(
+                ft.Card(
+                    content=ft.Container(
+                        content=ft.Row([
+                            ft.Icon(ft.Icons.DOMAIN,
+                                    color=ft.Colors.GREEN_700 if id_lab == app.laboratorio_id else ft.Colors.BLUE_700),
+                            ft.Column([
+                                ft.Text(nombre, weight=ft.FontWeight.BOLD),
+                                ft.Text(f"{reservas} reservas | {docentes} docentes", size=12, color=ft.Colors.GREY_700),
+                            ], spacing=2, expand=True),
+                            ft.TextButton(
+                                "Activo" if id_lab == app.laboratorio_id else "Seleccionar",
+                                icon=ft.Icons.CHECK if id_lab == app.laboratorio_id else ft.Icons.SWAP_HORIZ,
+                                disabled=id_lab == app.laboratorio_id,
+                                on_click=lambda e, id_lab=id_lab: cambiar_laboratorio(id_lab)
+                            ),
+                        ]),
+                        padding=10
+                    ),
+                    elevation=1
+                )
+            )
+        
+        campo_nombre = ft.TextField(label="Nombre del nuevo laboratorio", expand=True)
+        campo_docente = ft.TextField(label="Docente", expand=True,
+                                     on_submit=lambda e: buscar_semana_docente(campo_docente, semana_container))
+        semana_container = ft.Column(spacing=5)
+        
+        content_area.controls.clear()
+        content_area.controls.append(
+            ft.Container(
+                content=ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.ListTile(
+                                leading=ft.Icon(ft.Icons.DOMAIN, color=ft.Colors.BLUE_700),
+                                title=ft.Text("Laboratorios", 
+                                            size=22, 
+                                            weight=ft.FontWeight.BOLD,
+                                            color=ft.Colors.BLUE_900),
+                                subtitle=ft.Text("Cada laboratorio guarda sus reservas en su propio archivo"),
+                            ),
+                            ft.Text(mensaje, color=color, visible=bool(mensaje)),
+                            ft.Row([
+                                campo_nombre,
+                                ft.ElevatedButton("Agregar", icon=ft.Icons.ADD,
+                                                  on_click=lambda e: agregar_laboratorio_handler(campo_nombre)),
+                            ]),
+                            ft.Divider(),
+                            laboratorios_container,
+                            ft.Divider(),
+                            ft.Text("Semana de un docente en todos los laboratorios", weight=ft.FontWeight.BOLD, size=16),
+                            ft.Row([
+                                campo_docente,
+                                ft.ElevatedButton("Ver semana", icon=ft.Icons.SEARCH,
+                                                  on_click=lambda e: buscar_semana_docente(campo_docente, semana_container)),
+                            ]),
+                            semana_container,
+                        ], spacing=10, scroll=ft.ScrollMode.AUTO),
+                        padding=20
+                    ),
+                    elevation=3
+                ),
+                padding=20,
+                expand=True
+            )
+        )
+        page.update()
+    
+    def ejecutar_mantenimiento_handler():
+        app.ejecutar_mantenimiento()
+        mostrar_informacion()
+    
     def mostrar_informacion():
         if not usuario_autenticado:
             mostrar_login()
@@ -1766,6 +4250,35 @@ def main(page: ft.Page):
         nonlocal current_view
         current_view = "informacion"
         
+        # Estadísticas de la cola de escritura (solo administradores y con la cola activa)
+        detalles_escritura = []
+        if usuario_autenticado[4] == 'admin' and app.cola_escritura is not None:
+            estadisticas = app.obtener_cola_escritura().estadisticas()
+            detalles_escritura = [
+                ft.Text("Cola de escritura:", weight=ft.FontWeight.BOLD, size=16),
+                ft.Text(f"• Escrituras: {estadisticas['escrituras']} en {estadisticas['lotes']} commits "
+                        f"(errores: {estadisticas['errores']})"),
+                ft.Text(f"• Tamaño de lote: promedio {estadisticas['lote_promedio']}, "
+                        f"máximo {estadisticas['lote_maximo']}, último {estadisticas['ultimo_lote']}"),
+                ft.Text(f"• Latencia de commit: promedio {estadisticas['latencia_promedio_ms']} ms, "
+                        f"última {estadisticas['ultima_latencia_ms']} ms"),
+            ]
+        
+        # Historial de mantenimiento de la base (solo administradores)
+        detalles_mantenimiento = []
+        if usuario_autenticado[4] == 'admin':
+            detalles_mantenimiento = [
+                ft.Row([
+                    ft.Text("Mantenimiento de la base:", weight=ft.FontWeight.BOLD, size=16),
+                    ft.TextButton("Ejecutar ahora", icon=ft.Icons.BUILD, on_click=lambda e: ejecutar_mantenimiento_handler()),
+                ]),
+                *([
+                    ft.Text(f"• {fecha.replace('T', ' ')} {tarea}: {duracion:.0f} ms, {resultado}"
+                            + (f" ({recuperado / 1024:.0f} KB recuperados)" if recuperado else ""))
+                    for fecha, tarea, duracion, resultado, recuperado in app.obtener_historial_mantenimiento()
+                ] or [ft.Text("• Todavía no se ejecutó", color=ft.Colors.GREY_600)]),
+            ]
+        
         content_area.controls.clear()
         content_area.controls.append(
             ft.Container(
@@ -1797,6 +4310,8 @@ def main(page: ft.Page):
                                     ft.Text("• Sistema de autenticación de usuarios"),
                                     ft.Text("• Gestión de usuarios con roles"),
                                     ft.Text("• Base de datos SQLite integrada"),
+                                    *detalles_escritura,
+                                    *detalles_mantenimiento,
                                     ft.Text("\nDesarrollado con Python y Flet",
                                            weight=ft.FontWeight.BOLD,
                                            color=ft.Colors.BLUE_600)
@@ -1814,6 +4329,104 @@ def main(page: ft.Page):
         )
         page.update()
     
+    # ========== PANTALLA DE KIOSCO ==========
+    
+    kiosco = {"activo": False, "monitor": None, "fecha": None, "ocurrencias": [], "estado": None}
+    
+    def crear_fila_kiosco(ocurrencia, destacada):
+        inicio, fin, id_reserva, turno, docente, carrera, curso = ocurrencia
+        return ft.Container(
+            content=ft.Row([
+                ft.Text(f"{minutos_a_hora(inicio)} - {minutos_a_hora(fin)}",
+                       size=22 if destacada else 18,
+                       weight=ft.FontWeight.BOLD,
+                       width=200),
+                ft.Column([
+                    ft.Text(curso, size=22 if destacada else 18, weight=ft.FontWeight.BOLD),
+                    ft.Text(f"{docente} | {carrera} | {turno}", size=14, color=ft.Colors.GREY_700),
+                ], spacing=2),
+            ]),
+            bgcolor=ft.Colors.GREEN_100 if destacada else ft.Colors.WHITE,
+            border=ft.border.all(1, ft.Colors.GREY_300),
+            border_radius=8,
+            padding=15
+        )
+    
+    def refrescar_kiosco():
+        """Consulta las ocurrencias de hoy solo si hubo escrituras, y redibuja si algo cambió"""
+        hoy = date.today()
+        if kiosco["monitor"].hay_cambios() or kiosco["fecha"] != hoy:
+            kiosco["fecha"] = hoy
+            kiosco["ocurrencias"] = app.obtener_ocurrencias_del_dia(hoy)
+        
+        ahora = datetime.now()
+        minuto = ahora.hour * 60 + ahora.minute
+        en_curso = [o for o in kiosco["ocurrencias"] if o[0] <= minuto < o[1]]
+        proximas = [o for o in kiosco["ocurrencias"] if o[0] > minuto]
+        
+        estado = (hoy, tuple(kiosco["ocurrencias"]), tuple(en_curso), tuple(proximas))
+        if estado == kiosco["estado"]:
+            return False
+        kiosco["estado"] = estado
+        
+        titulo_fecha = hoy.strftime('%d/%m/%Y')
+        if hoy.weekday() < len(DIAS_SEMANA):
+            titulo_fecha = f"{DIAS_SEMANA[hoy.weekday()]} {titulo_fecha}"
+        
+        main_container.controls.clear()
+        main_container.controls.append(
+            ft.Container(
+                content=ft.Column([
+                    ft.Row([
+                        ft.Icon(ft.Icons.COMPUTER, size=40, color=ft.Colors.WHITE),
+                        ft.Text("Laboratorio de Informática", size=28, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                        ft.Container(expand=True),
+                        ft.Text(titulo_fecha, size=20, color=ft.Colors.WHITE),
+                    ]),
+                    ft.Text("Ahora", size=20, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                    *([crear_fila_kiosco(o, True) for o in en_curso] or
+                      [ft.Text("Laboratorio libre", size=22, color=ft.Colors.WHITE)]),
+                    ft.Text("Próximas sesiones de hoy", size=20, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                    *([crear_fila_kiosco(o, False) for o in proximas] or
+                      [ft.Text("No hay más sesiones hoy", size=18, color=ft.Colors.WHITE)]),
+                ], spacing=15, scroll=ft.ScrollMode.ADAPTIVE),
+                bgcolor=ft.Colors.BLUE_900,
+                padding=30,
+                expand=True
+            )
+        )
+        page.update()
+        return True
+    
+    def ciclo_kiosco():
+        try:
+            while kiosco["activo"]:
+                try:
+                    refrescar_kiosco()
+                except Exception as ex:
+                    # Un error suelto no detiene la pantalla: en la próxima vuelta se recarga y redibuja todo
+                    print(f"❌ Error al refrescar el kiosco: {str(ex)}")
+                    kiosco["fecha"] = None
+                    kiosco["estado"] = None
+                time.sleep(INTERVALO_KIOSCO)
+        finally:
+            kiosco["monitor"].cerrar()
+    
+    def detener_kiosco(e=None):
+        kiosco["activo"] = False
+    
+    def mostrar_kiosco():
+        """Pantalla pública de solo lectura con las sesiones de hoy"""
+        nonlocal current_view
+        current_view = "kiosco"
+        
+        page.title = "Laboratorio - Hoy"
+        kiosco["activo"] = True
+        kiosco["monitor"] = MonitorCambios(app)
+        page.on_disconnect = detener_kiosco
+        refrescar_kiosco()
+        page.run_thread(ciclo_kiosco)
+    
     # ========== INTERFAZ PRINCIPAL ==========
     
     # Área de contenido principal
@@ -1825,9 +4438,17 @@ def main(page: ft.Page):
     # Layout principal
     page.add(main_container)
     
-    # Mostrar la vista inicial (login)
-    actualizar_interfaz_principal()
-    mostrar_login()
+    # La pantalla de kiosco no requiere sesión; el resto empieza en el login
+    if page.route == "/kiosco":
+        mostrar_kiosco()
+    else:
+        actualizar_interfaz_principal()
+        mostrar_login()
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    puerto = os.environ.get("LABORATORIO_PUERTO")
+    if puerto:
+        # Worker de lanzador.py: sin ventana, atendiendo por HTTP en el puerto asignado
+        ft.app(target=main, port=int(puerto), view=None)
+    else:
+        ft.app(target=main)
\ No newline at end of file
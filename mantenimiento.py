@@ -0,0 +1,175 @@
+"""Mantenimiento de la base de datos en segundo plano durante los períodos sin actividad"""
+import os
+import threading
+import time
+from datetime import datetime
+
+from cambios import compactar_cambios
+from conexion import conectar, en_memoria, ruta_archivo, solo_lectura
+
+def init_mantenimiento(cursor):
+    """Crea la tabla con el historial de tareas de mantenimiento"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mantenimiento (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT NOT NULL,
+            tarea TEXT NOT NULL,
+            duracion_ms REAL NOT NULL,
+            resultado TEXT,
+            bytes_recuperados INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+def archivo_actividad(db_name):
+    """Archivo junto a la base cuya fecha de modificación es la última solicitud de cualquier proceso"""
+    return f"{ruta_archivo(db_name)}-actividad"
+
+def marcar_actividad(db_name):
+    """Actualiza la fecha del archivo de actividad; las bases en memoria o de solo lectura no lo usan"""
+    if en_memoria(db_name) or solo_lectura(db_name):
+        return
+    ruta = archivo_actividad(db_name)
+    try:
+        open(ruta, "a").close()
+        os.utime(ruta)
+    except OSError:
+        pass
+
+def ultima_actividad(db_name):
+    """Fecha (en ns) del archivo de actividad, o None si ningún proceso lo marcó todavía"""
+    try:
+        return os.stat(archivo_actividad(db_name)).st_mtime_ns
+    except OSError:
+        return None
+
+def _optimizar(conn, continuar):
+    # Sin estadísticas previas PRAGMA optimize no analiza nada: la primera vez va ANALYZE completo
+    tiene_estadisticas = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()[0]
+    if tiene_estadisticas:
+        conn.execute("PRAGMA optimize")
+        return "PRAGMA optimize", 0
+    conn.execute("ANALYZE")
+    return "ANALYZE", 0
+
+def _compactar_cambios(conn, continuar):
+    # LABORATORIO_CAMBIOS_DIAS: días que se conserva el registro de cambios (0 lo conserva entero)
+    dias = int(os.environ.get("LABORATORIO_CAMBIOS_DIAS", "90"))
+    if dias <= 0:
+        return "Compactación desactivada", 0
+    return f"{compactar_cambios(conn, dias=dias)} cambios eliminados", 0
+
+# Páginas libres (en cantidad y en proporción del archivo) a partir de las que conviene el VACUUM completo
+MINIMO_PAGINAS_VACUUM = 1024
+FRACCION_LIBRE_VACUUM = 0.1
+
+def _vaciar_paginas_libres(conn, continuar, paginas_por_paso=256):
+    tamano_pagina = conn.execute("PRAGMA page_size").fetchone()[0]
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # incremental_vacuum solo funciona con auto_vacuum=INCREMENTAL, que requiere un VACUUM para activarse;
+        # ese VACUUM reescribe todo el archivo y bloquea la base, así que solo vale la pena con mucho espacio libre
+        libres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        paginas = conn.execute("PRAGMA page_count").fetchone()[0]
+        if libres < MINIMO_PAGINAS_VACUUM or libres < paginas * FRACCION_LIBRE_VACUUM:
+            return f"{libres} de {paginas} páginas libres; VACUUM no necesario", 0
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return "auto_vacuum=INCREMENTAL activado con VACUUM", libres * tamano_pagina
+    liberadas = 0
+    # Por pasos: si vuelve la actividad se deja el resto para el próximo ciclo
+    while continuar():
+        libres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not libres:
+            break
+        conn.execute(f"PRAGMA incremental_vacuum({min(libres, paginas_por_paso)})").fetchall()
+        liberadas += libres - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return f"{liberadas} páginas liberadas", liberadas * tamano_pagina
+
+def _chequear(conn, continuar):
+    resultado = conn.execute("PRAGMA quick_check").fetchall()
+    return "; ".join(fila[0] for fila in resultado[:5]), 0
+
+# De la más liviana a la más pesada: si vuelve la actividad, lo que queda es lo que más bloquea
+TAREAS = (
+    ("optimize", _optimizar),
+    ("compactar_cambios", _compactar_cambios),
+    ("quick_check", _chequear),
+    ("incremental_vacuum", _vaciar_paginas_libres),
+)
+
+def ejecutar_mantenimiento(db_name, continuar=lambda: True):
+    """Ejecuta las tareas en orden mientras `continuar()` sea verdadero y guarda su duración y resultado"""
+    # Autocommit: VACUUM y los PRAGMA no pueden correr dentro de una transacción
+    conn = conectar(db_name, isolation_level=None)
+    registros = []
+    try:
+        for tarea, funcion in TAREAS:
+            if not continuar():
+                break
+            inicio = time.perf_counter()
+            try:
+                resultado, recuperado = funcion(conn, continuar)
+            except Exception as e:
+                # Una tarea fallida (o mal configurada) queda en el historial y no frena a las siguientes
+                resultado, recuperado = f"Error: {str(e)}", 0
+            duracion = round((time.perf_counter() - inicio) * 1000, 2)
+            registros.append((datetime.now().isoformat(timespec="seconds"), tarea, duracion, resultado, recuperado))
+        conn.executemany('''
+            INSERT INTO mantenimiento (fecha, tarea, duracion_ms, resultado, bytes_recuperados)
+            VALUES (?, ?, ?, ?, ?)
+        ''', registros)
+    finally:
+        conn.close()
+    return registros
+
+class ProgramadorMantenimiento:
+    """Hilo de baja prioridad que corre el mantenimiento cuando no hubo solicitudes por un rato
+
+    `actividad` es una función que devuelve una marca que cambia con cada solicitud, de
+    lectura o de escritura; mientras cambie, la base se considera en uso.
+    """
+
+    def __init__(self, db_name, actividad, intervalo, inactividad=120, revision=30):
+        self.db_name = db_name
+        self.actividad = actividad
+        self.intervalo = intervalo
+        self.inactividad = inactividad
+        self.revision = revision
+        self.ultima_ejecucion = None
+        self._marca = (actividad(), time.monotonic())
+        self._detenido = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name="mantenimiento", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo; una tarea en curso termina su paso actual"""
+        self._detenido.set()
+        self._hilo.join()
+
+    def inactiva(self):
+        """True si el contador de actividad no cambió durante `inactividad` segundos"""
+        contador = self.actividad()
+        if contador != self._marca[0]:
+            self._marca = (contador, time.monotonic())
+            return False
+        return time.monotonic() - self._marca[1] >= self.inactividad
+
+    def _ciclo(self):
+        try:
+            # En Linux la prioridad se puede bajar solo para este hilo
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        while not self._detenido.wait(self.revision):
+            vencido = self.ultima_ejecucion is None or time.monotonic() - self.ultima_ejecucion >= self.intervalo
+            if not vencido:
+                continue
+            try:
+                if not self.inactiva():
+                    continue
+                ejecutar_mantenimiento(self.db_name, lambda: not self._detenido.is_set() and self.inactiva())
+            except Exception as e:
+                # Un error suelto no detiene el hilo: se reintenta en el próximo intervalo
+                print(f"❌ Error en el mantenimiento: {str(e)}")
+            self.ultima_ejecucion = time.monotonic()
@@ -0,0 +1,82 @@
+"""Réplica de solo lectura para reportes, refrescada con la API de backup de SQLite"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from conexion import conectar, derivar, ruta_archivo
+
+class ReplicaLectura:
+    """Copia de la base que atiende las consultas pesadas con su propio pool de conexiones
+
+    La réplica se refresca cada `intervalo` segundos si la base principal cambió; si al pedir
+    una conexión el atraso supera `max_atraso`, se refresca antes de entregarla.
+    """
+
+    def __init__(self, db_name, ruta=None, intervalo=60, max_atraso=300, tamano_pool=4):
+        self.db_name = db_name
+        self.ruta = ruta or ruta_archivo(derivar(db_name, "-replica"))
+        self.intervalo = intervalo
+        self.max_atraso = max_atraso
+        self._lock = threading.Lock()
+        self._version = None
+        self._sincronizada = None
+        self.refrescar()
+        self._pool = queue.Queue()
+        for _ in range(tamano_pool):
+            self._pool.put(conectar(f"file:{self.ruta}?mode=ro", check_same_thread=False))
+        self._detenida = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name="replica", daemon=True)
+        self._hilo.start()
+
+    def refrescar(self):
+        """Copia la base principal en la réplica si cambió desde la última copia"""
+        with self._lock:
+            inicio = time.monotonic()
+            principal = conectar(self.db_name)
+            try:
+                version = principal.execute('SELECT version FROM version_datos WHERE id = 1').fetchone()
+                if version == self._version and os.path.exists(self.ruta):
+                    # Sin escrituras desde la copia anterior: la réplica sigue al día
+                    self._sincronizada = inicio
+                    return False
+                copia = conectar(self.ruta)
+                try:
+                    # En un solo paso: los lectores de la réplica esperan lo justo y nunca ven una copia a medias
+                    principal.backup(copia)
+                finally:
+                    copia.close()
+            finally:
+                principal.close()
+            self._version = version
+            self._sincronizada = inicio
+            return True
+
+    def atraso(self):
+        """Segundos desde la última vez que la réplica coincidía con la base principal"""
+        return time.monotonic() - self._sincronizada
+
+    @contextmanager
+    def conexion(self):
+        """Presta una conexión de solo lectura a la réplica, refrescándola si está demasiado atrasada"""
+        if self.atraso() > self.max_atraso:
+            self.refrescar()
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def detener(self):
+        """Detiene el refresco periódico"""
+        self._detenida.set()
+        self._hilo.join()
+
+    def _ciclo(self):
+        while not self._detenida.wait(self.intervalo):
+            try:
+                self.refrescar()
+            except sqlite3.Error as e:
+                print(f"❌ Error al refrescar la réplica: {str(e)}")
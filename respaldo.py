@@ -0,0 +1,110 @@
+"""Respaldos en caliente de la base de datos con la API de backup de SQLite"""
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from conexion import conectar, nombre_base
+
+CARPETA_RESPALDOS = "respaldos"
+
+def verificar_respaldo(ruta):
+    """Devuelve True si el archivo tiene esquema y pasa el integrity_check de SQLite"""
+    try:
+        conn = conectar(f"file:{ruta}?mode=ro")
+    except sqlite3.Error:
+        return False
+    try:
+        # Un archivo vacío o ajeno también "pasa" el chequeo, pero no es un respaldo
+        if not conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]:
+            return False
+        return conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        conn.close()
+
+def copiar_base(origen, destino, paginas=64, pausa=0.01):
+    """Copia `origen` en `destino` por tramos de `paginas`, durmiendo `pausa` segundos entre tramos"""
+    # Entre tramos se libera el bloqueo de lectura, así las sesiones pueden seguir escribiendo
+    fuente = conectar(origen)
+    copia = conectar(destino)
+    try:
+        fuente.backup(copia, pages=paginas, sleep=pausa)
+    finally:
+        copia.close()
+        fuente.close()
+
+def crear_respaldo(db_name, carpeta=CARPETA_RESPALDOS, conservar=10, paginas=64, pausa=0.01):
+    """Crea una instantánea verificada de la base de datos y rota las más antiguas"""
+    os.makedirs(carpeta, exist_ok=True)
+    nombre = nombre_base(db_name)
+    ruta = os.path.join(carpeta, f"{nombre}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db")
+    copiar_base(db_name, ruta, paginas, pausa)
+    if not verificar_respaldo(ruta):
+        os.remove(ruta)
+        raise sqlite3.DatabaseError(f"El respaldo {ruta} no pasó la verificación de integridad")
+    rotar_respaldos(db_name, carpeta, conservar)
+    return ruta
+
+def listar_respaldos(db_name, carpeta=CARPETA_RESPALDOS):
+    """Lista (ruta, fecha, tamaño en bytes) de los respaldos, del más reciente al más antiguo"""
+    if not os.path.isdir(carpeta):
+        return []
+    # Nombre exacto: "laboratorio-" también es el comienzo de los respaldos de "laboratorio-lab2"
+    patron = re.compile(rf"{re.escape(nombre_base(db_name))}-\d{{8}}-\d{{6}}-\d+\.db")
+    respaldos = []
+    for archivo in os.listdir(carpeta):
+        if patron.fullmatch(archivo):
+            ruta = os.path.join(carpeta, archivo)
+            estado = os.stat(ruta)
+            respaldos.append((ruta, datetime.fromtimestamp(estado.st_mtime), estado.st_size))
+    # El nombre lleva la marca de tiempo, así que el orden alfabético es cronológico
+    return sorted(respaldos, key=lambda r: os.path.basename(r[0]), reverse=True)
+
+def rotar_respaldos(db_name, carpeta=CARPETA_RESPALDOS, conservar=10):
+    """Elimina los respaldos que exceden los `conservar` más recientes"""
+    eliminados = []
+    for ruta, _, _ in listar_respaldos(db_name, carpeta)[conservar:]:
+        os.remove(ruta)
+        eliminados.append(ruta)
+    return eliminados
+
+def restaurar_respaldo(db_name, ruta, carpeta=CARPETA_RESPALDOS, conservar=10):
+    """Reemplaza el contenido de la base por el respaldo; antes guarda una instantánea del estado actual"""
+    if not verificar_respaldo(ruta):
+        raise sqlite3.DatabaseError(f"El respaldo {ruta} no pasó la verificación de integridad")
+    # Se conserva uno más para no rotar el respaldo que se está por restaurar
+    previo = crear_respaldo(db_name, carpeta, conservar + 1)
+    # En un solo tramo: la base queda bloqueada lo justo y nunca a medio restaurar
+    copiar_base(ruta, db_name, paginas=-1, pausa=0)
+    return previo
+
+class ProgramadorRespaldos:
+    """Hilo en segundo plano que crea un respaldo cada `intervalo` segundos"""
+
+    def __init__(self, db_name, intervalo, carpeta=CARPETA_RESPALDOS, conservar=10):
+        self.db_name = db_name
+        self.intervalo = intervalo
+        self.carpeta = carpeta
+        self.conservar = conservar
+        self.ultimo = None
+        self.ultimo_error = None
+        self._detenido = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name="respaldos", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo sin esperar al próximo respaldo"""
+        self._detenido.set()
+        self._hilo.join()
+
+    def _ciclo(self):
+        while not self._detenido.wait(self.intervalo):
+            try:
+                self.ultimo = crear_respaldo(self.db_name, self.carpeta, self.conservar)
+                self.ultimo_error = None
+            except (sqlite3.Error, OSError) as e:
+                self.ultimo_error = str(e)
+                print(f"❌ Error al crear respaldo: {str(e)}")
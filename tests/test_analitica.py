@@ -0,0 +1,26 @@
+from datetime import date
+
+from analitica import calcular_utilizacion
+
+def test_una_reserva_semestral_cuenta_solo_en_su_semestre(app, conn):
+    app.agregar_reserva("Lunes", "Mañana", "Ana Gómez", "Ingeniería en Sistemas", "Programación",
+                        "08:00 - 09:00", "Todo el semestre")
+    # Hecha en marzo, con sus ocurrencias en el primer semestre
+    cursor = conn.cursor()
+    cursor.execute("UPDATE reservas SET fecha_reserva = '2026-03-05 10:00:00' RETURNING id")
+    app.generar_ocurrencias(cursor, cursor.fetchone()[0], "Lunes", "08:00 - 09:00", referencia=date(2026, 3, 5))
+    conn.commit()
+
+    reporte = calcular_utilizacion(app.db_name, date(2026, 9, 1), date(2026, 9, 30))
+    assert reporte["reservas"] == 0
+    assert reporte["por_docente"] == []
+
+    # Copiada al segundo semestre: en septiembre cuenta una sola vez, los 4 lunes
+    app.traspasar_semestre(date(2026, 3, 1), date(2026, 8, 1), simular=False)
+    reporte = calcular_utilizacion(app.db_name, date(2026, 9, 1), date(2026, 9, 30))
+    assert reporte["reservas"] == 1
+    assert reporte["por_docente"] == [("Ana Gómez", 4.0)]
+    assert reporte["por_carrera"] == [("Ingeniería en Sistemas", 4.0)]
+
+    reporte = calcular_utilizacion(app.db_name, date(2026, 3, 1), date(2026, 3, 31))
+    assert reporte["por_docente"] == [("Ana Gómez", 5.0)]
@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+
+import pytest
+
+from escritura import ColaEscritura
+
+def insertar_curso(cursor, curso):
+    cursor.execute("INSERT INTO carreras (nombre) VALUES (?)", (curso,))
+    return cursor.lastrowid
+
+def fallar(cursor, curso):
+    cursor.execute("INSERT INTO carreras (nombre) VALUES (?)", (curso,))
+    raise ValueError("falla a propósito")
+
+def deshacer_todo(cursor):
+    # Como un SQLITE_FULL: SQLite termina la transacción completa, no solo el savepoint
+    cursor.execute("INSERT INTO carreras (nombre) VALUES ('perdida')")
+    cursor.execute("ROLLBACK")
+    raise sqlite3.OperationalError("transacción abortada")
+
+def carreras(conn):
+    return {nombre for nombre, in conn.execute("SELECT nombre FROM carreras")}
+
+@pytest.fixture
+def cola(app):
+    cola = ColaEscritura(app.db_name, espera=0.05)
+    yield cola
+    if cola.activa:
+        cola.detener()
+
+def test_agrupa_escrituras_concurrentes_en_un_lote(cola, conn):
+    barrera = threading.Barrier(20)
+    futuros = []
+
+    def enviar(i):
+        barrera.wait()
+        futuros.append(cola.enviar(insertar_curso, f"Lote {i}"))
+
+    hilos = [threading.Thread(target=enviar, args=(i,)) for i in range(20)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    ids = [futuro.result(timeout=5) for futuro in futuros]
+    assert len(set(ids)) == 20
+    assert {f"Lote {i}" for i in range(20)} <= carreras(conn)
+    estadisticas = cola.estadisticas()
+    assert estadisticas["escrituras"] == 20
+    assert estadisticas["lote_maximo"] > 1
+    assert estadisticas["errores"] == 0
+
+def test_un_pedido_fallido_no_deshace_a_los_demas_del_lote(cola, conn):
+    # Un pedido lento hace que los siguientes se junten en el mismo lote
+    bloqueo = threading.Event()
+    primero = cola.enviar(lambda cursor: bloqueo.wait(5))
+    antes = cola.enviar(insertar_curso, "Antes")
+    fallida = cola.enviar(fallar, "Fallida")
+    despues = cola.enviar(insertar_curso, "Después")
+    bloqueo.set()
+
+    primero.result(timeout=5)
+    assert antes.result(timeout=5)
+    with pytest.raises(ValueError):
+        fallida.result(timeout=5)
+    assert despues.result(timeout=5)
+    nombres = carreras(conn)
+    assert {"Antes", "Después"} <= nombres
+    assert "Fallida" not in nombres
+    assert cola.estadisticas()["errores"] == 1
+
+def test_una_transaccion_abortada_falla_el_lote_y_la_cola_sigue(cola, conn):
+    bloqueo = threading.Event()
+    cola.enviar(lambda cursor: bloqueo.wait(5))
+    lote = [cola.enviar(insertar_curso, "Con el abortado"), cola.enviar(deshacer_todo)]
+    bloqueo.set()
+
+    for futuro in lote:
+        with pytest.raises(sqlite3.Error):
+            futuro.result(timeout=5)
+    assert "Con el abortado" not in carreras(conn)
+
+    # La conexión del hilo escritor quedó fuera de transacción: las escrituras siguientes funcionan
+    assert cola.activa
+    assert cola.enviar(insertar_curso, "Siguiente").result(timeout=5)
+    assert "Siguiente" in carreras(conn)
+
+def test_detener_procesa_lo_pendiente_y_rechaza_nuevas(cola, conn):
+    futuros = [cola.enviar(insertar_curso, f"Pendiente {i}") for i in range(5)]
+    cola.detener()
+
+    assert all(futuro.done() for futuro in futuros)
+    assert {f"Pendiente {i}" for i in range(5)} <= carreras(conn)
+    assert not cola.activa
+    with pytest.raises(RuntimeError):
+        cola.enviar(insertar_curso, "Tarde")
+
+def test_la_app_recrea_la_cola_si_el_hilo_termino(app):
+    cola = app.obtener_cola_escritura()
+    cola.detener()
+    nueva = app.obtener_cola_escritura()
+    assert nueva is not cola
+    assert nueva.activa
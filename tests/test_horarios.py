@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+
+from horarios import limites_semestre, siguiente_semestre
+
+PRIMERO = (date(2026, 2, 1), date(2026, 7, 15))
+SEGUNDO = (date(2026, 7, 16), date(2026, 12, 20))
+
+@pytest.mark.parametrize("fecha, semestre", [
+    (date(2026, 2, 1), PRIMERO),
+    (date(2026, 7, 15), PRIMERO),
+    (date(2026, 7, 16), SEGUNDO),
+    (date(2026, 7, 31), SEGUNDO),
+    (date(2026, 12, 20), SEGUNDO),
+])
+def test_limites_semestre_en_los_bordes(fecha, semestre):
+    assert limites_semestre(fecha) == semestre
+
+def test_cada_semestre_contiene_sus_propios_limites():
+    for inicio, fin in (PRIMERO, SEGUNDO):
+        assert limites_semestre(inicio) == limites_semestre(fin) == (inicio, fin)
+
+@pytest.mark.parametrize("fecha, semestre", [
+    (date(2026, 3, 1), SEGUNDO),
+    (date(2026, 7, 15), SEGUNDO),
+    (date(2026, 7, 16), (date(2027, 2, 1), date(2027, 7, 15))),
+    (date(2026, 12, 20), (date(2027, 2, 1), date(2027, 7, 15))),
+])
+def test_siguiente_semestre(fecha, semestre):
+    assert siguiente_semestre(fecha) == semestre
+    assert siguiente_semestre(fecha) != limites_semestre(fecha)
@@ -0,0 +1,128 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from api import ServidorAPI, crear_token
+
+def reserva(curso, **campos):
+    return {"dia": "Lunes", "turno": "Mañana", "docente": "Ana Gómez", "carrera": "Ingeniería en Sistemas",
+            "curso": curso, "horario": "08:00 - 09:00", "periodo": "Todo el semestre", **campos}
+
+def cursos(conn):
+    return [curso for curso, in conn.execute("SELECT curso FROM reservas ORDER BY id")]
+
+@pytest.fixture
+def ana(app, conn):
+    app.agregar_usuario("ana", "clave123", "Ana Gómez")
+    return conn.execute("SELECT id FROM usuarios WHERE username = 'ana'").fetchone()[0]
+
+def test_crea_actualiza_y_elimina_en_una_transaccion(app, conn):
+    exito, mensaje, creadas = app.aplicar_lote_reservas(crear=[reserva("A"), reserva("B"), reserva("C")])
+    assert exito
+    assert mensaje == "3 creadas, 0 actualizadas, 0 eliminadas"
+    assert len(creadas) == 3
+
+    exito, mensaje, nuevas = app.aplicar_lote_reservas(
+        crear=[reserva("D")],
+        actualizar=[reserva("B2", id=creadas[1], docente="Luis Pérez")],
+        eliminar=[creadas[2]],
+    )
+    assert exito
+    assert mensaje == "1 creadas, 1 actualizadas, 1 eliminadas"
+    assert cursos(conn) == ["A", "B2", "D"]
+    assert conn.execute("SELECT docente FROM reservas_detalle WHERE id = ?", (creadas[1],)).fetchone() == ("Luis Pérez",)
+    # Las ocurrencias de la eliminada se van con ella
+    assert conn.execute("SELECT COUNT(*) FROM ocurrencias WHERE reserva_id = ?", (creadas[2],)).fetchone() == (0,)
+
+@pytest.mark.parametrize("datos", [
+    {"dia": "Lunes"},
+    reserva("X", dia="Domingo"),
+    reserva("X", turno="Madrugada"),
+    reserva("X", horario="8 a 9"),
+    reserva("X", fecha_inicio="2026-09-01"),
+    reserva("X", fecha_inicio="2026-09-31", fecha_fin="2026-10-31"),
+    reserva("X", fecha_inicio="2026-10-01", fecha_fin="2026-09-01"),
+    "no es una reserva",
+])
+def test_valida_todo_el_lote_antes_de_escribir(app, conn, datos):
+    exito, mensaje, creadas = app.aplicar_lote_reservas(crear=[reserva("Válida"), datos])
+    assert not exito
+    # El mensaje ubica la reserva inválida dentro del lote
+    assert mensaje.startswith("Lote inválido: crear #2: ")
+    assert creadas == []
+    assert cursos(conn) == []
+
+def test_normaliza_las_fechas(app, conn):
+    exito, _, creadas = app.aplicar_lote_reservas(
+        crear=[reserva("Fechas", fecha_inicio="2026-9-1", fecha_fin="2026-9-30", periodo="Septiembre")])
+    assert exito
+    assert conn.execute("SELECT fecha_inicio, fecha_fin FROM reservas WHERE id = ?",
+                        (creadas[0],)).fetchone() == ("2026-09-01", "2026-09-30")
+
+def test_una_reserva_inexistente_no_aplica_nada(app, conn):
+    _, _, creadas = app.aplicar_lote_reservas(crear=[reserva("A")])
+
+    exito, mensaje, nuevas = app.aplicar_lote_reservas(crear=[reserva("B")], eliminar=[creadas[0], 999, 998])
+    assert not exito
+    assert mensaje == "No existen las reservas 998, 999"
+    assert nuevas == []
+    assert cursos(conn) == ["A"]
+
+def test_un_usuario_solo_modifica_sus_reservas(app, conn, ana):
+    _, _, ajenas = app.aplicar_lote_reservas(crear=[reserva("Ajena", docente="Luis Pérez")])
+
+    exito, mensaje, _ = app.aplicar_lote_reservas(crear=[reserva("Propia")], eliminar=ajenas, usuario_id=ana)
+    assert not exito
+    assert mensaje == "Solo se pueden modificar las reservas propias"
+    assert cursos(conn) == ["Ajena"]
+
+    exito, _, propias = app.aplicar_lote_reservas(crear=[reserva("Propia")], usuario_id=ana)
+    assert exito
+    assert conn.execute("SELECT usuario_id FROM reservas WHERE id = ?", (propias[0],)).fetchone() == (ana,)
+
+def test_el_tipo_de_error_no_depende_del_mensaje(app, ana):
+    _, _, ajenas = app.aplicar_lote_reservas(crear=[reserva("Ajena", docente="Luis Pérez")])
+
+    with pytest.raises(ValueError):
+        app.ejecutar_lote_reservas(crear=[{"dia": "Lunes"}])
+    with pytest.raises(LookupError):
+        app.ejecutar_lote_reservas(eliminar=[999])
+    with pytest.raises(PermissionError):
+        app.ejecutar_lote_reservas(eliminar=ajenas, usuario_id=ana)
+
+@pytest.fixture
+def servidor(app):
+    servidor = ServidorAPI(("127.0.0.1", 0), app.db_name)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+def enviar_lote(servidor, token, lote):
+    pedido = urllib.request.Request(f"{servidor}/api/reservas/lote", method="POST", data=json.dumps(lote).encode(),
+                                    headers={"Authorization": f"Bearer {token}"})
+    try:
+        with urllib.request.urlopen(pedido) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_api_de_lote(app, conn, servidor, ana):
+    admin = crear_token(app.db_name, "admin")
+    usuario = crear_token(app.db_name, "ana")
+
+    estado, cuerpo = enviar_lote(servidor, admin, {"crear": [reserva(f"C{i}", docente="Luis Pérez") for i in range(5)]})
+    assert estado == 200
+    assert cuerpo["mensaje"] == "5 creadas, 0 actualizadas, 0 eliminadas"
+    creadas = cuerpo["creadas"]
+
+    assert enviar_lote(servidor, admin, {})[0] == 400
+    estado, cuerpo = enviar_lote(servidor, admin, {"crear": [reserva("X", dia="Domingo")]})
+    assert estado == 400
+    assert cuerpo["error"].startswith("Lote inválido: crear #1: ")
+    assert enviar_lote(servidor, admin, {"eliminar": [creadas[0], 999]})[0] == 409
+    assert enviar_lote(servidor, usuario, {"eliminar": creadas})[0] == 403
+    assert len(cursos(conn)) == 5
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from conexion import base_en_memoria
+from mantenimiento import ProgramadorMantenimiento, ejecutar_mantenimiento, marcar_actividad, ultima_actividad
+
+def test_las_lecturas_cambian_la_marca_de_actividad(app):
+    marca = app.obtener_marca_actividad()
+    assert app.obtener_marca_actividad() == marca
+
+    app.obtener_reservas()
+    assert app.obtener_marca_actividad() != marca
+
+def test_inactiva_solo_cuando_la_actividad_no_cambia(app):
+    contador = [0]
+    programador = ProgramadorMantenimiento(app.db_name, lambda: contador[0], intervalo=3600,
+                                           inactividad=0.05, revision=3600)
+    try:
+        assert not programador.inactiva()
+        time.sleep(0.06)
+        assert programador.inactiva()
+        contador[0] += 1
+        assert not programador.inactiva()
+    finally:
+        programador.detener()
+
+def test_una_tarea_fallida_no_frena_a_las_siguientes(app, monkeypatch):
+    monkeypatch.setenv("LABORATORIO_CAMBIOS_DIAS", "noventa")
+
+    registros = ejecutar_mantenimiento(app.db_name)
+
+    resultados = {tarea: resultado for _, tarea, _, resultado, _ in registros}
+    assert resultados["compactar_cambios"].startswith("Error: ")
+    assert resultados["quick_check"] == "ok"
+    assert "incremental_vacuum" in resultados
+
+def test_el_hilo_sigue_vivo_despues_de_un_error(app, conn):
+    llamadas = [0]
+    corrio = threading.Event()
+
+    def actividad():
+        llamadas[0] += 1
+        if llamadas[0] == 2:
+            raise ValueError("falla a propósito")
+        if llamadas[0] > 3:
+            corrio.set()
+        return 0
+
+    programador = ProgramadorMantenimiento(app.db_name, actividad, intervalo=0, inactividad=0, revision=0.01)
+    try:
+        assert corrio.wait(5)
+    finally:
+        programador.detener()
+    assert conn.execute("SELECT COUNT(*) FROM mantenimiento").fetchone()[0] > 0
+
+def test_el_archivo_de_actividad_avisa_a_los_demas_procesos(tmp_path):
+    base = str(tmp_path / "laboratorio.db")
+    assert ultima_actividad(base) is None
+
+    marcar_actividad(base)
+    primera = ultima_actividad(base)
+    assert primera is not None
+    time.sleep(0.01)
+    marcar_actividad(base)
+    assert ultima_actividad(base) > primera
+
+    memoria = base_en_memoria()
+    marcar_actividad(memoria)
+    assert ultima_actividad(memoria) is None
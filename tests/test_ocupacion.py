@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+@pytest.fixture
+def reservas(app, conn):
+    """Una reserva de todo el primer semestre de 2026 y una de fechas en septiembre"""
+    app.agregar_reserva("Lunes", "Mañana", "Ana Gómez", "Ingeniería en Sistemas", "Programación",
+                        "08:00 - 09:00", "Todo el semestre")
+    cursor = conn.cursor()
+    cursor.execute("UPDATE reservas SET fecha_reserva = '2026-03-05 10:00:00' RETURNING id")
+    app.generar_ocurrencias(cursor, cursor.fetchone()[0], "Lunes", "08:00 - 09:00", referencia=date(2026, 3, 5))
+    conn.commit()
+    app.agregar_reserva("Lunes", "Mañana", "Luis Pérez", "Ingeniería en Sistemas", "Taller",
+                        "10:00 - 11:30", "2026-09-01 a 2026-09-30", "2026-09-01", "2026-09-30")
+
+def test_la_grilla_semanal_muestra_las_reservas_de_su_semestre(app, reservas):
+    marzo = app.obtener_ocupacion_semanal(date(2026, 3, 11))["Lunes"]["Mañana"]
+    assert marzo["minutos_ocupados"] == 60
+    assert marzo["tramos"] == [("08:00", "09:00")]
+
+    # La de marzo no sigue ocupando las semanas del semestre siguiente
+    septiembre = app.obtener_ocupacion_semanal(date(2026, 9, 9))["Lunes"]["Mañana"]
+    assert septiembre["minutos_ocupados"] == 90
+    assert septiembre["tramos"] == [("10:00", "11:30")]
+    assert app.obtener_ocupacion_semanal(date(2026, 9, 9))["Martes"]["Mañana"]["minutos_ocupados"] == 0
+
+def test_una_reserva_de_otro_semestre_no_bloquea_su_horario(app, reservas):
+    libres = app.buscar_horarios_libres("Lunes", "Mañana", 60, "2026-09-01", "2026-09-30")
+    assert libres == [("07:00", "10:00"), ("11:30", "13:00")]
+    assert app.buscar_horarios_libres("Lunes", "Mañana", 60, "2026-03-01", "2026-03-31") == [
+        ("07:00", "08:00"), ("09:00", "13:00")]
+
+def test_sugerir_horarios_dentro_de_los_libres(app, reservas):
+    sugerencias = app.sugerir_horarios("Lunes", "Mañana", 90, "2026-09-01", "2026-09-30")
+    assert sugerencias == ["07:00-08:30", "08:30-10:00", "11:30-13:00"]
+    assert app.sugerir_horarios("Lunes", "Mañana", 60, "2026-09-01", "2026-09-30", limite=2) == [
+        "07:00-08:00", "08:00-09:00"]
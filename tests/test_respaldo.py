@@ -0,0 +1,90 @@
+import os
+import sqlite3
+
+import pytest
+
+from respaldo import crear_respaldo, listar_respaldos, restaurar_respaldo, rotar_respaldos, verificar_respaldo
+
+def crear_base(ruta, filas=1):
+    conn = sqlite3.connect(ruta)
+    conn.execute("CREATE TABLE reservas (id INTEGER PRIMARY KEY, curso TEXT)")
+    conn.executemany("INSERT INTO reservas (curso) VALUES (?)", [(f"Curso {i}",) for i in range(filas)])
+    conn.commit()
+    conn.close()
+    return ruta
+
+def contar(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM reservas").fetchone()[0]
+    finally:
+        conn.close()
+
+@pytest.fixture
+def carpeta(tmp_path):
+    return str(tmp_path / "respaldos")
+
+def test_crea_un_respaldo_verificado(tmp_path, carpeta):
+    base = crear_base(str(tmp_path / "laboratorio.db"), filas=50)
+
+    ruta = crear_respaldo(base, carpeta)
+
+    assert os.path.basename(ruta).startswith("laboratorio-")
+    assert verificar_respaldo(ruta)
+    assert contar(ruta) == 50
+    assert [respaldo[0] for respaldo in listar_respaldos(base, carpeta)] == [ruta]
+
+def test_rota_conservando_los_mas_recientes(tmp_path, carpeta):
+    base = crear_base(str(tmp_path / "laboratorio.db"))
+
+    rutas = [crear_respaldo(base, carpeta, conservar=3) for _ in range(5)]
+
+    assert [respaldo[0] for respaldo in listar_respaldos(base, carpeta)] == rutas[:1:-1]
+    assert not any(os.path.exists(ruta) for ruta in rutas[:2])
+
+def test_la_rotacion_de_un_laboratorio_no_borra_los_de_otra_base(tmp_path, carpeta):
+    # "laboratorio-" también es el comienzo de los respaldos de "laboratorio-lab2"
+    principal = crear_base(str(tmp_path / "laboratorio.db"))
+    laboratorio = crear_base(str(tmp_path / "laboratorio-lab2.db"))
+    respaldo_principal = crear_respaldo(principal, carpeta)
+
+    for _ in range(4):
+        crear_respaldo(laboratorio, carpeta, conservar=2)
+
+    assert [respaldo[0] for respaldo in listar_respaldos(principal, carpeta)] == [respaldo_principal]
+    assert len(listar_respaldos(laboratorio, carpeta)) == 2
+    assert rotar_respaldos(principal, carpeta, conservar=1) == []
+
+def test_ignora_archivos_ajenos_en_la_carpeta(tmp_path, carpeta):
+    base = crear_base(str(tmp_path / "laboratorio.db"))
+    crear_respaldo(base, carpeta)
+    for ajeno in ("laboratorio-notas.db", "laboratorio-20260101-120000-1.db.tmp", "otro-20260101-120000-1.db"):
+        open(os.path.join(carpeta, ajeno), "w").close()
+
+    assert len(listar_respaldos(base, carpeta)) == 1
+    assert rotar_respaldos(base, carpeta, conservar=0)
+    assert sorted(os.listdir(carpeta)) == ["laboratorio-20260101-120000-1.db.tmp", "laboratorio-notas.db",
+                                           "otro-20260101-120000-1.db"]
+
+def test_verificar_rechaza_archivos_que_no_son_bases(tmp_path):
+    vacio = tmp_path / "vacio.db"
+    vacio.write_bytes(b"")
+    basura = tmp_path / "basura.db"
+    basura.write_bytes(b"esto no es sqlite" * 100)
+
+    assert not verificar_respaldo(str(vacio))
+    assert not verificar_respaldo(str(basura))
+
+def test_restaurar_guarda_antes_el_estado_actual(tmp_path, carpeta):
+    base = crear_base(str(tmp_path / "laboratorio.db"), filas=10)
+    respaldo = crear_respaldo(base, carpeta)
+    conn = sqlite3.connect(base)
+    conn.execute("DELETE FROM reservas")
+    conn.commit()
+    conn.close()
+
+    previo = restaurar_respaldo(base, respaldo, carpeta)
+
+    assert contar(base) == 10
+    assert contar(previo) == 0
+    assert {respaldo, previo} <= {ruta for ruta, _, _ in listar_respaldos(base, carpeta)}
@@ -0,0 +1,95 @@
+from datetime import date
+
+import pytest
+
+ORIGEN = date(2026, 3, 1)
+DESTINO = date(2026, 8, 1)
+
+def reservar(app, dia, curso, horario, fecha_inicio=None, fecha_fin=None, docente="Ana Gómez"):
+    periodo = f"{fecha_inicio} a {fecha_fin}" if fecha_inicio else "Todo el semestre"
+    app.agregar_reserva(dia, "Mañana", docente, "Ingeniería en Sistemas", curso, horario, periodo,
+                        fecha_inicio, fecha_fin)
+
+@pytest.fixture
+def semestre(app, conn):
+    """Reservas del primer semestre de 2026 y una del segundo que choca con la copia de "Programación" """
+    reservar(app, "Lunes", "Programación", "08:00 - 09:00")
+    reservar(app, "Martes", "Taller", "10:00 - 11:00", "2026-04-01", "2026-04-30")
+    # Corrida al segundo semestre, más corto, cae después del 20 de diciembre
+    reservar(app, "Miércoles", "Recuperatorio", "09:00 - 10:00", "2026-07-10", "2026-07-14")
+    reservar(app, "Lunes", "Existente", "08:30 - 09:30", "2026-09-01", "2026-09-30", docente="Luis Pérez")
+    hecha_en_el_origen(app, conn, "Programación")
+
+def hecha_en_el_origen(app, conn, curso):
+    """Fija la fecha de reserva en el origen: así sus ocurrencias no dependen del día en que corre la prueba"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        UPDATE reservas SET fecha_reserva = '2026-03-05 10:00:00' WHERE curso = ? RETURNING id, dia, horario
+    ''', (curso,))
+    id_reserva, dia, horario = cursor.fetchone()
+    app.generar_ocurrencias(cursor, id_reserva, dia, horario, referencia=date(2026, 3, 5))
+    conn.commit()
+    return id_reserva
+
+def cursos(conn):
+    return [curso for curso, in conn.execute("SELECT curso FROM reservas ORDER BY id")]
+
+def test_la_vista_previa_informa_sin_escribir(app, conn, semestre):
+    exito, mensaje, conflictos = app.traspasar_semestre(ORIGEN, DESTINO)
+
+    assert exito
+    assert "se copiarían 1 de 3 reservas" in mensaje
+    assert "1 con fechas fuera del semestre de destino" in mensaje
+    assert [(curso, conflicto) for _, curso, _, _, _, conflicto, _ in conflictos] == [("Programación", "Existente")]
+    assert cursos(conn) == ["Programación", "Taller", "Recuperatorio", "Existente"]
+
+def test_copia_corrida_al_destino_omitiendo_conflictos_y_fuera_de_semestre(app, conn, semestre):
+    exito, mensaje, conflictos = app.traspasar_semestre(ORIGEN, DESTINO, simular=False)
+
+    assert exito
+    assert mensaje.startswith("1 de 3 reservas copiadas al semestre 2026-07-16 a 2026-12-20")
+    assert len(conflictos) == 1
+    assert cursos(conn) == ["Programación", "Taller", "Recuperatorio", "Existente", "Taller"]
+    copia = conn.execute('''
+        SELECT id, periodo, fecha_inicio, fecha_fin FROM reservas WHERE curso = 'Taller' ORDER BY id DESC LIMIT 1
+    ''').fetchone()
+    # Se corre lo mismo que el inicio del semestre: del 1 de febrero al 16 de julio
+    assert copia[1:] == ("2026-09-13 a 2026-10-12", "2026-09-13", "2026-10-12")
+    fechas = conn.execute('SELECT MIN(fecha), MAX(fecha), COUNT(*) FROM ocurrencias WHERE reserva_id = ?',
+                          (copia[0],)).fetchone()
+    assert fechas == ("2026-09-15", "2026-10-06", 4)
+
+def test_las_ocurrencias_de_una_copia_semestral_caen_en_el_destino(app, conn):
+    reservar(app, "Jueves", "Semestral", "14:00 - 16:00")
+    id_original = hecha_en_el_origen(app, conn, "Semestral")
+
+    exito, _, _ = app.traspasar_semestre(ORIGEN, DESTINO, simular=False)
+    assert exito
+
+    id_copia, fecha_reserva = conn.execute('''
+        SELECT id, fecha_reserva FROM reservas WHERE curso = 'Semestral' AND id <> ?
+    ''', (id_original,)).fetchone()
+    assert fecha_reserva.startswith("2026-07-16")
+    # Todos los jueves del 16 de julio al 20 de diciembre
+    assert conn.execute('SELECT MIN(fecha), MAX(fecha), COUNT(*) FROM ocurrencias WHERE reserva_id = ?',
+                        (id_copia,)).fetchone() == ("2026-07-16", "2026-12-17", 23)
+    # Las del original siguen en el origen
+    assert conn.execute('SELECT MIN(fecha), MAX(fecha) FROM ocurrencias WHERE reserva_id = ?',
+                        (id_original,)).fetchone() == ("2026-02-05", "2026-07-09")
+
+def test_solo_semestrales_y_seleccion_por_ids(app, conn, semestre):
+    exito, mensaje, conflictos = app.traspasar_semestre(ORIGEN, DESTINO, solo_semestrales=True)
+    assert exito
+    assert "se copiarían 0 de 1 reservas" in mensaje
+    assert len(conflictos) == 1
+
+    id_taller, = conn.execute("SELECT id FROM reservas WHERE curso = 'Taller'").fetchone()
+    exito, mensaje, conflictos = app.traspasar_semestre(ORIGEN, DESTINO, ids=[id_taller], simular=False)
+    assert exito
+    assert mensaje == "1 de 1 reservas copiadas al semestre 2026-07-16 a 2026-12-20"
+    assert conflictos == []
+
+def test_el_destino_debe_ser_otro_semestre(app, semestre):
+    exito, mensaje, conflictos = app.traspasar_semestre(ORIGEN, date(2026, 5, 1))
+    assert not exito
+    assert mensaje == "El semestre de destino debe ser distinto del de origen"